@@ -0,0 +1,1029 @@
+# bench.py
+# -----------------------------------------------------------------------------
+# Rôle : petit banc d’essai des requêtes de stats (outil de dev, pas l’app)
+#        - génère des ligues aléatoires dans des BD temporaires
+#        - plans : EXPLAIN QUERY PLAN des requêtes chaudes et des cascades (index exigés)
+#        - exports : un export annulé ou en erreur ne supprime jamais le CSV choisi
+#        - compare stats.players_kd à un calcul Python « naïf » (doit être identique)
+#        - affiche la courbe de temps : ancienne requête (produit croisé) vs nouvelle
+#        - compare les profils de connexion (db.PROFILES) : insertion de matchs et lectures d’écran
+#        - import en lot (importer.py) : lignes PlayerStats par seconde
+#        - démarrage de l’app (main.py ou l’exe PyInstaller) : temps jusqu’au 1er affichage
+#        - graphiques de l’analyse : temps par visite, ancienne façon vs charts.ChartService
+#        - fenêtres de temps : totaux par semaine vs relecture de PlayerStats / Matches
+#        - stats par round (rounds.py) : NumPy vs boucle Python (doivent être identiques)
+#        - heatmaps (heatmaps.py) : rendu d’une map à 1 M positions, puis depuis le cache
+#        - recherche par nom (search.py) : index FTS5 vs LIKE sur ~50 000 joueurs
+#        - suite : ligue leaguegen.py, toutes les requêtes + les écrans + le démarrage,
+#          résultats en JSON et régressions signalées par rapport à une référence
+# Usage : python bench.py [plans|exports|kd|profiles|import|startup|charts|windows|rounds|heatmap|search|suite]
+#                         [--exe dist/main/main.exe]
+#         python bench.py suite [--size small|medium|large | --db ligue.db] [--json res.json]
+#                         [--baseline ref.json [--save-baseline]] [--threshold 0.25]
+#         python bench.py startup [--exe ...] [--json res.json] [--baseline ref.json [--save-baseline]]
+#         (sans argument : tout, le démarrage étant mesuré dans la suite ; startup et les
+#          écrans demandent un affichage, Xvfb est lancé au besoin ; code de sortie 1
+#          s’il y a une régression)
+# -----------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import charts
+import db
+import events
+import exports
+import heatmaps
+import importer
+import leaguegen
+import ratings
+import rounds
+import search
+import stats
+
+
+# L’ancienne requête de build_players_kd_data, gardée ici juste pour la comparaison :
+# Players × Matches de l’équipe (LEFT JOIN sans corrélation) avant le GROUP BY.
+OLD_PLAYERS_KD_SQL = '''
+    SELECT p.name, COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0)
+    FROM Players p
+    LEFT JOIN Matches m ON m.team_id=?
+    LEFT JOIN PlayerStats ps ON ps.player_id=p.id AND ps.match_id=m.id
+    WHERE p.team_id=?
+    GROUP BY p.id
+'''
+
+
+# ----------------------------------------------------------------
+# make_league(path, ...)
+# ----------------------------------------------------------------
+# Ligue aléatoire : quelques équipes, N joueurs chacune, M matchs par équipe,
+# une ligne PlayerStats par joueur ayant joué (≈ 70 % du roster).
+def make_league(path, teams=4, players_per_team=20, matches_per_team=100, maps=6, seed=0, profile=None):
+    """Crée une BD `path` remplie au hasard (déterministe selon `seed`). Retourne (conn, cursor)."""
+    rnd = random.Random(seed)
+    conn, cursor = db.open_db(path, profile)
+    cursor.executemany('INSERT INTO Maps(name) VALUES (?)', [(f'map{i}',) for i in range(maps)])
+    cursor.executemany('INSERT INTO Teams(name) VALUES (?)', [(f'team{i}',) for i in range(teams)])
+    team_ids = [r[0] for r in cursor.execute('SELECT id FROM Teams')]
+    map_ids = [r[0] for r in cursor.execute('SELECT id FROM Maps')]
+    for tid in team_ids:
+        cursor.executemany('INSERT INTO Players(team_id, name) VALUES (?,?)',
+                           [(tid, f'p{tid}_{i}') for i in range(players_per_team)])
+        roster = [r[0] for r in cursor.execute('SELECT id FROM Players WHERE team_id=?', (tid,))]
+        for _ in range(matches_per_team):
+            cursor.execute('INSERT INTO Matches(team_id, map_id, rounds_won, rounds_lost) VALUES (?,?,?,?)',
+                           (tid, rnd.choice(map_ids), rnd.randint(0, 13), rnd.randint(0, 13)))
+            mid = cursor.lastrowid
+            cursor.executemany(
+                'INSERT INTO PlayerStats(match_id, player_id, kills, deaths, bombs) VALUES (?,?,?,?,?)',
+                [(mid, pid, rnd.randint(0, 30), rnd.randint(0, 30), rnd.randint(0, 3))
+                 for pid in roster if rnd.random() < 0.7])
+    conn.commit()
+    return conn, cursor
+
+
+# ----------------------------------------------------------------
+# naive_players_kd(cursor, tid)
+# ----------------------------------------------------------------
+# Référence en Python pur : on relit les tables brutes et on additionne à la main.
+# Lent, mais impossible de se tromper de jointure.
+def naive_players_kd(cursor, tid):
+    """K/D par joueur de l’équipe `tid`, calculé en Python à partir des tables brutes."""
+    team_matches = {r[0] for r in cursor.execute('SELECT id FROM Matches WHERE team_id=?', (tid,))}
+    roster = cursor.execute('SELECT id, name FROM Players WHERE team_id=? ORDER BY id', (tid,)).fetchall()
+    totals = {pid: [0, 0] for pid, _ in roster}
+    for mid, pid, k, d in cursor.execute('SELECT match_id, player_id, kills, deaths FROM PlayerStats'):
+        if pid in totals and mid in team_matches:
+            totals[pid][0] += k
+            totals[pid][1] += d
+    return [(name, stats.kd_ratio(*totals[pid])) for pid, name in roster]
+
+
+def _timed(fn, repeat=5):
+    """Meilleur temps (en ms) sur `repeat` appels."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+# ----------------------------------------------------------------
+# bench_plans()
+# ----------------------------------------------------------------
+# Pas un chrono : vérifie les plans (EXPLAIN QUERY PLAN) sur une BD neuve,
+# migrée. Chaque requête chaude de open_team / open_player / get_leaderboard
+# (et de l’analyse) doit passer par un index ou la clé primaire : SEARCH …
+# USING (COVERING) INDEX / PRIMARY KEY. Seul SCAN permis : la liste affichée
+# elle-même (toutes les maps d’une fiche, toutes les équipes du leaderboard).
+# Même chose pour les recherches des cascades de delete_team / delete_player
+# (et des maps / matchs / games) : une par clé étrangère, trouvée dans le schéma.
+class _RecordingCursor(sqlite3.Cursor):
+    """Curseur qui garde le SQL exécuté (pour l’expliquer ensuite)."""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, params))
+        return super().execute(sql, params)
+
+
+def _plan_problems(conn, sql, params, listed=()):
+    """Lignes du plan qui ne passent pas par un index (hors tables `listed`, et sous-requêtes matérialisées)."""
+    plan = [r[3] for r in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+    materialized = {line.split()[1] for line in plan if line.startswith('MATERIALIZE ')}
+    bad = []
+    for line in plan:
+        words = line.split()
+        if words[0] == 'SCAN' and words[1] not in listed:
+            bad.append(line)
+        elif words[0] == 'SEARCH' and not ('INDEX' in line or 'PRIMARY KEY' in line):
+            bad.append(line)
+        elif 'AUTOMATIC' in line and words[1] not in materialized:
+            bad.append(line)
+    return plan, bad
+
+
+def bench_plans():
+    """Plans des requêtes chaudes et des cascades : assert SEARCH par index, pas de SCAN."""
+    since = stats.week_of('2026-01-05')
+    screens = {
+        # écran → (appels, tables / alias qu’il liste en entier)
+        'open_team': ([lambda c: c.execute('SELECT name, logo FROM Teams WHERE id = ?', (1,)),
+                       lambda c: stats.team_map_totals(c, 1), lambda c: stats.team_map_totals(c, 1, since),
+                       lambda c: stats.roster_stats(c, 1), lambda c: stats.roster_stats(c, 1, since)], {'mp'}),
+        'open_player': ([lambda c: c.execute('SELECT team_id FROM Players WHERE id = ?', (1,)),
+                         lambda c: stats.player_map_totals(c, 1), lambda c: stats.player_map_totals(c, 1, since)],
+                        {'mp'}),
+        'get_leaderboard': ([lambda c, o=order, w=window: stats.leaderboard(c, o, w)
+                             for order in stats.LEADERBOARD_ORDERS for window in (None, since)], {'Teams', 't'}),
+        'analyse': ([lambda c: stats.team_winrate_by_map(c, 1), lambda c: stats.team_winrate_by_map(c, 1, since=since),
+                     lambda c: stats.players_kd(c, 1), lambda c: stats.players_kd(c, 1, since)], {'mp'}),
+    }
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, _cursor = db.open_db(os.path.join(tmp, 'plans.db'))
+        for screen, (calls, listed) in screens.items():
+            cur = _RecordingCursor(conn)
+            for call in calls:
+                call(cur)
+            for sql, params in cur.statements:
+                plan, bad = _plan_problems(conn, sql, params, listed)
+                print(f"{'ok' if not bad else '✗':>3} {screen:<16} {' '.join(sql.split())[:80]}")
+                if bad:
+                    failures.append((screen, ' '.join(sql.split()), plan))
+
+        # Cascades : chaque clé étrangère vers ces tables doit trouver ses lignes par index
+        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND sql IS NOT NULL")]
+        for child in tables:
+            for fk in conn.execute(f'PRAGMA foreign_key_list({child})').fetchall():
+                parent, column = fk[2], fk[3]
+                if parent not in ('Teams', 'Players', 'Matches', 'Maps', 'Games'):
+                    continue
+                sql = f'SELECT 1 FROM {child} WHERE {column} = ?'
+                plan, bad = _plan_problems(conn, sql, (1,))
+                print(f"{'ok' if not bad else '✗':>3} {'cascade ' + parent:<16} {child}.{column} : {plan[0]}")
+                if bad:
+                    failures.append((f'cascade {parent}', sql, plan))
+        conn.close()
+    assert not failures, 'plans sans index :\n' + '\n'.join(f'  {s} : {q}\n    {p}' for s, q, p in failures)
+
+
+# ----------------------------------------------------------------
+# bench_export_jobs()
+# ----------------------------------------------------------------
+# Pas un chrono : un CSV existant choisi comme destination ne doit jamais être
+# perdu si le job d’export échoue (BD introuvable, erreur SQL) ou est annulé ;
+# un job réussi le remplace, et aucun .tmp ne traîne.
+class _CancelWhileWriting(threading.Event):
+    """« Annuler » cliqué pendant l’écriture : pas encore vu au début de run(), vu au 1er paquet."""
+
+    def __init__(self):
+        super().__init__()
+        self.checks = 0
+
+    def is_set(self):
+        self.checks += 1
+        return self.checks > 1
+
+
+def bench_export_jobs():
+    """Fichier de destination gardé si l’export échoue / est annulé, remplacé s’il réussit."""
+    original = 'ancien,csv\n'
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'league.db')
+        conn, _cursor = make_league(db_path, teams=2, players_per_team=5, matches_per_team=20)
+        conn.close()
+        out = os.path.join(tmp, 'rapport.csv')
+        cases = [('BD introuvable', os.path.join(tmp, 'absente.db'), None, exports.ExportJob.FAILED, True),
+                 ('erreur SQL', db_path, 'rapport_inconnu', exports.ExportJob.FAILED, True),
+                 ('annulé', db_path, 'cancel', exports.ExportJob.CANCELLED, True),
+                 ('réussi', db_path, None, exports.ExportJob.DONE, False)]
+        for label, db_file, twist, state, kept in cases:
+            with open(out, 'w', encoding='utf-8') as f:
+                f.write(original)
+            job = exports.ExportJob('best_players', out, db_file)
+            if twist == 'cancel':
+                job._cancel = _CancelWhileWriting()
+            elif twist:
+                job.name = twist
+            job.run()
+            content = None
+            if os.path.exists(out):
+                with open(out, encoding='utf-8') as f:
+                    content = f.read()
+            ok = job.state == state and (content == original) == kept and not os.path.exists(out + '.tmp')
+            fate = 'supprimé' if content is None else 'gardé' if content == original else 'remplacé'
+            print(f"{'ok' if ok else '✗':>3} {label:<16} {job.state}, fichier {fate}")
+            if not ok:
+                failures.append(label)
+    assert not failures, 'exports : destination perdue ou .tmp restant : ' + ', '.join(failures)
+
+
+# ----------------------------------------------------------------
+# bench_players_kd(sizes)
+# ----------------------------------------------------------------
+# Pour chaque taille (matchs par équipe) : on vérifie l’égalité avec la
+# référence sur plusieurs ligues aléatoires, puis on chronomètre.
+def bench_players_kd(sizes=(50, 100, 200, 400, 800), seeds=3):
+    """Affiche la courbe ancienne vs nouvelle requête K/D ; lève AssertionError si résultat faux."""
+    print(f"{'matchs/équipe':>14} {'ancienne (ms)':>14} {'players_kd (ms)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            for seed in range(seeds):
+                path = os.path.join(tmp, f'kd_{size}_{seed}.db')
+                conn, cursor = make_league(path, matches_per_team=size, seed=seed)
+                for (tid,) in cursor.execute('SELECT id FROM Teams').fetchall():
+                    expected = naive_players_kd(cursor, tid)
+                    got = stats.players_kd(cursor, tid)
+                    assert got == expected, f'players_kd ≠ référence (taille={size}, seed={seed}, équipe={tid})'
+                if seed == seeds - 1:
+                    tid = cursor.execute('SELECT MIN(id) FROM Teams').fetchone()[0]
+                    old_ms = _timed(lambda: cursor.execute(OLD_PLAYERS_KD_SQL, (tid, tid)).fetchall())
+                    new_ms = _timed(lambda: stats.players_kd(cursor, tid))
+                    print(f'{size:>14} {old_ms:>14.2f} {new_ms:>16.2f}')
+                conn.close()
+
+
+# ----------------------------------------------------------------
+# bench_profiles(matches)
+# ----------------------------------------------------------------
+# Pour chaque profil de db.PROFILES :
+# - insertion : `matches` matchs enregistrés un par un comme save() le fait
+#   (2 lignes Matches + ~10 PlayerStats, puis commit) → matchs/seconde
+# - lecture : les requêtes des écrans (fiche d’équipe, fiche joueur)
+def bench_profiles(matches=300):
+    """Affiche débit d’insertion et latence des lectures d’écran pour chaque profil."""
+    print(f"{'profil':>8} {'matchs/s':>10} {'roster (ms)':>12} {'joueur (ms)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in db.PROFILES.items():
+            path = os.path.join(tmp, f'profile_{name}.db')
+            conn, cursor = make_league(path, matches_per_team=200, profile=profile)
+            rnd = random.Random(1)
+            team_ids = [r[0] for r in cursor.execute('SELECT id FROM Teams')]
+            map_ids = [r[0] for r in cursor.execute('SELECT id FROM Maps')]
+            rosters = {tid: [r[0] for r in cursor.execute('SELECT id FROM Players WHERE team_id=?', (tid,))]
+                       for tid in team_ids}
+
+            t0 = time.perf_counter()
+            for _ in range(matches):
+                t1, t2 = rnd.sample(team_ids, 2)
+                mp = rnd.choice(map_ids)
+                s1, s2 = rnd.randint(0, 13), rnd.randint(0, 13)
+                for tid, won, lost in ((t1, s1, s2), (t2, s2, s1)):
+                    cursor.execute('INSERT INTO Matches(team_id,map_id,rounds_won,rounds_lost) VALUES (?,?,?,?)',
+                                   (tid, mp, won, lost))
+                    mid = cursor.lastrowid
+                    for pid in rosters[tid][:5]:
+                        cursor.execute('INSERT INTO PlayerStats(match_id,player_id,kills,deaths,bombs) VALUES (?,?,?,?,?)',
+                                       (mid, pid, rnd.randint(0, 30), rnd.randint(0, 30), 0))
+                conn.commit()
+            rate = matches / (time.perf_counter() - t0)
+
+            roster_ms = _timed(lambda: stats.roster_stats(cursor, team_ids[0]))
+            player_ms = _timed(lambda: stats.player_map_totals(cursor, rosters[team_ids[0]][0]))
+            print(f'{name:>8} {rate:>10.0f} {roster_ms:>12.3f} {player_ms:>12.3f}')
+            conn.close()
+
+
+# ----------------------------------------------------------------
+# bench_import(games)
+# ----------------------------------------------------------------
+# Import d’un flux de `games` games (10 joueurs chacune → 10 × games lignes
+# PlayerStats) dans une BD vide. Cible : 100k lignes en quelques secondes.
+def bench_import(games=10000):
+    """Affiche le débit de importer.import_games et vérifie les agrégats après coup."""
+    rnd = random.Random(0)
+    teams = [f'team{i}' for i in range(40)]
+
+    def gen():
+        for i in range(games):
+            a, b = rnd.sample(teams, 2)
+            yield {
+                'played_at': f'2025-{i % 12 + 1:02d}-{i % 28 + 1:02d} 20:00:00',
+                'map': f'map{rnd.randint(0, 7)}', 'team_a': a, 'team_b': b,
+                'score_a': rnd.randint(0, 13), 'score_b': rnd.randint(0, 13),
+                'players': [{'team': t, 'player': f'{t}_p{i}', 'kills': rnd.randint(0, 30),
+                             'deaths': rnd.randint(0, 30), 'bombs': rnd.randint(0, 2)}
+                            for t in (a, b) for i in range(5)],
+            }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, _cursor = db.open_db(os.path.join(tmp, 'import.db'))
+        t0 = time.perf_counter()
+        res = importer.import_games(conn, gen())
+        elapsed = time.perf_counter() - t0
+        tables = ('PlayerMapTotals', 'PlayerWeekTotals', 'TeamWeekTotals')
+        totals = [sorted(conn.execute(f'SELECT * FROM {t}')) for t in tables]
+        db.rebuild_totals(conn)
+        for t, before in zip(tables, totals):
+            assert before == sorted(conn.execute(f'SELECT * FROM {t}')), f'{t} désynchronisé'
+        conn.close()
+    print(f"import : {res['player_stats']} lignes en {elapsed:.2f} s "
+          f"({res['player_stats'] / elapsed:.0f} lignes/s)")
+
+
+# ----------------------------------------------------------------
+# bench_windows(games, days)
+# ----------------------------------------------------------------
+# Deux ans de games datées (importer) puis, pour chaque fenêtre : fiche
+# d’équipe (roster + win-rate par map) lue dans les totaux par semaine vs
+# la même chose recalculée sur PlayerStats / Matches. Les résultats doivent
+# être identiques (mêmes bornes : since = un lundi, voir stats.since_days).
+RAW_ROSTER_SQL = '''
+    SELECT p.id, p.name, p.logo, COUNT(m.id),
+           COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0), COALESCE(SUM(ps.bombs),0),
+           COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
+    FROM Players p
+    LEFT JOIN (PlayerStats ps JOIN Matches m ON m.id = ps.match_id AND m.played_at >= ?)
+           ON ps.player_id = p.id
+    WHERE p.team_id = ?
+    GROUP BY p.id
+    ORDER BY p.id
+'''
+RAW_TEAM_MAPS_SQL = '''
+    SELECT mp.id, mp.name, mp.image, COUNT(m.id),
+           COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
+    FROM Maps mp
+    LEFT JOIN Matches m ON m.map_id = mp.id AND m.team_id = ? AND m.played_at >= ?
+    GROUP BY mp.id
+    ORDER BY mp.id
+'''
+
+
+def bench_windows(games=20000, days=(7, 30, 90, 365, 730)):
+    """Fiche d’équipe sur une fenêtre : totaux par semaine vs relecture des tables brutes."""
+    rnd = random.Random(0)
+    teams = [f'team{i}' for i in range(20)]
+    today = datetime.date.today()
+
+    def gen():
+        for _ in range(games):
+            a, b = rnd.sample(teams, 2)
+            day = today - datetime.timedelta(days=rnd.randint(0, 730))
+            yield {
+                'played_at': f'{day.isoformat()} 20:00:00',
+                'map': f'map{rnd.randint(0, 7)}', 'team_a': a, 'team_b': b,
+                'score_a': rnd.randint(0, 13), 'score_b': rnd.randint(0, 13),
+                'players': [{'team': t, 'player': f'{t}_p{i}', 'kills': rnd.randint(0, 30),
+                             'deaths': rnd.randint(0, 30), 'bombs': rnd.randint(0, 2)}
+                            for t in (a, b) for i in range(5)],
+            }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, cursor = db.open_db(os.path.join(tmp, 'windows.db'))
+        res = importer.import_games(conn, gen())
+        tid = cursor.execute('SELECT id FROM Teams ORDER BY id').fetchone()[0]
+        print(f"{res['player_stats']} lignes PlayerStats, équipe {tid}")
+        print(f"{'fenêtre':>8} {'semaines ms':>12} {'brut ms':>10}")
+        for d in days:
+            since = stats.since_days(d, today)
+            new = (stats.roster_stats(cursor, tid, since), stats.team_map_totals(cursor, tid, since))
+            old = (cursor.execute(RAW_ROSTER_SQL, (since, tid)).fetchall(),
+                   cursor.execute(RAW_TEAM_MAPS_SQL, (tid, since)).fetchall())
+            assert new == old, f'fenêtre {d} j : totaux par semaine ≠ tables brutes'
+            new_ms = _timed(lambda: (stats.roster_stats(cursor, tid, since),
+                                     stats.team_map_totals(cursor, tid, since)))
+            old_ms = _timed(lambda: (cursor.execute(RAW_ROSTER_SQL, (since, tid)).fetchall(),
+                                     cursor.execute(RAW_TEAM_MAPS_SQL, (tid, since)).fetchall()))
+            print(f'{d:>6} j {new_ms:>12.3f} {old_ms:>10.3f}')
+        conn.close()
+
+
+# ----------------------------------------------------------------
+# bench_rounds(games)
+# ----------------------------------------------------------------
+# Games avec rounds détaillés (leaguegen.round_detail : MR12, changement de
+# côté après 12 rounds, prolongation par blocs de 3), puis rounds.team_round_stats
+# comparé à un calcul round par round en Python (référence) : résultats identiques exigés.
+def _py_round_stats(cursor, team_id, since=None, deficit=rounds.COMEBACK_DEFICIT):
+    """Référence : mêmes colonnes que rounds.team_round_stats, une boucle Python par round."""
+    where = '' if since is None else ' AND g.played_at >= ?'
+    cursor.execute(f'''
+        SELECT mp.id, mp.name, g.team_b = ?, r.data
+        FROM Games g JOIN GameRounds r ON r.game_id = g.id JOIN Maps mp ON mp.id = g.map_id
+        WHERE (g.team_a = ? OR g.team_b = ?){where} AND length(r.data) > 0
+        ORDER BY g.id
+    ''', (team_id, team_id, team_id) + (() if since is None else (since,)))
+    per_map = {}
+    for map_id, name, is_b, blob in cursor.fetchall():
+        acc = per_map.setdefault(map_id, [name] + [0] * 14)
+        diff = low = streak = best = switches = 0
+        prev_attack = None
+        for i, code in enumerate(rounds.decode(blob)):
+            won = bool(code & rounds.WINNER_B) == bool(is_b)
+            attack = bool(code & rounds.A_ATTACK) != bool(is_b)
+            bomb = (code >> rounds.BOMB_SHIFT) & rounds.BOMB_MASK
+            duration = code >> rounds.DURATION_SHIFT
+            if i and attack != prev_attack:
+                switches += 1
+            pistol = i == 0 or (attack != prev_attack and switches == 1)
+            prev_attack = attack
+            streak = streak + 1 if won else 0
+            best = max(best, streak)
+            diff += 1 if won else -1
+            low = min(low, diff)
+            acc[2] += 1; acc[3] += won; acc[4] += pistol; acc[5] += pistol and won
+            acc[9] += attack; acc[10] += attack and bomb != 0
+            acc[11] += (not attack) and bomb != 0; acc[12] += (not attack) and bomb == rounds.BOMB_DEFUSED
+            acc[13] += duration; acc[14] += duration > 0
+        acc[1] += 1; acc[6] = max(acc[6], best)
+        acc[7] += low <= -deficit; acc[8] += low <= -deficit and diff > 0
+    rows = [per_map[m] for m in sorted(per_map)]
+    if not rows:
+        return []
+    total = ['Total'] + [sum(r[c] for r in rows) for c in range(1, 15)]
+    total[6] = max(r[6] for r in rows)
+    return [tuple(r[:13]) + ((r[13] / r[14]) if r[14] else 0.0,) for r in rows + [total]]
+
+
+def bench_rounds(games=20000):
+    """Stats par round d’une équipe : NumPy (rounds.py) vs boucle Python, + taille des BLOB."""
+    rnd = random.Random(0)
+    teams = [f'team{i}' for i in range(20)]
+    today = datetime.date.today()
+
+    def gen():
+        for _ in range(games):
+            a, b = rnd.sample(teams, 2)
+            detail = leaguegen.round_detail(rnd)
+            won_a, won_b = rounds.wins(detail)
+            day = today - datetime.timedelta(days=rnd.randint(0, 365))
+            yield {
+                'played_at': f'{day.isoformat()} 20:00:00',
+                'map': f'map{rnd.randint(0, 7)}', 'team_a': a, 'team_b': b,
+                'score_a': won_a, 'score_b': won_b, 'players': [], 'rounds': detail,
+            }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, cursor = db.open_db(os.path.join(tmp, 'rounds.db'))
+        t0 = time.perf_counter()
+        importer.import_games(conn, gen())
+        import_s = time.perf_counter() - t0
+        n_bytes = cursor.execute('SELECT SUM(length(data)) FROM GameRounds').fetchone()[0]
+        print(f'{games} games, {n_bytes // 2} rounds importés en {import_s:.2f} s ; '
+              f'GameRounds : {n_bytes / 1024:.0f} Ko ({n_bytes / games:.0f} octets / game)')
+        print(f"{'équipe':>8} {'games':>6} {'numpy ms':>9} {'python ms':>10}")
+        since = stats.since_days(90, today)
+        for tid, in cursor.execute('SELECT id FROM Teams ORDER BY id LIMIT 5').fetchall():
+            for window in (since, None):
+                new = rounds.team_round_stats(cursor, tid, window)
+                old = _py_round_stats(cursor, tid, window)
+                assert len(new) == len(old) and all(
+                    n[:-1] == o[:-1] and abs(n[-1] - o[-1]) < 1e-9 for n, o in zip(new, old)), \
+                    f'équipe {tid} : NumPy ≠ référence Python'
+            new_ms = _timed(lambda: rounds.team_round_stats(cursor, tid))
+            old_ms = _timed(lambda: _py_round_stats(cursor, tid))
+            print(f'{tid:>8} {new[-1][1]:>6} {new_ms:>9.2f} {old_ms:>10.2f}')
+        conn.close()
+
+
+# ----------------------------------------------------------------
+# bench_heatmap(n_events, games)
+# ----------------------------------------------------------------
+# 1 M positions sur une map (quelques zones chaudes), stockées comme l’import
+# (events.store), puis heatmaps : rendu complet à froid (lecture des BLOB →
+# histogram2d → flou → composite → PNG) vs PNG déjà en cache (HeatmapService).
+# Vérifie aussi la grille de np.histogram2d contre un comptage Python.
+def bench_heatmap(n_events=1_000_000, games=200):
+    """Heatmap d’une map à 1 M événements : temps de rendu (objectif < 1 s) et cache."""
+    import numpy as np
+
+    rnd = random.Random(0)
+    teams = [f'team{i}' for i in range(10)]
+
+    def gen():
+        for _ in range(games):
+            a, b = rnd.sample(teams, 2)
+            yield {'map': 'map0', 'team_a': a, 'team_b': b,
+                   'score_a': rnd.randint(0, 13), 'score_b': rnd.randint(0, 13),
+                   'players': [{'team': t, 'player': f'{t}_p{i}', 'kills': 0, 'deaths': 0, 'bombs': 0}
+                               for t in (a, b) for i in range(5)]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, cursor = db.open_db(os.path.join(tmp, 'heatmap.db'))
+        importer.import_games(conn, gen())
+        rng = np.random.default_rng(0)
+        hot = rng.uniform(0.15, 0.85, size=(12, 2))
+        per_game = n_events // games
+        rows = []
+        for game_id, team_a, team_b in cursor.execute('SELECT id, team_a, team_b FROM Games ORDER BY id').fetchall():
+            roster = [r[0] for r in cursor.execute(
+                'SELECT id FROM Players WHERE team_id IN (?, ?)', (team_a, team_b)).fetchall()]
+            ev = np.empty(per_game, dtype=events.event_dtype())
+            centers = hot[rng.integers(0, len(hot), per_game)]
+            ev['x'] = np.clip(centers[:, 0] + rng.normal(0, 0.04, per_game), 0, 1)
+            ev['y'] = np.clip(centers[:, 1] + rng.normal(0, 0.04, per_game), 0, 1)
+            ev['player'] = rng.choice(roster, per_game)
+            ev['kind'] = rng.integers(1, len(events.KINDS) + 1, per_game)
+            ev['round'] = rng.integers(1, 25, per_game)
+            rows.append((game_id, ev))
+        events.store(cursor, rows)
+        conn.commit()
+        map_id = cursor.execute("SELECT id FROM Maps WHERE name = 'map0'").fetchone()[0]
+        tid = cursor.execute('SELECT id FROM Teams ORDER BY id').fetchone()[0]
+        pid = cursor.execute('SELECT id FROM Players WHERE team_id = ? ORDER BY id', (tid,)).fetchone()[0]
+        n_bytes = cursor.execute('SELECT SUM(length(data)) FROM GameEvents').fetchone()[0]
+        print(f'{games * per_game} événements, GameEvents : {n_bytes / 2**20:.1f} Mo')
+
+        # histogram2d (lignes = y) vs comptage Python sur un échantillon
+        sample = events.load(cursor, map_id)[:20000]
+        grid = np.histogram2d(sample['y'], sample['x'], bins=heatmaps.BINS, range=[[0, 1], [0, 1]])[0]
+        ref = np.zeros_like(grid)
+        for x, y in zip(sample['x'].tolist(), sample['y'].tolist()):
+            ref[min(int(np.float64(y) * heatmaps.BINS), heatmaps.BINS - 1),
+                min(int(np.float64(x) * heatmaps.BINS), heatmaps.BINS - 1)] += 1
+        assert np.array_equal(grid, ref), 'histogram2d ≠ comptage Python'
+
+        print(f"{'filtre':>18} {'événements':>11} {'rendu ms':>9} {'cache ms':>9}")
+        for label, scope, kind in (('toute la ligue', None, None), ('équipe, kills', ('team', tid), 'kill'),
+                                   ('joueur', ('player', pid), None)):
+            service = heatmaps.HeatmapService()
+            t0 = time.perf_counter()
+            _png, n = service.get(cursor, map_id, scope, kind)
+            cold_ms = (time.perf_counter() - t0) * 1000
+            hit_ms = _timed(lambda: service.get(cursor, map_id, scope, kind))
+            print(f'{label:>18} {n:>11} {cold_ms:>9.1f} {hit_ms:>9.4f}')
+        conn.close()
+
+
+# ----------------------------------------------------------------
+# bench_search(teams, players_per_team)
+# ----------------------------------------------------------------
+# Ligue de ~50 000 joueurs (noms « mot + nombre »), puis recherche pendant la
+# frappe : chaque préfixe d’une requête, index FTS5 (search.search) vs
+# l’ancien réflexe LIKE '%…%' sur les 3 tables. Les résultats FTS doivent tous
+# contenir chaque mot tapé (en début de mot).
+def bench_search(teams=500, players_per_team=100):
+    """Recherche par nom sur une grosse ligue : FTS5 vs LIKE, par longueur de préfixe."""
+    rnd = random.Random(0)
+    words = ['shadow', 'faze', 'raven', 'zorro', 'alpha', 'nova', 'ghost', 'viper', 'blaze', 'echo',
+             'titan', 'frost', 'storm', 'lynx', 'omega', 'pixel', 'rogue', 'sable', 'drake', 'kilo']
+    team_names = [f'{rnd.choice(words).title()} {rnd.choice(words).title()} {i}' for i in range(teams)]
+    roster = {t: [f'{rnd.choice(words)}{rnd.randint(0, 9999)}' for _ in range(players_per_team)] for t in team_names}
+
+    def gen():
+        for i in range(0, teams, 2):
+            a, b = team_names[i], team_names[i + 1]
+            yield {'map': f'map{i % 8}', 'team_a': a, 'team_b': b, 'score_a': 13, 'score_b': 7,
+                   'players': [{'team': t, 'player': p, 'kills': 1, 'deaths': 1, 'bombs': 0}
+                               for t in (a, b) for p in roster[t]]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, cursor = db.open_db(os.path.join(tmp, 'search.db'))
+        importer.import_games(conn, gen())
+        n = cursor.execute('SELECT COUNT(*) FROM SearchIndex').fetchone()[0]
+        print(f'{n} noms indexés (FTS5)')
+        print(f"{'requête':>14} {'résultats':>10} {'fts ms':>8} {'like ms':>8}")
+        for query in ('s', 'sh', 'sha', 'shadow', 'shadow4', 'ze', 'faze ra', 'zzz'):
+            rows = search.search(cursor, query)
+            for _kind, _id, name, _team in rows:
+                tokens = re.findall(r'\w+', name.lower())
+                assert all(any(t.startswith(w) for t in tokens) for w in query.split()), \
+                    f'« {name} » ne correspond pas à « {query} »'
+            fts_ms = _timed(lambda: search.search(cursor, query))
+            like_ms = _timed(lambda: search._search_like(cursor, query, tuple(search.KINDS), search.DEFAULT_LIMIT))
+            print(f'{query:>14} {len(rows):>10} {fts_ms:>8.3f} {like_ms:>8.3f}')
+        conn.close()
+
+
+# ----------------------------------------------------------------
+# _display(env, what)
+# ----------------------------------------------------------------
+# Pour lancer l’app Tk : sans affichage (Linux), démarre un Xvfb le temps du
+# bloc `with`. Donne l’environnement à passer à l’app, ou None si ni affichage ni Xvfb.
+@contextlib.contextmanager
+def _display(env, what):
+    if env.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        yield env
+        return
+    exe = shutil.which('Xvfb')
+    if exe is None:
+        print(f'{what} : pas d’affichage ni de Xvfb, mesures sautées')
+        yield None
+        return
+    xvfb = subprocess.Popen([exe, ':97', '-screen', '0', '1600x1000x24'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1)
+    try:
+        yield dict(env, DISPLAY=':97')
+    finally:
+        xvfb.terminate()
+        xvfb.wait()
+
+
+# ----------------------------------------------------------------
+# bench_startup(runs, exe, db_path)
+# ----------------------------------------------------------------
+# Lance l’app `runs` fois (python main.py, ou l’exe donné) avec
+# STATTEAM_STARTUP_EXIT=1 : elle se ferme toute seule au 1er affichage.
+# - processus complet : temps mur (interpréteur / décompression onefile compris)
+# - phases : lues dans le journal de startup.py (médiane de chaque phase)
+# Les médianes sont retournées (section « startup » des résultats, comparée à
+# la référence comme les requêtes) ; {} si l’app n’a pas pu démarrer.
+def bench_startup(runs=5, exe=None, db_path=None):
+    """Temps de démarrage médian {mesure: ms} (processus complet + phases internes)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    cmd = [os.path.abspath(exe)] if exe else [sys.executable, os.path.join(here, 'main.py')]
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'startup.log')
+        env = dict(os.environ, STATTEAM_STARTUP_EXIT='1', STATTEAM_STARTUP_LOG=log_path)
+        if db_path:
+            env['STATTEAM_DB'] = os.path.abspath(db_path)
+        walls = []
+        with _display(env, 'startup') as env:
+            if env is None:
+                return {}
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                res = subprocess.run(cmd, env=env, cwd=here, capture_output=True, timeout=120)
+                walls.append((time.perf_counter() - t0) * 1000)
+                if res.returncode != 0:
+                    print(f'startup : échec ({res.stderr.decode(errors="replace").strip()[-200:]})')
+                    return {}
+        if not os.path.exists(log_path):
+            print('startup : pas de journal (version sans startup.py ?)')
+            return {}
+        with open(log_path, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+    times = {'processus complet': statistics.median(walls),
+             'dans l’app': statistics.median(e['total_ms'] for e in entries)}
+    for phase in entries[0]['phases']:
+        times[phase] = statistics.median(e['phases'].get(phase, 0) for e in entries)
+    print(f"startup ({'exe' if exe else 'python main.py'}, {runs} lancements, médianes)")
+    for name, ms in times.items():
+        print(f'{name:>22} {ms:>9.1f} ms')
+    return {name: round(ms, 1) for name, ms in times.items()}
+
+
+# ----------------------------------------------------------------
+# bench_charts(visits)
+# ----------------------------------------------------------------
+# Simule des visites de l’écran d’analyse (les 2 graphiques d’une équipe),
+# rendu hors écran (Agg) pour ne pas dépendre d’un affichage :
+# - ancienne façon : nouvelles Figure + tight_layout + draw à chaque visite
+# - ChartService : 1re visite, revisite (cache), visite après un nouveau match
+def _old_chart_visit(labels, values, ylabel):
+    """Copie de l’ancien code d’analyse (une figure neuve par visite), rendue avec Agg."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    xticks = list(range(len(labels)))
+    fig = Figure(figsize=(5, 4), dpi=100); fig.patch.set_facecolor(charts.BG_COLOR)
+    ax = fig.add_subplot(111); ax.set_facecolor(charts.BG_COLOR)
+    ax.bar(xticks, values, color=[charts.VIBRANT_COLORS[i % len(charts.VIBRANT_COLORS)] for i in xticks])
+    ax.set_ylabel(ylabel, color=charts.TEXT_COLOR)
+    ax.set_xticks(xticks); ax.set_xticklabels(labels, rotation=45)
+    ax.tick_params(axis='x', colors=charts.TEXT_COLOR); ax.tick_params(axis='y', colors=charts.TEXT_COLOR)
+    for spine in ax.spines.values(): spine.set_color(charts.TEXT_COLOR)
+    fig.tight_layout()
+    FigureCanvasAgg(fig).draw()
+
+
+def bench_charts(visits=10):
+    """Affiche le temps (ms) des graphiques par visite, et le nb de tight_layout() faits."""
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, cursor = make_league(os.path.join(tmp, 'charts.db'), teams=4, matches_per_team=100)
+        team_ids = [r[0] for r in cursor.execute('SELECT id FROM Teams')]
+
+        def winrate(tid):
+            rows = stats.team_winrate_by_map(cursor, tid)
+            return [r[0] for r in rows], [stats.win_rate(r[1], r[2]) for r in rows]
+
+        def kd(tid):
+            rows = stats.players_kd(cursor, tid)
+            return [r[0] for r in rows], [r[1] for r in rows]
+
+        def old_visit(tid):
+            _old_chart_visit(*winrate(tid), 'Win Rate (%)')
+            _old_chart_visit(*kd(tid), 'K/D')
+
+        service = charts.ChartService(make_image=lambda im: im)
+        service.register('winrate', 'Win Rate (%)')
+        service.register('kd', 'K/D')
+        generation = [0]
+
+        def new_visit(tid):
+            service.get('winrate', tid, generation[0], lambda: winrate(tid))
+            service.get('kd', tid, generation[0], lambda: kd(tid))
+
+        def per_visit(fn, n=visits):
+            t0 = time.perf_counter()
+            for i in range(n):
+                fn(team_ids[i % len(team_ids)])
+            return (time.perf_counter() - t0) * 1000 / n
+
+        old_visit(team_ids[0])  # imports matplotlib hors chrono
+        old_ms = per_visit(old_visit)
+        first_ms = per_visit(new_visit, len(team_ids))   # chaque équipe une fois : cache vide
+        layouts = service.layouts()
+        repeat_ms = per_visit(new_visit)         # mêmes équipes, mêmes données
+        assert service.layouts() == layouts, 'revisite : tight_layout() refait'
+
+        # Un match de plus → nouvelle génération : barres mises à jour, pas de mise en page
+        def add_match():
+            cursor.execute('INSERT INTO Matches(team_id, map_id, rounds_won, rounds_lost) '
+                           'SELECT id, (SELECT MIN(id) FROM Maps), 13, 2 FROM Teams')
+            conn.commit()
+            generation[0] += 1
+        add_match()
+        layouts = service.layouts()
+        changed_ms = per_visit(new_visit, len(team_ids))
+        assert service.layouts() == layouts, 'mêmes étiquettes : tight_layout() refait'
+        conn.close()
+
+    print(f'graphiques d’analyse ({visits} visites sur {len(team_ids)} équipes, ms / visite)')
+    print(f"{'ancienne façon':>24} {old_ms:>9.2f}")
+    print(f"{'service, 1re visite':>24} {first_ms:>9.2f}")
+    print(f"{'service, revisite':>24} {repeat_ms:>9.3f}")
+    print(f"{'service, après un match':>24} {changed_ms:>9.2f}")
+    print(f"tight_layout() : {service.layouts()} (ancienne façon : 2 par visite) | cache : {service.stats()}")
+
+
+# ----------------------------------------------------------------
+# bench_suite(db_path, size, ...)
+# ----------------------------------------------------------------
+# La suite complète, pour suivre les perfs d’une version à l’autre :
+# - une ligue leaguegen (déterministe : même graine, même date de fin) ou --db
+# - chaque requête derrière un écran / export / outil : médiane de plusieurs appels
+# - chaque écran (main.py, visite scriptée) sous un affichage, virtuel (Xvfb)
+#   s’il n’y en a pas ; sauté sans Xvfb
+# Résultats en JSON ; avec une référence (--baseline), toute mesure plus lente
+# de plus de `threshold` (et d’au moins REGRESSION_MIN_MS) est signalée.
+SUITE_END = '2026-01-01'      # date de la dernière game des ligues générées
+SUITE_EVENTS = 20             # positions par game (heatmaps)
+REGRESSION_MIN_MS = 0.5       # en dessous, c’est du bruit
+SUITE_STARTUP_RUNS = 3        # lancements de l’app pour la section « startup »
+SECTIONS = ('queries', 'screens', 'startup')
+
+
+def _median_ms(fn, repeat=7):
+    """Temps médian (en ms) sur `repeat` appels, après un appel d’échauffement."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def suite_queries(cursor, tmp):
+    """[(nom, fonction), ...] : les requêtes des écrans, des exports et des outils, sur l’équipe la plus active."""
+    tid = cursor.execute('SELECT team_id FROM Matches GROUP BY team_id ORDER BY COUNT(*) DESC LIMIT 1').fetchone()[0]
+    opp = cursor.execute('''
+        SELECT CASE WHEN team_a = ? THEN team_b ELSE team_a END AS o FROM Games
+        WHERE team_a = ? OR team_b = ? GROUP BY o ORDER BY COUNT(*) DESC LIMIT 1''', (tid, tid, tid)).fetchone()[0]
+    pid = cursor.execute('''
+        SELECT p.id FROM Players p JOIN PlayerStats ps ON ps.player_id = p.id
+        WHERE p.team_id = ? GROUP BY p.id ORDER BY COUNT(*) DESC LIMIT 1''', (tid,)).fetchone()[0]
+    last_day = cursor.execute('SELECT MAX(played_at) FROM Games').fetchone()[0]
+    since = stats.since_days(30, datetime.date.fromisoformat(last_day[:10]))
+    prefix = cursor.execute('SELECT name FROM Teams WHERE id = ?', (tid,)).fetchone()[0][:3]
+
+    cases = [
+        ('leaderboard (elo)', lambda: stats.leaderboard(cursor, 'rating')),
+        ('leaderboard (victoires)', lambda: stats.leaderboard(cursor, 'wins')),
+        ('leaderboard (30 j)', lambda: stats.leaderboard(cursor, 'wins', since)),
+        ('team_winrates', lambda: stats.team_winrates(cursor)),
+        ('team_winrate_by_map', lambda: stats.team_winrate_by_map(cursor, tid)),
+        ('team_winrate_by_map (30 j)', lambda: stats.team_winrate_by_map(cursor, tid, since=since)),
+        ('players_kd', lambda: stats.players_kd(cursor, tid)),
+        ('players_kd (30 j)', lambda: stats.players_kd(cursor, tid, since)),
+        ('team_map_totals', lambda: stats.team_map_totals(cursor, tid)),
+        ('roster_stats', lambda: stats.roster_stats(cursor, tid)),
+        ('player_map_totals', lambda: stats.player_map_totals(cursor, pid)),
+        ('player_map_totals (30 j)', lambda: stats.player_map_totals(cursor, pid, since)),
+        ('head_to_head', lambda: stats.head_to_head(cursor, tid, opp)),
+        ('map_games', lambda: stats.map_games(cursor)),
+        ('ratings.history', lambda: ratings.history(cursor, tid)),
+        (f'search « {prefix} »', lambda: search.search(cursor, prefix)),
+    ]
+    if cursor.execute('SELECT 1 FROM GameRounds LIMIT 1').fetchone():
+        cases.append(('team_round_stats', lambda: rounds.team_round_stats(cursor, tid)))
+    row = cursor.execute('''
+        SELECT g.map_id FROM Games g JOIN GameEvents e ON e.game_id = g.id
+        GROUP BY g.map_id ORDER BY SUM(e.n) DESC LIMIT 1''').fetchone()
+    if row:
+        cases.append(('heatmap (rendu)', lambda: heatmaps.render(cursor, row[0])))
+        cases.append(('heatmap (équipe)', lambda: heatmaps.render(cursor, row[0], team_id=tid)))
+    out = os.path.join(tmp, 'export.csv')
+    for name in exports.REPORTS:
+        cases.append((f'export {name}', lambda n=name: exports.write_report(cursor, n, out)))
+    return cases
+
+
+# ----------------------------------------------------------------
+# screens_tour(app)
+# ----------------------------------------------------------------
+# Crochet de démarrage (STATTEAM_STARTUP_HOOK=bench:screens_tour), exécuté DANS
+# l’app : `app` est le module main. Visite scriptée en admin de l’accueil, de la
+# fiche de l’équipe la plus active, de son analyse et de la fiche de son joueur
+# le plus présent. Chaque tour part à froid (écrans et caches vidés), puis refait
+# la visite (écrans gardés). Temps = construction + dessin (update_idletasks) ;
+# les images chargées en arrière-plan (set_img_async) ne sont pas comptées.
+# Médianes → JSON (STATTEAM_SCREENS_OUT), puis on ferme l’app.
+def screens_tour(app, runs=3):
+    app.root.after(100, lambda: _screens_tour(app, os.environ['STATTEAM_SCREENS_OUT'], runs))
+
+
+def _screens_tour(app, out_path, runs):
+    app.current_role = 'admin'
+    cursor = app.cursor
+    row = cursor.execute('SELECT team_id FROM Matches GROUP BY team_id ORDER BY COUNT(*) DESC LIMIT 1').fetchone()
+    tid = row[0] if row else cursor.execute('SELECT MIN(id) FROM Teams').fetchone()[0]
+    row = cursor.execute('''
+        SELECT p.id FROM Players p LEFT JOIN PlayerStats ps ON ps.player_id = p.id
+        WHERE p.team_id = ? GROUP BY p.id ORDER BY COUNT(ps.match_id) DESC LIMIT 1''', (tid,)).fetchone()
+    steps = [('home', app.load_home)]
+    if tid is not None:
+        steps += [('team', lambda: app.open_team(tid)), ('analyse', lambda: app.analyse_team_interface(tid))]
+    if row:
+        steps.append(('player', lambda: app.open_player(row[0])))
+
+    times = {}
+    for _ in range(runs):
+        app.screens_mgr.clear(); app.chart_service.clear(); app.heatmap_service.clear()
+        for label in ('froid', 'retour'):
+            for name, show in steps:
+                t0 = time.perf_counter()
+                show()
+                app.root.update_idletasks()
+                times.setdefault(f'{name} ({label})', []).append((time.perf_counter() - t0) * 1000)
+            app.root.update()
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({name: round(statistics.median(ms), 2) for name, ms in times.items()}, f, ensure_ascii=False)
+    app.root.destroy()
+
+
+def _suite_screens(db_path, tmp):
+    """Lance main.py avec la visite screens_tour ; {écran: ms} ou {} si pas d’affichage."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = os.path.join(tmp, 'screens.json')
+    env = dict(os.environ, STATTEAM_DB=db_path, STATTEAM_STARTUP_HOOK='bench:screens_tour',
+               STATTEAM_SCREENS_OUT=out, STATTEAM_STARTUP_LOG=os.path.join(tmp, 'startup.log'))
+    with _display(env, 'écrans') as env:
+        if env is None:
+            return {}
+        res = subprocess.run([sys.executable, os.path.join(here, 'main.py')], env=env, cwd=here,
+                             capture_output=True, timeout=600)
+    if res.returncode != 0 or not os.path.exists(out):
+        print(f'écrans : échec ({res.stderr.decode(errors="replace").strip()[-200:]})')
+        return {}
+    with open(out, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.25, min_ms=REGRESSION_MIN_MS):
+    """[(section, nom, avant_ms, maintenant_ms), ...] des mesures en régression par rapport à `baseline`."""
+    slower = []
+    for section in SECTIONS:
+        for name, ms in results.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if before is not None and ms > before * (1 + threshold) and ms - before >= min_ms:
+                slower.append((section, name, before, ms))
+    return slower
+
+
+def report(results, json_path, baseline=None, save_baseline=False, threshold=0.25):
+    """Écrit `results` en JSON, les affiche face à la référence ; retourne la liste des régressions."""
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=1)
+    ref = {}
+    if baseline and os.path.exists(baseline) and not save_baseline:
+        with open(baseline, encoding='utf-8') as f:
+            ref = json.load(f)
+        counts = results['meta'].get('counts')
+        if counts and ref.get('meta', {}).get('counts') != counts:
+            print(f'attention : la référence {baseline} n’a pas été mesurée sur la même ligue')
+
+    print(f"{'mesure':>34} {'ms':>9} {'référence':>10}")
+    slower = compare(results, ref, threshold)
+    flagged = {(section, name) for section, name, _b, _m in slower}
+    for section in SECTIONS:
+        for name, ms in results.get(section, {}).items():
+            before = ref.get(section, {}).get(name)
+            flag = f'  ⚠ +{(ms / before - 1) * 100:.0f} %' if (section, name) in flagged else ''
+            ref_txt = f'{before:>10.2f}' if before is not None else f"{'-':>10}"
+            print(f'{name[:34]:>34} {ms:>9.2f} {ref_txt}{flag}')
+    print(f'résultats : {json_path}')
+    if save_baseline:
+        with open(baseline or 'bench_baseline.json', 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"référence enregistrée : {baseline or 'bench_baseline.json'}")
+    elif slower:
+        print(f'{len(slower)} régression(s) au-delà de {threshold * 100:.0f} %')
+    return slower
+
+
+def _meta(**extra):
+    return dict({'ts': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': sys.version.split()[0],
+                 'sqlite': sqlite3.sqlite_version}, **extra)
+
+
+def bench_suite(db_path=None, size='medium', json_path='bench_results.json', baseline=None,
+                save_baseline=False, threshold=0.25, exe=None):
+    """Toutes les requêtes, écrans et le démarrage, résultats en JSON ; retourne la liste des régressions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        if db_path is None:
+            teams, players, games = leaguegen.PRESETS[size]
+            db_path = os.path.join(tmp, f'{size}.db')
+            t0 = time.perf_counter()
+            leaguegen.generate(db_path, teams, players, games, end=SUITE_END, with_rounds=True,
+                               events_per_game=SUITE_EVENTS)
+            print(f'ligue {size} générée en {time.perf_counter() - t0:.1f} s')
+        conn, cursor = db.open_db(db_path)
+        counts = {table: cursor.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                  for table in ('Teams', 'Players', 'Games', 'PlayerStats', 'GameEvents')}
+        results = {
+            'meta': _meta(db=size if db_path.startswith(tmp) else db_path, counts=counts),
+            'queries': {name: round(_median_ms(fn), 3) for name, fn in suite_queries(cursor, tmp)},
+        }
+        conn.close()
+        results['screens'] = _suite_screens(db_path, tmp)
+        results['startup'] = bench_startup(SUITE_STARTUP_RUNS, exe, db_path)
+
+    print(f"suite : {' | '.join(f'{k} {v}' for k, v in counts.items())}")
+    return report(results, json_path, baseline, save_baseline, threshold)
+
+
+BENCHES = {
+    'plans': bench_plans,
+    'exports': bench_export_jobs,
+    'kd': bench_players_kd,
+    'profiles': bench_profiles,
+    'import': bench_import,
+    'startup': bench_startup,
+    'charts': bench_charts,
+    'windows': bench_windows,
+    'rounds': bench_rounds,
+    'heatmap': bench_heatmap,
+    'search': bench_search,
+    'suite': bench_suite,
+}
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Banc d’essai des requêtes StatTeam')
+    ap.add_argument('bench', nargs='*', choices=sorted(BENCHES), help='bancs à rouler (défaut : tous)')
+    ap.add_argument('--exe', help='startup / suite : exécutable PyInstaller à mesurer au lieu de main.py')
+    ap.add_argument('--runs', type=int, default=5, help='startup : nombre de lancements')
+    ap.add_argument('--db', help='suite / startup : BD à mesurer (sinon une ligue leaguegen générée)')
+    ap.add_argument('--size', choices=sorted(leaguegen.PRESETS), default='medium', help='suite : taille de la ligue')
+    ap.add_argument('--json', help='suite / startup : fichier des résultats '
+                                   '(défaut bench_results.json / bench_startup.json)')
+    ap.add_argument('--baseline', help='suite / startup : résultats de référence (JSON) à comparer')
+    ap.add_argument('--save-baseline', action='store_true', help='enregistrer ces résultats comme référence')
+    ap.add_argument('--threshold', type=float, default=0.25, help='écart signalé (0.25 = +25 %%)')
+    args = ap.parse_args()
+    regressions = []
+    # Sans argument, le démarrage est mesuré dans la suite (section « startup »)
+    for bench_name in args.bench or [name for name in BENCHES if name != 'startup']:
+        if bench_name == 'startup':
+            results = {'meta': _meta(exe=args.exe or 'main.py', db=args.db),
+                       'startup': bench_startup(args.runs, args.exe, args.db)}
+            regressions += report(results, args.json or 'bench_startup.json', args.baseline,
+                                  args.save_baseline, args.threshold)
+        elif bench_name == 'suite':
+            regressions += bench_suite(args.db, args.size, args.json or 'bench_results.json', args.baseline,
+                                       args.save_baseline, args.threshold, args.exe)
+        else:
+            BENCHES[bench_name]()
+    sys.exit(1 if regressions else 0)
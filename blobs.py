@@ -0,0 +1,165 @@
+# blobs.py
+# -----------------------------------------------------------------------------
+# Rôle : rangement des images par contenu (hash SHA-256)
+#        - store(src) : copie l’image dans images/ sous « <sha256>.<ext> » ;
+#          le même fichier choisi 2 fois (ou par 2 équipes) n’est stocké qu’une fois,
+#          et deux logo.png différents ne s’écrasent plus
+#        - Teams.logo, Players.logo et Maps.image contiennent ce nom
+#        - migrate(conn) : convertit une BD d’avant (noms d’origine → hash)
+#        - gc(db_paths) : supprime les images que plus aucune BD ne référence
+#          (+ leurs vignettes) et dit combien d’octets ont été libérés
+#
+# Les icônes de l’interface (thumbs.UI_IMAGES, + app.ico) gardent leur nom et
+# ne sont jamais supprimées.
+# -----------------------------------------------------------------------------
+
+import glob
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+
+import db
+from db import IMAGES_DIR
+import thumbs
+
+# Colonnes qui référencent une image
+IMAGE_COLUMNS = (('Teams', 'logo'), ('Players', 'logo'), ('Maps', 'image'))
+
+# Jamais ramassés par gc(), même avec legacy=True
+PROTECTED = frozenset(thumbs.UI_IMAGES) | {'app.ico'}
+
+_BLOB_RE = re.compile(r'^[0-9a-f]{64}(\.[a-z0-9]+)?$')
+
+
+def is_blob(name):
+    """Vrai si `name` est un nom d’image rangée par contenu."""
+    return bool(_BLOB_RE.match(name or ''))
+
+
+def file_hash(path):
+    """SHA-256 (hex) du fichier, lu par blocs de 1 Mo."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _existing(digest):
+    """Nom d’un blob déjà stocké avec ce hash (peu importe l’extension), sinon None."""
+    for path in glob.glob(os.path.join(IMAGES_DIR, digest + '*')):
+        name = os.path.basename(path)
+        if is_blob(name):
+            return name
+    return None
+
+
+# ----------------------------------------------------------------
+# store(src)
+# ----------------------------------------------------------------
+def store(src):
+    """
+    Range `src` dans images/ par contenu et retourne le nom à mettre en BD.
+    Si le contenu y est déjà : aucune copie. Lève OSError si `src` est illisible.
+    """
+    if os.path.dirname(os.path.abspath(src)) == os.path.abspath(IMAGES_DIR) \
+            and is_blob(os.path.basename(src)):
+        return os.path.basename(src)  # déjà rangé (ex. : fiche modifiée sans changer l’image)
+
+    digest = file_hash(src)
+    name = _existing(digest)
+    if name:
+        return name
+    ext = os.path.splitext(src)[1].lower()
+    name = digest + (ext if re.fullmatch(r'\.[a-z0-9]+', ext) else '')
+    dest = os.path.join(IMAGES_DIR, name)
+    tmp = dest + '.tmp'
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+    return name
+
+
+# ----------------------------------------------------------------
+# migrate(conn)
+# ----------------------------------------------------------------
+# BD d’avant le rangement par hash : chaque valeur qui n’est pas déjà un
+# blob est rangée (store) puis remplacée en BD. Un fichier introuvable
+# garde son ancien nom (load_img affichera le placeholder comme avant).
+# Les anciens fichiers restent : une autre BD peut encore y faire référence
+# (gc(..., legacy=True) pour les ramasser).
+# Une seule fois par BD : étape 14 de db.MIGRATIONS, dans sa transaction
+# (pas de commit ici).
+def migrate(conn):
+    """Convertit les références d’images de la BD en noms par hash. Retourne le nb de valeurs converties."""
+    converted = 0
+    renames = {}
+    cur = conn.cursor()
+    for table, col in IMAGE_COLUMNS:
+        olds = [r[0] for r in cur.execute(
+            f"SELECT DISTINCT {col} FROM {table} WHERE {col} IS NOT NULL AND {col} <> ''")]
+        for old in olds:
+            if is_blob(old):
+                continue
+            if old not in renames:
+                src = os.path.join(IMAGES_DIR, old)
+                try:
+                    renames[old] = store(src) if os.path.isfile(src) else None
+                except OSError:
+                    renames[old] = None
+            if renames[old]:
+                cur.execute(f'UPDATE {table} SET {col} = ? WHERE {col} = ?', (renames[old], old))
+                converted += 1
+    return converted
+
+
+# ----------------------------------------------------------------
+# gc(db_paths, dry_run=False, legacy=False)
+# ----------------------------------------------------------------
+# Le dossier images/ est partagé par toutes les BD (Créer / Charger base) :
+# on ne supprime que ce qu’AUCUNE des BD données ne référence.
+def referenced(db_paths):
+    """Ensemble des noms d’images référencés par les BD `db_paths`."""
+    names = set()
+    for path in db_paths:
+        conn, _cursor = db.open_readonly(path)
+        try:
+            for table, col in IMAGE_COLUMNS:
+                try:
+                    names.update(r[0] for r in conn.execute(f'SELECT {col} FROM {table}') if r[0])
+                except sqlite3.OperationalError:
+                    pass  # BD sans cette table
+        finally:
+            conn.close()
+    return names
+
+
+def gc(db_paths, dry_run=False, legacy=False):
+    """
+    Supprime de images/ les blobs non référencés (legacy=True : aussi les fichiers
+    aux noms d’origine), avec leurs vignettes.
+    Retourne {'files': [...], 'bytes': octets libérés (ou à libérer si dry_run)}.
+    """
+    keep = referenced(db_paths) | PROTECTED
+    removed, freed = [], 0
+    for entry in os.scandir(IMAGES_DIR):
+        if not entry.is_file() or entry.name in keep:
+            continue
+        if not (is_blob(entry.name) or (legacy and not entry.name.endswith('.tmp'))):
+            continue
+        paths = [entry.path] + [thumbs.thumb_path(entry.name, s) for s in thumbs.THUMB_SIZES]
+        for p in paths:
+            try:
+                size = os.path.getsize(p)
+            except OSError:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(p)
+                except OSError:
+                    continue
+            freed += size
+        removed.append(entry.name)
+    return {'files': sorted(removed), 'bytes': freed}
@@ -0,0 +1,161 @@
+# charts.py
+# -----------------------------------------------------------------------------
+# Rôle : graphiques de l’écran d’analyse sans refaire matplotlib à chaque visite
+#        - BarChart : UNE Figure par type de graphique, créée une fois ; quand les
+#          données changent on ne touche qu’aux hauteurs des barres (et aux
+#          étiquettes si elles changent). tight_layout() seulement si les
+#          étiquettes changent, et les marges calculées sont gardées par jeu
+#          d’étiquettes (revenir à une équipe déjà vue = simple subplots_adjust).
+#        - rendu hors écran (backend Agg) → image ; l’écran l’affiche dans un Label
+#        - ChartService : cache LRU des rendus, clé (type, id d’équipe, génération
+#          des données). Revisiter une équipe dont rien n’a changé = 0 matplotlib.
+#
+# La « génération » vient de main.py (screens_mgr.snapshot(...)) : elle change
+# à chaque écriture en BD dans un domaine dont dépend le graphique.
+# matplotlib n’est importé qu’à la première utilisation (voir startup).
+# -----------------------------------------------------------------------------
+
+import time
+from collections import OrderedDict
+
+# Même palette / couleurs que l’ancien écran d’analyse
+BG_COLOR = '#0f1115'
+TEXT_COLOR = 'lightgrey'
+VIBRANT_COLORS = ['#e6194B', '#3cb44b', '#ffe119', '#4363d8', '#f58231', '#911eb4', '#46f0f0', '#f032e6',
+                  '#bcf60c', '#fabebe', '#008080', '#e6beff', '#9A6324', '#fffac8', '#800000', '#aaffc3',
+                  '#808000', '#ffd8b1', '#000075', '#808080']
+
+# Rendus gardés (≈ 800 Ko chacun à 500×400)
+DEFAULT_LIMIT = 24
+
+# Marges (tight_layout) gardées par graphique, une par jeu d’étiquettes
+LAYOUT_LIMIT = 64
+
+
+class BarChart:
+    """Histogramme réutilisable : Figure + axes créés une fois, barres mises à jour sur place."""
+
+    def __init__(self, ylabel, figsize=(5, 4), dpi=100):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.figure.patch.set_facecolor(BG_COLOR)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_facecolor(BG_COLOR)
+        self.ax.set_ylabel(ylabel, color=TEXT_COLOR)
+        self.ax.tick_params(axis='x', colors=TEXT_COLOR)
+        self.ax.tick_params(axis='y', colors=TEXT_COLOR)
+        for spine in self.ax.spines.values():
+            spine.set_color(TEXT_COLOR)
+        self._bars = None
+        self._labels = None
+        self._margins = OrderedDict()   # tuple d’étiquettes → (left, bottom, right, top)
+        self.layouts = 0    # nb de tight_layout() (pour le bench)
+
+    def update(self, labels, values):
+        """Met les données dans la figure. Retourne True si tight_layout() a été refait."""
+        labels, values = list(labels), list(values)
+        if self._bars is not None and len(self._bars) == len(values):
+            for bar, v in zip(self._bars, values):
+                bar.set_height(v)
+        else:
+            if self._bars is not None:
+                self._bars.remove()
+            xs = list(range(len(values)))
+            colors = [VIBRANT_COLORS[i % len(VIBRANT_COLORS)] for i in range(len(values))]
+            self._bars = self.ax.bar(xs, values, color=colors)
+            self.ax.set_xticks(xs)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+        if labels == self._labels:
+            return False
+        self.ax.set_xticklabels(labels, rotation=45)
+        self._labels = labels
+        key = tuple(labels)
+        margins = self._margins.get(key)
+        if margins is not None:
+            self._margins.move_to_end(key)
+            self.figure.subplots_adjust(*margins)
+            return False
+        self.figure.tight_layout()
+        p = self.figure.subplotpars
+        self._margins[key] = (p.left, p.bottom, p.right, p.top)
+        while len(self._margins) > LAYOUT_LIMIT:
+            self._margins.popitem(last=False)
+        self.layouts += 1
+        return True
+
+    def render(self):
+        """Dessine la figure hors écran ; retourne une image PIL RGBA (copie)."""
+        from PIL import Image
+        self.canvas.draw()
+        w, h = self.canvas.get_width_height()
+        return Image.frombuffer('RGBA', (w, h), self.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).copy()
+
+
+class ChartService:
+    """
+    Rendus de graphiques en cache LRU, clé (type, id, génération).
+    make_image : conversion du rendu PIL (défaut : PhotoImage Tk ; le bench garde l’image PIL).
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT, make_image=None):
+        self.limit = limit
+        self.make_image = make_image
+        self._charts = {}                # type → BarChart
+        self._cache = OrderedDict()      # (type, id, génération) → image
+        self.hits = self.misses = 0
+        self.render_ms = 0.0             # temps total passé dans matplotlib
+
+    def register(self, kind, ylabel):
+        """Déclare un type de graphique (sa Figure n’est créée qu’au 1er rendu)."""
+        self._charts.setdefault(kind, ylabel)
+
+    def get(self, kind, key, generation, data):
+        """
+        Image du graphique `kind` pour `key` (ex. id d’équipe) à cette génération.
+        data() → (étiquettes, valeurs) n’est appelé qu’en cas de cache manqué.
+        """
+        ck = (kind, key, generation)
+        image = self._cache.get(ck)
+        if image is not None:
+            self._cache.move_to_end(ck)
+            self.hits += 1
+            return image
+        self.misses += 1
+
+        chart = self._charts[kind]
+        if not isinstance(chart, BarChart):
+            chart = self._charts[kind] = BarChart(chart)
+        t0 = time.perf_counter()
+        labels, values = data()
+        chart.update(labels, values)
+        rendered = chart.render()
+        self.render_ms += (time.perf_counter() - t0) * 1000
+
+        image = self._to_image(rendered)
+        self._cache[ck] = image
+        while len(self._cache) > self.limit:
+            self._cache.popitem(last=False)
+        return image
+
+    def _to_image(self, rendered):
+        if self.make_image is not None:
+            return self.make_image(rendered)
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(rendered)
+
+    def layouts(self):
+        """Nombre total de tight_layout() faits depuis le début."""
+        return sum(c.layouts for c in self._charts.values() if isinstance(c, BarChart))
+
+    def clear(self):
+        """Vide le cache des rendus (changement de BD)."""
+        self._cache.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._cache),
+                'layouts': self.layouts(), 'render_ms': round(self.render_ms, 1)}
@@ -0,0 +1,382 @@
+# cli.py
+# -----------------------------------------------------------------------------
+# Rôle : ligne de commande « sans écran » (pas de tkinter, PIL ni matplotlib)
+#        - leaderboard, win-rate des équipes, K/D des joueurs, face-à-face (h2h),
+#          stats par round d’une équipe (pistols, séries, remontées ; NumPy)
+#          (--days N / --since AAAA-MM-JJ : seulement cette fenêtre de temps)
+#        - les 3 rapports CSV (mêmes requêtes que le bouton Exporter)
+#        - import d’historique, recalcul des agrégats et de l’ELO
+#        - positions (events.py) : import, heatmap PNG d’une map (Pillow au besoin)
+#        - recherche d’équipes / joueurs / maps par nom (index FTS5, search.py)
+#        - images : vignettes, ménage des images orphelines (gc-images)
+#        - --profile-sql : temps de chaque requête, N+1 probables (sqlprof.py)
+# Tourne sur n’importe quel .db existant ; pratique pour un cron sur le serveur du
+# scoreboard (les commandes de lecture ouvrent la BD en lecture seule).
+#
+# Exemples :
+#   python -m cli --db statteam.db leaderboard
+#   python -m cli --db statteam.db teams --team "Faze Clan"
+#   python -m cli --db statteam.db h2h "Faze Clan" Liquid
+#   python -m cli --db statteam.db --days 30 players --team "Faze Clan"
+#   python -m cli --db statteam.db rounds --team "Faze Clan"
+#   python -m cli --db statteam.db players --csv
+#   python -m cli --db statteam.db export best_players rapport.csv
+#   python -m cli --db statteam.db search "faz si"
+#   python -m cli --db statteam.db heatmap Dust --team "Faze Clan" --type death -o morts.png
+#   python -m cli --db statteam.db --profile-sql players --team "Faze Clan"
+# -----------------------------------------------------------------------------
+
+import argparse
+import csv
+import os
+import sys
+
+import db
+import stats
+
+# Le module de chaque commande (images, import, heatmaps…) est importé dans
+# sa fonction cmd_* : `leaderboard` ne paie que db et stats au démarrage.
+
+
+# ----------------------------------------------------------------
+# Sortie : tableau aligné (défaut) ou CSV sur stdout (--csv)
+# ----------------------------------------------------------------
+def _print_table(header, rows, as_csv=False):
+    if as_csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(header)
+        writer.writerows(rows)
+        return
+    rows = [[str(c) for c in r] for r in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) for i, h in enumerate(header)]
+    print('  '.join(h.ljust(w) for h, w in zip(header, widths)))
+    for r in rows:
+        print('  '.join(c.ljust(w) for c, w in zip(r, widths)))
+
+
+def _team_id(cursor, ref):
+    """Accepte un id ou un nom d’équipe; lève SystemExit si introuvable."""
+    if ref.isdigit():
+        cursor.execute('SELECT id FROM Teams WHERE id = ?', (int(ref),))
+    else:
+        cursor.execute('SELECT id FROM Teams WHERE name = ?', (ref,))
+    r = cursor.fetchone()
+    if not r:
+        raise SystemExit(f'Équipe introuvable : {ref}')
+    return r[0]
+
+
+def _map_id(cursor, ref):
+    """Accepte un id ou un nom de map; lève SystemExit si introuvable."""
+    if ref.isdigit():
+        cursor.execute('SELECT id FROM Maps WHERE id = ?', (int(ref),))
+    else:
+        cursor.execute('SELECT id FROM Maps WHERE name = ?', (ref,))
+    r = cursor.fetchone()
+    if not r:
+        raise SystemExit(f'Map introuvable : {ref}')
+    return r[0]
+
+
+def _player_id(cursor, ref):
+    """Accepte un id ou un nom de joueur (le 1er trouvé si le nom est dans 2 équipes)."""
+    if ref.isdigit():
+        cursor.execute('SELECT id FROM Players WHERE id = ?', (int(ref),))
+    else:
+        cursor.execute('SELECT id FROM Players WHERE name = ? ORDER BY id', (ref,))
+    r = cursor.fetchone()
+    if not r:
+        raise SystemExit(f'Joueur introuvable : {ref}')
+    return r[0]
+
+
+# ----------------------------------------------------------------
+# Commandes
+# ----------------------------------------------------------------
+def cmd_leaderboard(cursor, args):
+    rows = stats.leaderboard(cursor, args.by, args.window)
+    if args.limit:
+        rows = rows[:args.limit]
+    if args.by == 'rating':
+        _print_table(['Rang', 'Équipe', 'Elo'],
+                     [(i, name, f'{r:.0f}') for i, (_tid, name, _logo, r) in enumerate(rows, 1)], args.csv)
+    else:
+        _print_table(['Rang', 'Équipe', 'Victoires'],
+                     [(i, name, wins) for i, (_tid, name, _logo, wins) in enumerate(rows, 1)], args.csv)
+
+
+def cmd_teams(cursor, args):
+    if args.team:
+        opponent = _team_id(cursor, args.vs) if args.vs else None
+        rows = stats.team_winrate_by_map(cursor, _team_id(cursor, args.team), opponent, args.window)
+        _print_table(['Map', 'Rounds_G', 'Rounds_P', 'WinRate_%'],
+                     [(name, w, l, f'{stats.win_rate(w, l):.1f}') for name, w, l in rows], args.csv)
+    else:
+        rows = stats.team_winrates(cursor, args.window)
+        _print_table(['Équipe', 'Rounds_G', 'Rounds_P', 'WinRate_%'],
+                     [(name, w, l, f'{stats.win_rate(w, l):.1f}') for _tid, name, w, l in rows], args.csv)
+
+
+def cmd_h2h(cursor, args):
+    rows = stats.head_to_head(cursor, _team_id(cursor, args.team), _team_id(cursor, args.opponent), args.window)
+    _print_table(['Map', 'Games', 'V', 'D', 'N', 'Rounds_G', 'Rounds_P'], rows, args.csv)
+
+
+def cmd_players(cursor, args):
+    team_id = _team_id(cursor, args.team) if args.team else None
+    rows = stats.roster_stats(cursor, team_id, args.window)
+    _print_table(['Joueur', 'Games', 'Kills', 'Deaths', 'KD'],
+                 [(name, games, k, d, f'{stats.kd_ratio(k, d):.2f}')
+                  for _pid, name, _logo, games, k, d, _b, _rw, _rl in rows], args.csv)
+
+
+def cmd_rounds(cursor, args):
+    import rounds
+    rows = rounds.team_round_stats(cursor, _team_id(cursor, args.team), args.window, args.deficit)
+    if not rows:
+        print('aucun round détaillé pour cette équipe (clé "rounds" de l’import NDJSON)', file=sys.stderr)
+        return
+    _print_table(rounds.ROUND_STATS_HEADER, [r[:-1] + (f'{r[-1]:.1f}',) for r in rows], args.csv)
+
+
+def cmd_export(cursor, args):
+    import exports
+    n = exports.write_report(cursor, args.report, args.output)
+    print(f"{exports.REPORTS[args.report]['title']} : {n} lignes → {args.output}", file=sys.stderr)
+
+
+def cmd_import(cursor, args):
+    import importer
+    res = importer.import_file(cursor.connection, args.file)
+    print(f"{res['games']} games, {res['player_stats']} lignes joueurs importées", file=sys.stderr)
+
+
+def cmd_import_events(cursor, args):
+    import events
+    res = events.ingest_file(cursor.connection, args.file)
+    print(f"{res['events']} événements importés ({res['games']} games)", file=sys.stderr)
+
+
+def cmd_heatmap(cursor, args):
+    import heatmaps
+    map_id = _map_id(cursor, args.map)
+    team_id = _team_id(cursor, args.team) if args.team else None
+    player_id = _player_id(cursor, args.player) if args.player else None
+    png, n = heatmaps.render(cursor, map_id, team_id, player_id, args.type, args.window)
+    with open(args.output, 'wb') as f:
+        f.write(png)
+    print(f'{n} événements → {args.output}', file=sys.stderr)
+
+
+def cmd_search(cursor, args):
+    import search
+    rows = search.search(cursor, ' '.join(args.query), args.kind or tuple(search.KINDS), args.limit)
+    _print_table(['Type', 'Id', 'Nom', 'Équipe'], [(k, i, n, t or '') for k, i, n, t in rows], args.csv)
+
+
+def cmd_rebuild_search(cursor, args):
+    import search
+    if search.rebuild(cursor.connection):
+        print('index de recherche recréé', file=sys.stderr)
+    else:
+        print('FTS5 absent de ce SQLite : la recherche reste en LIKE', file=sys.stderr)
+
+
+def cmd_rebuild_totals(cursor, args):
+    db.rebuild_totals(cursor.connection)
+    print('PlayerMapTotals et totaux par semaine recalculés', file=sys.stderr)
+
+
+def cmd_ratings(cursor, args):
+    import ratings
+    if args.team:
+        rows = ratings.history(cursor, _team_id(cursor, args.team))
+        _print_table(['Match', 'Adversaire', 'Avant', 'Après', 'Delta'],
+                     [(mid, opp, f'{a:.0f}', f'{b:.0f}', f'{d:+.1f}') for mid, opp, a, b, d in rows], args.csv)
+        return
+    settings = ratings.load_settings()
+    if args.k is not None:
+        settings['k_factor'] = args.k
+    if args.mov is not None:
+        settings['mov_weight'] = args.mov
+    n = ratings.rebuild(cursor.connection, settings)
+    print(f"ELO recalculé : {n} games (K={settings['k_factor']:g}, mov={settings['mov_weight']:g})",
+          file=sys.stderr)
+
+
+def cmd_thumbs(cursor, args):
+    import thumbs
+    if args.force:
+        names = thumbs.referenced_images(cursor)
+        n = sum(f.result() for f in [thumbs.build_async(name, force=True) for name in names])
+    else:
+        n = thumbs.migrate(cursor, wait=True)
+    print(f'{n} vignettes écrites dans {thumbs.THUMBS_DIR}', file=sys.stderr)
+
+
+def _fmt_bytes(n):
+    for unit in ('o', 'Ko', 'Mo'):
+        if n < 1024:
+            return f'{n:.0f} {unit}'
+        n /= 1024
+    return f'{n:.1f} Go'
+
+
+def cmd_gc_images(cursor, args):
+    import glob
+    import blobs
+    # images/ est partagé : on garde ce que la BD ouverte, les --keep-db, les
+    # autres .db du dossier de l’app ET toutes les BD que l’app a ouvertes
+    # (known_dbs.txt) référencent encore. Pas de migration ici : le ménage
+    # n’écrit rien dans les BD.
+    paths = {os.path.abspath(cursor.connection.execute('PRAGMA database_list').fetchone()[2])}
+    paths.update(os.path.abspath(p) for p in glob.glob(os.path.join(db.BASE_DIR, '*.db')))
+    paths.update(os.path.abspath(p) for p in args.keep_db)
+    missing = [p for p in db.known_dbs() if not os.path.isfile(p)]
+    paths.update(p for p in db.known_dbs() if os.path.isfile(p))
+    if missing:
+        print('BD connues introuvables (déplacées ? les redonner avec --keep-db) :', file=sys.stderr)
+        for p in missing:
+            print(f'  {p}', file=sys.stderr)
+    res = blobs.gc(sorted(paths), dry_run=args.dry_run, legacy=args.legacy)
+    for name in res['files']:
+        print(name)
+    verb = 'à libérer' if args.dry_run else 'libérés'
+    print(f"{len(res['files'])} images, {_fmt_bytes(res['bytes'])} {verb} "
+          f"(BD consultées : {len(paths)})", file=sys.stderr)
+
+
+def build_parser():
+    # Modules légers dont les options ont besoin (choix, défauts)
+    import events, exports, rounds, search
+    ap = argparse.ArgumentParser(prog='python -m cli', description='StatTeam en ligne de commande')
+    ap.add_argument('--db', default=None, help='fichier .db (défaut : dernière BD utilisée par l’app)')
+    ap.add_argument('--csv', action='store_true', help='sortie CSV sur stdout au lieu d’un tableau')
+    ap.add_argument('--profile-sql', action='store_true',
+                    help='profiler les requêtes (sqlprof.py) : résumé sur stderr à la fin')
+    window = ap.add_mutually_exclusive_group()
+    window.add_argument('--days', type=int, help='stats des N derniers jours (depuis le lundi de cette semaine-là)')
+    window.add_argument('--since', help='stats depuis AAAA-MM-JJ (ramené au lundi de la semaine)')
+    sub = ap.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('leaderboard', help='classement (matchs gagnés, ou cote ELO avec --by rating)')
+    p.add_argument('--limit', type=int, default=0)
+    p.add_argument('--by', choices=stats.LEADERBOARD_ORDERS, default='wins')
+    p.set_defaults(func=cmd_leaderboard, readonly=True)
+
+    p = sub.add_parser('teams', help='win-rate des équipes (ou par map avec --team)')
+    p.add_argument('--team', help='id ou nom : détail par map')
+    p.add_argument('--vs', help='avec --team : seulement les games contre cette équipe')
+    p.set_defaults(func=cmd_teams, readonly=True)
+
+    p = sub.add_parser('h2h', help='face-à-face de deux équipes, par map')
+    p.add_argument('team', help='id ou nom')
+    p.add_argument('opponent', help='id ou nom')
+    p.set_defaults(func=cmd_h2h, readonly=True)
+
+    p = sub.add_parser('players', help='K/D des joueurs (toute la ligue ou --team)')
+    p.add_argument('--team', help='id ou nom d’équipe')
+    p.set_defaults(func=cmd_players, readonly=True)
+
+    p = sub.add_parser('rounds', help='stats par round d’une équipe, par map (imports avec "rounds")')
+    p.add_argument('--team', required=True, help='id ou nom d’équipe')
+    p.add_argument('--deficit', type=int, default=rounds.COMEBACK_DEFICIT,
+                   help='retard (en rounds) qui compte comme « menée » pour les remontées')
+    p.set_defaults(func=cmd_rounds, readonly=True)
+
+    p = sub.add_parser('export', help='rapport CSV (comme le bouton Exporter)')
+    p.add_argument('report', choices=sorted(exports.REPORTS))
+    p.add_argument('output', help='fichier .csv à écrire')
+    p.set_defaults(func=cmd_export, readonly=True)
+
+    p = sub.add_parser('import', help='importer un historique CSV / NDJSON')
+    p.add_argument('file')
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('import-events', help='importer des positions (kills, morts, bombes) NDJSON / CSV')
+    p.add_argument('file')
+    p.set_defaults(func=cmd_import_events)
+
+    p = sub.add_parser('heatmap', help='heatmap PNG des positions sur une map')
+    p.add_argument('map', help='id ou nom de map')
+    who = p.add_mutually_exclusive_group()
+    who.add_argument('--team', help='id ou nom : seulement les joueurs de cette équipe')
+    who.add_argument('--player', help='id ou nom de joueur')
+    p.add_argument('--type', choices=sorted(events.KINDS), help='un seul type d’événement (défaut : tous)')
+    p.add_argument('-o', '--output', default='heatmap.png', help='fichier .png à écrire')
+    p.set_defaults(func=cmd_heatmap, readonly=True)
+
+    p = sub.add_parser('search', help='chercher une équipe / un joueur / une map par nom (préfixes de mots)')
+    p.add_argument('query', nargs='+')
+    p.add_argument('--kind', action='append', choices=sorted(search.KINDS), help='seulement ce type (répétable)')
+    p.add_argument('--limit', type=int, default=20)
+    p.set_defaults(func=cmd_search, readonly=True)
+
+    p = sub.add_parser('rebuild-search', help='recréer l’index de recherche (FTS5)')
+    p.set_defaults(func=cmd_rebuild_search)
+
+    p = sub.add_parser('rebuild-totals', help='recalculer PlayerMapTotals et les totaux par semaine')
+    p.set_defaults(func=cmd_rebuild_totals)
+
+    p = sub.add_parser('ratings', help='rejouer tout l’ELO (ou historique d’une équipe avec --team)')
+    p.add_argument('--team', help='id ou nom : historique de ses cotes, sans recalcul')
+    p.add_argument('--k', type=float, help='facteur K (défaut : statteam.ini ou 32)')
+    p.add_argument('--mov', type=float, help='poids de l’écart de rounds (0 = ELO classique)')
+    p.set_defaults(func=cmd_ratings)
+
+    p = sub.add_parser('thumbs', help='générer les vignettes manquantes (images/.thumbs)')
+    p.add_argument('--force', action='store_true', help='tout régénérer')
+    p.set_defaults(func=cmd_thumbs)
+
+    p = sub.add_parser('gc-images', help='supprimer les images que plus aucune BD ne référence')
+    p.add_argument('--dry-run', action='store_true', help='lister seulement, ne rien supprimer')
+    p.add_argument('--legacy', action='store_true',
+                   help='aussi les fichiers aux noms d’origine (d’avant le rangement par hash)')
+    p.add_argument('--keep-db', action='append', default=[], metavar='FICHIER.db',
+                   help='autre BD dont les images doivent être gardées (répétable)')
+    p.set_defaults(func=cmd_gc_images, readonly=True)
+    return ap
+
+
+# Les commandes de lecture (readonly=True) ouvrent la BD en lecture seule :
+# ni migration ni écriture sur la BD du serveur du scoreboard. Elle doit donc
+# déjà être à jour (ouverte une fois par l’app ou une commande d’écriture).
+def _open(path, readonly):
+    if not readonly:
+        return db.open_db(path)
+    conn, cursor = db.open_readonly(path)
+    version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    if version < db.SCHEMA_VERSION:
+        conn.close()
+        raise SystemExit(f'BD en version {version} (attendue : {db.SCHEMA_VERSION}) : l’ouvrir une fois '
+                         f'avec l’app ou une commande d’écriture (ex. rebuild-totals) pour la migrer')
+    return conn, cursor
+
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    try:
+        args.window = stats.week_of(args.since) if args.since else stats.since_days(args.days)
+    except ValueError:
+        ap.error(f'date invalide : {args.since} (AAAA-MM-JJ)')
+    if args.profile_sql:
+        import sqlprof
+        sqlprof.enable(sqlprof.load_settings(db.CONFIG_FILE))
+    path = args.db or db.CURRENT_DB_PATH
+    # Pas de BD créée (vide) sur une faute de frappe : un cron doit échouer
+    if not os.path.isfile(path):
+        raise SystemExit(f'BD introuvable : {path}')
+    conn, cursor = _open(path, getattr(args, 'readonly', False))
+    try:
+        args.func(cursor, args)
+    finally:
+        conn.close()
+        # sqlprof n’est importé que si le profilage est allumé (--profile-sql ou statteam.ini)
+        prof = sys.modules.get('sqlprof')
+        if prof and prof.profiler():
+            prof.profiler().dump(sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
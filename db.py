@@ -1,14 +1,20 @@
 # db.py
 # -----------------------------------------------------------------------------
 # Rôle : tout ce qui touche la base de données
-#        - chemins (BASE_DIR, DB_PATH, IMAGES_DIR, LAST_DB_FILE)
-#        - schéma SQL (SCHEMA)
-#        - helpers de connexion (connect, reconnect)
+#        - chemins (BASE_DIR, DB_PATH, IMAGES_DIR, LAST_DB_FILE, KNOWN_DBS_FILE)
+#        - schéma SQL (SCHEMA) + migrations versionnées (MIGRATIONS, migrate)
+#        - agrégats tenus par triggers (PlayerMapTotals, totaux par semaine)
+#        - profil de connexion (PRAGMA : WAL, mmap, cache…) surchargeable par statteam.ini
+#        - helpers de connexion (connect, reconnect, backup)
+#        - profilage SQL au besoin (sqlprof.py, [sqlprof] de statteam.ini ; importé
+#          seulement s’il est allumé)
 # -----------------------------------------------------------------------------
 
 import sqlite3
 import os
 import sys
+import configparser
+import pathlib
 
 # ───────────────────────── PATHS / DB ──────────────────────────
 # Truc simple : si on est dans un .exe, on prend le dossier de l’exe,
@@ -23,10 +29,15 @@ else:
 DB_PATH = os.path.join(BASE_DIR, 'statteam.db')
 IMAGES_DIR = os.path.join(BASE_DIR, 'images')
 LAST_DB_FILE = os.path.join(BASE_DIR, 'last_db.txt')
+# Toutes les BD que l’app a ouvertes (une par ligne) : images/ est partagé,
+# gc-images garde les images de chacune, où qu’elle soit rangée.
+KNOWN_DBS_FILE = os.path.join(BASE_DIR, 'known_dbs.txt')
+# Réglages optionnels (profil de connexion SQLite). Absent = valeurs par défaut.
+CONFIG_FILE = os.path.join(BASE_DIR, 'statteam.ini')
 
 # ────────────────────────── SCHEMA ─────────────────────────────
 # NOTE IMPORTANTE:
-# - On garde le schéma dans un gros string SQL et on l’applique avec executescript().
+# - On garde le schéma dans un gros string SQL; c’est la migration n° 1 (voir MIGRATIONS).
 # - Toutes les FOREIGN KEY ont ON DELETE CASCADE → si tu supprimes une équipe,
 #   ça nettoie les joueurs/matchs/stats liés automatiquement. Propre.
 # - Index unique uq_teamowners_captain pour imposer « un capitaine = une seule équipe ».
@@ -106,43 +117,810 @@ def get_last_db():
     return DB_PATH
 
 
-# Chemin courant vers la BD (peut changer si l’usager en ouvre une autre)
-CURRENT_DB_PATH = get_last_db()
+def known_dbs():
+    """Chemins (absolus) de KNOWN_DBS_FILE, y compris ceux qui n’existent plus."""
+    if not os.path.exists(KNOWN_DBS_FILE):
+        return []
+    with open(KNOWN_DBS_FILE, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def remember_db(path):
+    """Ajoute `path` à KNOWN_DBS_FILE (s’il n’y est pas déjà)."""
+    path = os.path.abspath(path)
+    if path in known_dbs():
+        return
+    try:
+        with open(KNOWN_DBS_FILE, 'a', encoding='utf-8') as f:
+            f.write(path + '\n')
+    except OSError:
+        # Dossier de l’app en lecture seule : pas grave pour ouvrir la BD.
+        pass
+
+
+# Chemin courant vers la BD (peut changer si l’usager en ouvre une autre).
+# STATTEAM_DB : ouvrir cette BD sans toucher à last_db.txt (bench.py suite).
+CURRENT_DB_PATH = os.environ.get('STATTEAM_DB') or get_last_db()
 
 # S’assurer que le dossier d’images existe pour éviter des erreurs bêtes.
 os.makedirs(IMAGES_DIR, exist_ok=True)
 
 
+# ──────────────────── PROFIL DE CONNEXION ──────────────────────
+# Avant : juste PRAGMA foreign_keys. Donc journal « rollback », fsync complet
+# à chaque commit (chaque match enregistré) et les lectures bloquaient l’écriture.
+# Maintenant chaque connexion reçoit un profil de PRAGMA :
+# - journal_mode : WAL = lecteurs et écrivain ne se bloquent plus
+# - synchronous  : NORMAL suffit en WAL (pas de corruption, au pire le dernier commit saute si panne de courant)
+# - mmap_size    : lecture via mémoire mappée (octets)
+# - cache_size   : négatif = en Kio (-32000 ≈ 32 Mo)
+# - temp_store   : MEMORY pour les tris/GROUP BY temporaires
+# - busy_timeout : ms d’attente si un autre process tient le verrou
+#
+# Surcharge possible dans statteam.ini (à côté de l’app), par exemple :
+#     [sqlite]
+#     profile = sur
+#     mmap_size = 0
+PROFILES = {
+    # Profil normal de l’app
+    'defaut': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -32000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Prudent : BD sur clé USB / dossier réseau (WAL n’aime pas les partages réseau)
+    'sur': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -8000,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # Comportement d’origine de SQLite (utile pour comparer dans bench.py)
+    'sqlite': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -2000,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 0,
+    },
+}
+DEFAULT_PROFILE = 'defaut'
+
+# Valeurs permises pour les PRAGMA « texte » (on les colle dans le SQL, donc on filtre).
+_PRAGMA_CHOICES = {
+    'journal_mode': {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'},
+    'synchronous': {'OFF', 'NORMAL', 'FULL', 'EXTRA'},
+    'temp_store': {'DEFAULT', 'FILE', 'MEMORY'},
+}
+
+
 # ----------------------------------------------------------------
-# connect()
+# load_profile(config_file)
 # ----------------------------------------------------------------
-# Connexion initiale : on ouvre la BD courante, on active les FK
-# et on applique le schéma.
-def connect():
+# Profil nommé (ou 'defaut') + surcharges clé par clé depuis [sqlite].
+# Une valeur invalide dans le .ini est ignorée : on garde celle du profil
+# plutôt que d’empêcher l’app de démarrer.
+def load_profile(config_file=None):
+    """Retourne le dict de PRAGMA à appliquer, selon CONFIG_FILE (ou `config_file`)."""
+    parser = configparser.ConfigParser()
+    parser.read(config_file or CONFIG_FILE, encoding='utf-8')
+    section = parser['sqlite'] if parser.has_section('sqlite') else {}
+
+    name = section.get('profile', DEFAULT_PROFILE).strip().lower()
+    profile = dict(PROFILES.get(name, PROFILES[DEFAULT_PROFILE]))
+
+    for key, current in profile.items():
+        raw = section.get(key)
+        if raw is None:
+            continue
+        raw = raw.strip()
+        if isinstance(current, int):
+            try:
+                profile[key] = int(raw)
+            except ValueError:
+                pass
+        elif raw.upper() in _PRAGMA_CHOICES[key]:
+            profile[key] = raw.upper()
+    return profile
+
+
+# ----------------------------------------------------------------
+# apply_profile(conn, profile)
+# ----------------------------------------------------------------
+def apply_profile(conn, profile):
+    """Applique les PRAGMA du profil sur `conn` (avant toute transaction)."""
+    conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+    conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+    conn.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+
+
+# ─────────────────── AGRÉGATS JOUEUR × MAP ─────────────────────
+# La fiche joueur (et le bouton « Copier ») veulent, pour chaque map :
+# games, kills, deaths, bombs, rounds gagnés/perdus. Avant, c’était une
+# requête par map qui relisait PlayerStats au complet. Ici on garde les
+# totaux à jour dans PlayerMapTotals avec des triggers SQLite, et la fiche
+# lit juste une plage de la clé primaire (player_id, map_id).
+#
+# Petits pièges gérés :
+# - Quand on supprime un match, la cascade vide PlayerStats APRÈS que la
+#   ligne Matches soit partie → le trigger de PlayerStats ne retrouve plus
+#   la map. Donc c’est un BEFORE DELETE sur Matches qui retire la contribution,
+#   et le trigger de PlayerStats devient un no-op dans ce cas-là.
+# - Une ligne qui tombe à 0 game est supprimée (pas de fantômes) : seulement
+#   la ligne touchée, jamais un scan de la table.
+
+# Recalcule tout à partir de zéro (migration initiale + rebuild_player_map_totals).
+REBUILD_PLAYER_MAP_TOTALS = '''
+DELETE FROM PlayerMapTotals;
+INSERT INTO PlayerMapTotals(player_id, map_id, games, kills, deaths, bombs, rounds_won, rounds_lost)
+SELECT ps.player_id, m.map_id, COUNT(*),
+       COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0), COALESCE(SUM(ps.bombs),0),
+       COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
+FROM PlayerStats ps
+JOIN Matches m ON m.id = ps.match_id
+GROUP BY ps.player_id, m.map_id;
+'''
+
+# Ajoute (sign=+) ou retire (sign=-) une ligne PlayerStats `{r}` (NEW/OLD).
+def _pmt_line(r, sign):
+    return f'''
+    INSERT OR IGNORE INTO PlayerMapTotals(player_id, map_id)
+        SELECT {r}.player_id, map_id FROM Matches WHERE id = {r}.match_id;
+    UPDATE PlayerMapTotals SET
+        games       = games {sign} 1,
+        kills       = kills {sign} COALESCE({r}.kills, 0),
+        deaths      = deaths {sign} COALESCE({r}.deaths, 0),
+        bombs       = bombs {sign} COALESCE({r}.bombs, 0),
+        rounds_won  = rounds_won {sign} (SELECT COALESCE(rounds_won, 0) FROM Matches WHERE id = {r}.match_id),
+        rounds_lost = rounds_lost {sign} (SELECT COALESCE(rounds_lost, 0) FROM Matches WHERE id = {r}.match_id)
+    WHERE player_id = {r}.player_id
+      AND map_id = (SELECT map_id FROM Matches WHERE id = {r}.match_id);'''
+
+# Ajoute/retire toutes les lignes PlayerStats d’un match `{r}` (NEW/OLD de Matches).
+def _pmt_match(r, sign):
+    def agg(expr):
+        return (f'(SELECT {expr} FROM PlayerStats ps WHERE ps.match_id = {r}.id '
+                f'AND ps.player_id = PlayerMapTotals.player_id)')
+    return f'''
+    INSERT OR IGNORE INTO PlayerMapTotals(player_id, map_id)
+        SELECT DISTINCT player_id, {r}.map_id FROM PlayerStats WHERE match_id = {r}.id;
+    UPDATE PlayerMapTotals SET
+        games       = games {sign} {agg('COUNT(*)')},
+        kills       = kills {sign} {agg('COALESCE(SUM(ps.kills), 0)')},
+        deaths      = deaths {sign} {agg('COALESCE(SUM(ps.deaths), 0)')},
+        bombs       = bombs {sign} {agg('COALESCE(SUM(ps.bombs), 0)')},
+        rounds_won  = rounds_won {sign} {agg('COUNT(*)')} * COALESCE({r}.rounds_won, 0),
+        rounds_lost = rounds_lost {sign} {agg('COUNT(*)')} * COALESCE({r}.rounds_lost, 0)
+    WHERE map_id = {r}.map_id
+      AND player_id IN (SELECT player_id FROM PlayerStats WHERE match_id = {r}.id);'''
+
+# Lignes tombées à 0 game : seulement celles que le trigger vient de toucher
+# (un DELETE sans la clé = un scan de toute la table par ligne en cascade).
+def _pmt_cleanup_line(r):
+    return (f'DELETE FROM PlayerMapTotals WHERE player_id = {r}.player_id AND games <= 0 '
+            f'AND map_id = (SELECT map_id FROM Matches WHERE id = {r}.match_id);')
+
+def _pmt_cleanup_match(r):
+    return (f'DELETE FROM PlayerMapTotals WHERE map_id = {r}.map_id AND games <= 0 '
+            f'AND player_id IN (SELECT player_id FROM PlayerStats WHERE match_id = {r}.id);')
+
+# Les triggers, un par entrée (nom → DDL) pour pouvoir les suspendre/recréer
+# pendant un import en lot (voir suspend_totals).
+_PMT_TRIGGERS = {
+    'trg_pmt_stats_insert': f'''
+CREATE TRIGGER IF NOT EXISTS trg_pmt_stats_insert AFTER INSERT ON PlayerStats BEGIN
+    {_pmt_line('NEW', '+')}
+END''',
+    'trg_pmt_stats_delete': f'''
+CREATE TRIGGER IF NOT EXISTS trg_pmt_stats_delete AFTER DELETE ON PlayerStats BEGIN
+    {_pmt_line('OLD', '-')}
+    {_pmt_cleanup_line('OLD')}
+END''',
+    'trg_pmt_stats_update': f'''
+CREATE TRIGGER IF NOT EXISTS trg_pmt_stats_update AFTER UPDATE ON PlayerStats BEGIN
+    {_pmt_line('OLD', '-')}
+    {_pmt_line('NEW', '+')}
+    {_pmt_cleanup_line('OLD')}
+END''',
+    'trg_pmt_matches_update': f'''
+CREATE TRIGGER IF NOT EXISTS trg_pmt_matches_update
+AFTER UPDATE OF map_id, rounds_won, rounds_lost ON Matches BEGIN
+    {_pmt_match('OLD', '-')}
+    {_pmt_match('NEW', '+')}
+    {_pmt_cleanup_match('OLD')}
+END''',
+    'trg_pmt_matches_delete': f'''
+CREATE TRIGGER IF NOT EXISTS trg_pmt_matches_delete BEFORE DELETE ON Matches BEGIN
+    {_pmt_match('OLD', '-')}
+    {_pmt_cleanup_match('OLD')}
+END''',
+}
+
+PLAYER_MAP_TOTALS = '''
+CREATE TABLE IF NOT EXISTS PlayerMapTotals(
+    player_id INTEGER NOT NULL,
+    map_id INTEGER NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    kills INTEGER NOT NULL DEFAULT 0,
+    deaths INTEGER NOT NULL DEFAULT 0,
+    bombs INTEGER NOT NULL DEFAULT 0,
+    rounds_won INTEGER NOT NULL DEFAULT 0,
+    rounds_lost INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(player_id, map_id),
+    FOREIGN KEY(player_id) REFERENCES Players(id) ON DELETE CASCADE,
+    FOREIGN KEY(map_id) REFERENCES Maps(id) ON DELETE CASCADE) WITHOUT ROWID;
+
+''' + ';\n'.join(_PMT_TRIGGERS.values()) + ';\n' + REBUILD_PLAYER_MAP_TOTALS
+
+# Étape 12 : triggers recréés avec le nettoyage ciblé (ceux de l’étape 3 ont
+# le même nom, d’où le DROP) et index de la cascade sur Maps.
+PMT_CLEANUP_FIX = ''.join(f'DROP TRIGGER IF EXISTS {name};\n' for name in _PMT_TRIGGERS) \
+    + ';\n'.join(_PMT_TRIGGERS.values()) + ''';
+CREATE INDEX IF NOT EXISTS idx_pmt_map ON PlayerMapTotals(map_id);
+ANALYZE PlayerMapTotals;
+'''
+
+# ────────────────── AGRÉGATS PAR SEMAINE ───────────────────────
+# Fenêtres de temps (« 30 derniers jours », « ce split ») : chaque match a une
+# date (Matches.played_at) et on tient, comme PlayerMapTotals, des totaux
+# rangés par semaine :
+# - PlayerWeekTotals(player_id, week, map_id) : fiche joueur, roster, K/D
+# - TeamWeekTotals(team_id, week, map_id)     : win-rate, fiche d’équipe, leaderboard
+# Une fenêtre = la somme des semaines >= celle de départ : une plage de la clé
+# primaire, jamais un scan de PlayerStats ou de Matches (voir stats.py).
+# week = lundi de la semaine ('AAAA-MM-JJ') ; '' pour un match sans date
+# (ceux d’avant) : il ne compte que dans « Tout ».
+# Nettoyage des lignes à 0 game ciblé sur la clé (pas un scan par trigger).
+def week_sql(expr):
+    """Expression SQL : lundi de la semaine de `expr` (un played_at), ou ''."""
+    return f"COALESCE(date({expr}, 'weekday 0', '-6 days'), '')"
+
+
+REBUILD_WEEK_TOTALS = f"""
+DELETE FROM PlayerWeekTotals;
+INSERT INTO PlayerWeekTotals(player_id, week, map_id, games, kills, deaths, bombs, rounds_won, rounds_lost)
+SELECT ps.player_id, {week_sql('m.played_at')}, m.map_id, COUNT(*),
+       COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0), COALESCE(SUM(ps.bombs),0),
+       COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
+FROM PlayerStats ps
+JOIN Matches m ON m.id = ps.match_id
+GROUP BY 1, 2, 3;
+DELETE FROM TeamWeekTotals;
+INSERT INTO TeamWeekTotals(team_id, week, map_id, games, wins, rounds_won, rounds_lost)
+SELECT team_id, {week_sql('played_at')}, map_id, COUNT(*),
+       SUM(COALESCE(rounds_won,0) > COALESCE(rounds_lost,0)),
+       COALESCE(SUM(rounds_won),0), COALESCE(SUM(rounds_lost),0)
+FROM Matches
+GROUP BY 1, 2, 3;
+"""
+
+# Ajoute (sign=+) ou retire (sign=-) une ligne PlayerStats `{r}` (NEW/OLD).
+def _pwt_line(r, sign):
+    key = f'(SELECT {week_sql("played_at")}, map_id FROM Matches WHERE id = {r}.match_id)'
+    create = f"""
+    INSERT OR IGNORE INTO PlayerWeekTotals(player_id, week, map_id)
+        SELECT {r}.player_id, {week_sql('played_at')}, map_id FROM Matches WHERE id = {r}.match_id;""" \
+        if sign == '+' else ''
+    return create + f"""
+    UPDATE PlayerWeekTotals SET
+        games       = games {sign} 1,
+        kills       = kills {sign} COALESCE({r}.kills, 0),
+        deaths      = deaths {sign} COALESCE({r}.deaths, 0),
+        bombs       = bombs {sign} COALESCE({r}.bombs, 0),
+        rounds_won  = rounds_won {sign} (SELECT COALESCE(rounds_won, 0) FROM Matches WHERE id = {r}.match_id),
+        rounds_lost = rounds_lost {sign} (SELECT COALESCE(rounds_lost, 0) FROM Matches WHERE id = {r}.match_id)
+    WHERE player_id = {r}.player_id AND (week, map_id) = {key};"""
+
+# Ajoute/retire toutes les lignes PlayerStats d’un match `{r}` (NEW/OLD de Matches).
+def _pwt_match(r, sign):
+    week = week_sql(f'{r}.played_at')
+    def agg(expr):
+        return (f'(SELECT {expr} FROM PlayerStats ps WHERE ps.match_id = {r}.id '
+                f'AND ps.player_id = PlayerWeekTotals.player_id)')
+    create = f"""
+    INSERT OR IGNORE INTO PlayerWeekTotals(player_id, week, map_id)
+        SELECT DISTINCT player_id, {week}, {r}.map_id FROM PlayerStats WHERE match_id = {r}.id;""" \
+        if sign == '+' else ''
+    return create + f"""
+    UPDATE PlayerWeekTotals SET
+        games       = games {sign} {agg('COUNT(*)')},
+        kills       = kills {sign} {agg('COALESCE(SUM(ps.kills), 0)')},
+        deaths      = deaths {sign} {agg('COALESCE(SUM(ps.deaths), 0)')},
+        bombs       = bombs {sign} {agg('COALESCE(SUM(ps.bombs), 0)')},
+        rounds_won  = rounds_won {sign} {agg('COUNT(*)')} * COALESCE({r}.rounds_won, 0),
+        rounds_lost = rounds_lost {sign} {agg('COUNT(*)')} * COALESCE({r}.rounds_lost, 0)
+    WHERE week = {week} AND map_id = {r}.map_id
+      AND player_id IN (SELECT player_id FROM PlayerStats WHERE match_id = {r}.id);"""
+
+# Ajoute/retire un côté de match `{r}` (NEW/OLD de Matches) dans TeamWeekTotals.
+def _twt_match(r, sign):
+    week = week_sql(f'{r}.played_at')
+    create = f"""
+    INSERT OR IGNORE INTO TeamWeekTotals(team_id, week, map_id) VALUES ({r}.team_id, {week}, {r}.map_id);""" \
+        if sign == '+' else ''
+    return create + f"""
+    UPDATE TeamWeekTotals SET
+        games       = games {sign} 1,
+        wins        = wins {sign} (COALESCE({r}.rounds_won, 0) > COALESCE({r}.rounds_lost, 0)),
+        rounds_won  = rounds_won {sign} COALESCE({r}.rounds_won, 0),
+        rounds_lost = rounds_lost {sign} COALESCE({r}.rounds_lost, 0)
+    WHERE team_id = {r}.team_id AND week = {week} AND map_id = {r}.map_id;"""
+
+def _pwt_cleanup_player(r):
+    return f'DELETE FROM PlayerWeekTotals WHERE player_id = {r}.player_id AND games <= 0;'
+
+def _pwt_cleanup_match(r):
+    return (f'DELETE FROM PlayerWeekTotals WHERE games <= 0 '
+            f'AND player_id IN (SELECT player_id FROM PlayerStats WHERE match_id = {r}.id);')
+
+def _twt_cleanup(r):
+    return f'DELETE FROM TeamWeekTotals WHERE team_id = {r}.team_id AND games <= 0;'
+
+_WEEK_TRIGGERS = {
+    'trg_pwt_stats_insert': f"""
+CREATE TRIGGER IF NOT EXISTS trg_pwt_stats_insert AFTER INSERT ON PlayerStats BEGIN
+    {_pwt_line('NEW', '+')}
+END""",
+    'trg_pwt_stats_delete': f"""
+CREATE TRIGGER IF NOT EXISTS trg_pwt_stats_delete AFTER DELETE ON PlayerStats BEGIN
+    {_pwt_line('OLD', '-')}
+    {_pwt_cleanup_player('OLD')}
+END""",
+    'trg_pwt_stats_update': f"""
+CREATE TRIGGER IF NOT EXISTS trg_pwt_stats_update AFTER UPDATE ON PlayerStats BEGIN
+    {_pwt_line('OLD', '-')}
+    {_pwt_line('NEW', '+')}
+    {_pwt_cleanup_player('OLD')}
+END""",
+    'trg_pwt_matches_update': f"""
+CREATE TRIGGER IF NOT EXISTS trg_pwt_matches_update
+AFTER UPDATE OF map_id, rounds_won, rounds_lost, played_at ON Matches BEGIN
+    {_pwt_match('OLD', '-')}
+    {_pwt_match('NEW', '+')}
+    {_pwt_cleanup_match('OLD')}
+END""",
+    'trg_pwt_matches_delete': f"""
+CREATE TRIGGER IF NOT EXISTS trg_pwt_matches_delete BEFORE DELETE ON Matches BEGIN
+    {_pwt_match('OLD', '-')}
+    {_pwt_cleanup_match('OLD')}
+END""",
+    'trg_twt_matches_insert': f"""
+CREATE TRIGGER IF NOT EXISTS trg_twt_matches_insert AFTER INSERT ON Matches BEGIN
+    {_twt_match('NEW', '+')}
+END""",
+    'trg_twt_matches_delete': f"""
+CREATE TRIGGER IF NOT EXISTS trg_twt_matches_delete AFTER DELETE ON Matches BEGIN
+    {_twt_match('OLD', '-')}
+    {_twt_cleanup('OLD')}
+END""",
+    'trg_twt_matches_update': f"""
+CREATE TRIGGER IF NOT EXISTS trg_twt_matches_update
+AFTER UPDATE OF team_id, map_id, rounds_won, rounds_lost, played_at ON Matches BEGIN
+    {_twt_match('OLD', '-')}
+    {_twt_match('NEW', '+')}
+    {_twt_cleanup('OLD')}
+END""",
+}
+
+WEEK_TOTALS = """
+ALTER TABLE Matches ADD COLUMN played_at TEXT;
+ALTER TABLE Games ADD COLUMN played_at TEXT;
+CREATE INDEX IF NOT EXISTS idx_matches_played ON Matches(played_at);
+
+CREATE TABLE IF NOT EXISTS PlayerWeekTotals(
+    player_id INTEGER NOT NULL,
+    week TEXT NOT NULL,
+    map_id INTEGER NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    kills INTEGER NOT NULL DEFAULT 0,
+    deaths INTEGER NOT NULL DEFAULT 0,
+    bombs INTEGER NOT NULL DEFAULT 0,
+    rounds_won INTEGER NOT NULL DEFAULT 0,
+    rounds_lost INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(player_id, week, map_id),
+    FOREIGN KEY(player_id) REFERENCES Players(id) ON DELETE CASCADE,
+    FOREIGN KEY(map_id) REFERENCES Maps(id) ON DELETE CASCADE) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS TeamWeekTotals(
+    team_id INTEGER NOT NULL,
+    week TEXT NOT NULL,
+    map_id INTEGER NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    rounds_won INTEGER NOT NULL DEFAULT 0,
+    rounds_lost INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(team_id, week, map_id),
+    FOREIGN KEY(team_id) REFERENCES Teams(id) ON DELETE CASCADE,
+    FOREIGN KEY(map_id) REFERENCES Maps(id) ON DELETE CASCADE) WITHOUT ROWID;
+
+""" + ';\n'.join(_WEEK_TRIGGERS.values()) + ';\n' + REBUILD_WEEK_TOTALS
+
+# ──────────────────────── MIGRATIONS ───────────────────────────
+# Une étape = un script SQL, ou une fonction(conn) pour ce qui ne s’écrit
+# pas en SQL (ex. : rejouer l’ELO match par match). La fonction roule dans
+# la transaction de l’étape et ne fait pas de commit.
+def _replay_ratings(conn):
+    import games, ratings  # imports locaux : ratings importe db
+    # Paires recollées depuis Matches (Games n’existe pas encore à cette étape)
+    ratings.replay(conn.cursor(), sides=games.pair_matches(conn.cursor()))
+
+
+def _link_games(conn):
+    import games
+    games.link_legacy(conn.cursor())
+
+
+def _create_search(conn):
+    import search
+    search.create(conn.cursor())
+
+
+# Images d’une BD existante, une seule fois : noms par hash (blobs.py), puis
+# vignettes manquantes en arrière-plan (thumbs.py ; les images ajoutées
+# ensuite ont les leurs à l’ajout). Importés ici seulement : ils tirent hashlib,
+# shutil et le pool de threads.
+def _migrate_images(conn):
+    import blobs
+    import thumbs
+    blobs.migrate(conn)
+    thumbs.migrate(conn.cursor())
+
+
+# Avant, on relançait SCHEMA (executescript) à chaque ouverture de la BD.
+# Maintenant on versionne : PRAGMA user_version dit où en est le fichier,
+# et on applique seulement les étapes qui manquent. Si la BD est à jour,
+# zéro DDL — on lit juste un entier.
+#
+# Règle : on AJOUTE des étapes à la fin, on ne modifie jamais une étape
+# déjà livrée (sinon les vieilles BD ne la rejoueraient pas).
+MIGRATIONS = [
+    # 1 — schéma de base (IF NOT EXISTS : marche aussi sur les BD d’avant le versionnage)
+    SCHEMA,
+
+    # 2 — index sur les clés étrangères.
+    # - Matches(team_id, map_id, rounds_won, rounds_lost) : couvrant pour la fiche d’équipe,
+    #   le win-rate par map et le leaderboard (pas besoin de relire la table).
+    # - Matches(map_id, ...) : exports par map + cascade quand on supprime une map.
+    # - PlayerStats(player_id, match_id, kills, deaths, bombs) : couvrant pour les fiches joueurs.
+    # - PlayerStats(match_id) : cascade quand on supprime un match/une équipe.
+    # - Players(team_id) : roster d’équipe + cascade sur Teams.
+    '''
+    CREATE INDEX IF NOT EXISTS idx_matches_team_map
+        ON Matches(team_id, map_id, rounds_won, rounds_lost);
+    CREATE INDEX IF NOT EXISTS idx_matches_map
+        ON Matches(map_id, rounds_won, rounds_lost);
+    CREATE INDEX IF NOT EXISTS idx_playerstats_player
+        ON PlayerStats(player_id, match_id, kills, deaths, bombs);
+    CREATE INDEX IF NOT EXISTS idx_playerstats_match
+        ON PlayerStats(match_id);
+    CREATE INDEX IF NOT EXISTS idx_players_team
+        ON Players(team_id);
+    ANALYZE;
+    ''',
+
+    # 3 — agrégats joueur × map maintenus par triggers (voir PLAYER_MAP_TOTALS plus haut).
+    PLAYER_MAP_TOTALS,
+
+    # 4 — classement ELO (ratings.py) : cote courante indexée + historique par match.
+    # opponent_id sans FK : l’historique d’une équipe survit à la suppression de l’adversaire.
+    '''
+    ALTER TABLE Teams ADD COLUMN rating REAL NOT NULL DEFAULT 1500;
+    CREATE INDEX IF NOT EXISTS idx_teams_rating ON Teams(rating DESC);
+    CREATE TABLE IF NOT EXISTS RatingHistory(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id INTEGER NOT NULL,
+        opponent_match_id INTEGER,
+        team_id INTEGER NOT NULL,
+        opponent_id INTEGER,
+        rating_before REAL NOT NULL,
+        rating_after REAL NOT NULL,
+        delta REAL NOT NULL,
+        FOREIGN KEY(match_id) REFERENCES Matches(id) ON DELETE CASCADE,
+        FOREIGN KEY(team_id) REFERENCES Teams(id) ON DELETE CASCADE);
+    CREATE INDEX IF NOT EXISTS idx_ratinghistory_team ON RatingHistory(team_id);
+    CREATE INDEX IF NOT EXISTS idx_ratinghistory_match ON RatingHistory(match_id);
+    ''',
+
+    # 5 — cotes de départ : on rejoue les matchs déjà en BD (Python, voir _replay_ratings).
+    _replay_ratings,
+
+    # 6 — Games : les deux côtés d’un match reliés (games.py).
+    # - team_a < team_b : « A contre B » = une seule clé, couverte par idx_games_h2h
+    # - Matches.game_id ON DELETE SET NULL : supprimer une équipe garde le côté de l’adversaire
+    # - idx_games_map : nb de games / rounds par map sans compter chaque match deux fois
+    '''
+    CREATE TABLE IF NOT EXISTS Games(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        map_id INTEGER NOT NULL,
+        team_a INTEGER NOT NULL,
+        team_b INTEGER NOT NULL,
+        rounds_a INTEGER NOT NULL DEFAULT 0,
+        rounds_b INTEGER NOT NULL DEFAULT 0,
+        CHECK (team_a < team_b),
+        FOREIGN KEY(map_id) REFERENCES Maps(id) ON DELETE CASCADE,
+        FOREIGN KEY(team_a) REFERENCES Teams(id) ON DELETE CASCADE,
+        FOREIGN KEY(team_b) REFERENCES Teams(id) ON DELETE CASCADE);
+    CREATE INDEX IF NOT EXISTS idx_games_h2h ON Games(team_a, team_b, map_id, rounds_a, rounds_b);
+    CREATE INDEX IF NOT EXISTS idx_games_b ON Games(team_b);
+    CREATE INDEX IF NOT EXISTS idx_games_map ON Games(map_id, rounds_a, rounds_b);
+    ALTER TABLE Matches ADD COLUMN game_id INTEGER REFERENCES Games(id) ON DELETE SET NULL;
+    CREATE INDEX IF NOT EXISTS idx_matches_game ON Matches(game_id);
+    ''',
+
+    # 7 — relie les matchs déjà en BD (mêmes paires que l’ELO de l’étape 5).
+    _link_games,
+
+    # 8 — date des matchs + totaux par semaine pour les fenêtres de temps (voir WEEK_TOTALS).
+    # Les matchs déjà en BD restent sans date (semaine '').
+    WEEK_TOTALS,
+
+    # 9 — détail des rounds : un BLOB compact par game (format dans rounds.py).
+    # game_id = clé primaire (alias du rowid) : une lecture par game, pas d’index en plus.
+    '''
+    CREATE TABLE IF NOT EXISTS GameRounds(
+        game_id INTEGER PRIMARY KEY,
+        data BLOB NOT NULL,
+        FOREIGN KEY(game_id) REFERENCES Games(id) ON DELETE CASCADE);
+    ''',
+
+    # 10 — positions des événements (heatmaps) : un BLOB packé par game (format dans events.py).
+    # La map et la date se lisent dans Games (idx_games_map) ; n = nb d’événements.
+    '''
+    CREATE TABLE IF NOT EXISTS GameEvents(
+        game_id INTEGER PRIMARY KEY,
+        n INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        FOREIGN KEY(game_id) REFERENCES Games(id) ON DELETE CASCADE);
+    ''',
+
+    # 11 — index de recherche FTS5 (équipes, joueurs, maps) + triggers (voir search.py).
+    # Sans FTS5 dans ce SQLite : sauté, la recherche passe par LIKE.
+    _create_search,
+
+    # 12 — PlayerMapTotals : nettoyage des lignes à 0 game ciblé sur la clé (les triggers
+    # de l’étape 3 scannaient toute la table à chaque ligne : cascades quadratiques)
+    # + index sur map_id pour la cascade quand on supprime une map.
+    PMT_CLEANUP_FIX,
+
+    # 13 — totaux par semaine (étape 8) : la clé commence par joueur / équipe, donc la
+    # cascade d’une map supprimée scannait les deux tables. Un index sur map_id chacune.
+    '''
+    CREATE INDEX IF NOT EXISTS idx_pwt_map ON PlayerWeekTotals(map_id);
+    CREATE INDEX IF NOT EXISTS idx_twt_map ON TeamWeekTotals(map_id);
+    ANALYZE PlayerWeekTotals;
+    ANALYZE TeamWeekTotals;
+    ''',
+
+    # 14 — images rangées par hash + vignettes (voir _migrate_images). Avant, c’était
+    # refait à chaque lancement et à chaque changement de BD : O(images) à chaque fois.
+    _migrate_images,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+# ----------------------------------------------------------------
+# migrate(conn)
+# ----------------------------------------------------------------
+# Applique les migrations en attente, une transaction par étape.
+# Le user_version est écrit dans la même transaction : si une étape
+# plante, la BD reste à la version d’avant (pas de demi-migration).
+def migrate(conn):
     """
-    Ouvre la BD courante (CURRENT_DB_PATH), active les foreign keys
-    et applique le schéma. Retourne (conn, cursor).
+    Met la BD à jour selon MIGRATIONS et PRAGMA user_version.
+    Retourne la version finale. Ne fait rien si la BD est déjà à jour.
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return version
+
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        script = MIGRATIONS[target - 1]
+        if callable(script):
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute('BEGIN')
+            try:
+                script(conn)
+                conn.execute(f'PRAGMA user_version = {target}')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            continue
+        # executescript fait un COMMIT avant de rouler : on gère le BEGIN nous-mêmes
+        # pour que le script et le user_version partent ensemble.
+        conn.executescript(
+            'BEGIN;\n' + script + f'\nPRAGMA user_version = {target};\nCOMMIT;'
+        )
+    return SCHEMA_VERSION
+
+
+# ----------------------------------------------------------------
+# rebuild_player_map_totals(conn) / rebuild_totals(conn)
+# ----------------------------------------------------------------
+# Filet de sécurité : si quelqu’un a bidouillé la BD à la main avec les
+# triggers désactivés (ou un vieux outil), on recalcule tout d’un coup.
+def rebuild_player_map_totals(conn):
+    """Recalcule PlayerMapTotals au complet depuis PlayerStats/Matches."""
+    conn.executescript('BEGIN;\n' + REBUILD_PLAYER_MAP_TOTALS + '\nCOMMIT;')
+
+
+def rebuild_totals(conn):
+    """Recalcule tous les agrégats : PlayerMapTotals et les totaux par semaine."""
+    conn.executescript('BEGIN;\n' + REBUILD_PLAYER_MAP_TOTALS + REBUILD_WEEK_TOTALS + '\nCOMMIT;')
+
+
+# ----------------------------------------------------------------
+# suspend_totals / resume_totals
+# ----------------------------------------------------------------
+# Import en lot : les triggers ligne par ligne coûtent ~4× le temps de
+# l’insertion elle-même. Dans la MÊME transaction que l’import, on les
+# retire (PlayerMapTotals et totaux par semaine), on insère, puis on ajoute
+# d’un coup le delta des nouveaux matchs (id >= first_match_id) et on recrée
+# les triggers. Si la transaction est annulée, les triggers reviennent tout
+# seuls (le DDL est transactionnel).
+_ALL_TOTALS_TRIGGERS = {**_PMT_TRIGGERS, **_WEEK_TRIGGERS}
+
+
+def suspend_totals(cursor):
+    """Retire les triggers des agrégats (à appeler dans une transaction ouverte)."""
+    for name in _ALL_TOTALS_TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+def resume_totals(cursor, first_match_id):
+    """Ajoute aux agrégats les lignes des matchs id >= first_match_id, puis recrée les triggers."""
+    cursor.execute('''
+        INSERT INTO PlayerMapTotals(player_id, map_id, games, kills, deaths, bombs, rounds_won, rounds_lost)
+        SELECT ps.player_id, m.map_id, COUNT(*),
+               COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0), COALESCE(SUM(ps.bombs),0),
+               COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
+        FROM Matches m
+        JOIN PlayerStats ps ON ps.match_id = m.id
+        WHERE m.id >= ?
+        GROUP BY ps.player_id, m.map_id
+        ON CONFLICT(player_id, map_id) DO UPDATE SET
+            games = games + excluded.games,
+            kills = kills + excluded.kills,
+            deaths = deaths + excluded.deaths,
+            bombs = bombs + excluded.bombs,
+            rounds_won = rounds_won + excluded.rounds_won,
+            rounds_lost = rounds_lost + excluded.rounds_lost
+    ''', (first_match_id,))
+    cursor.execute(f'''
+        INSERT INTO PlayerWeekTotals(player_id, week, map_id, games, kills, deaths, bombs, rounds_won, rounds_lost)
+        SELECT ps.player_id, {week_sql('m.played_at')}, m.map_id, COUNT(*),
+               COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0), COALESCE(SUM(ps.bombs),0),
+               COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
+        FROM Matches m
+        JOIN PlayerStats ps ON ps.match_id = m.id
+        WHERE m.id >= ?
+        GROUP BY 1, 2, 3
+        ON CONFLICT(player_id, week, map_id) DO UPDATE SET
+            games = games + excluded.games,
+            kills = kills + excluded.kills,
+            deaths = deaths + excluded.deaths,
+            bombs = bombs + excluded.bombs,
+            rounds_won = rounds_won + excluded.rounds_won,
+            rounds_lost = rounds_lost + excluded.rounds_lost
+    ''', (first_match_id,))
+    cursor.execute(f'''
+        INSERT INTO TeamWeekTotals(team_id, week, map_id, games, wins, rounds_won, rounds_lost)
+        SELECT team_id, {week_sql('played_at')}, map_id, COUNT(*),
+               SUM(COALESCE(rounds_won,0) > COALESCE(rounds_lost,0)),
+               COALESCE(SUM(rounds_won),0), COALESCE(SUM(rounds_lost),0)
+        FROM Matches
+        WHERE id >= ?
+        GROUP BY 1, 2, 3
+        ON CONFLICT(team_id, week, map_id) DO UPDATE SET
+            games = games + excluded.games,
+            wins = wins + excluded.wins,
+            rounds_won = rounds_won + excluded.rounds_won,
+            rounds_lost = rounds_lost + excluded.rounds_lost
+    ''', (first_match_id,))
+    for ddl in _ALL_TOTALS_TRIGGERS.values():
+        cursor.execute(ddl)
+
+
+# ----------------------------------------------------------------
+# _connection_factory()
+# ----------------------------------------------------------------
+# sqlprof (et logging) n’est importé que si le profilage est demandé :
+# STATTEAM_SQLPROF, [sqlprof] enabled = yes, ou déjà allumé (cli --profile-sql).
+# Éteint, chaque utilisateur de db ne paie que sqlite3.Connection.
+def _connection_factory():
+    if 'sqlprof' not in sys.modules and os.environ.get('STATTEAM_SQLPROF', '').strip() in ('', '0'):
+        parser = configparser.ConfigParser()
+        parser.read(CONFIG_FILE, encoding='utf-8')
+        try:
+            enabled = parser.getboolean('sqlprof', 'enabled', fallback=False)
+        except ValueError:
+            enabled = False
+        if not enabled:
+            return sqlite3.Connection
+    import sqlprof
+    return sqlprof.connection_factory(CONFIG_FILE)
+
+
+# ----------------------------------------------------------------
+# open_db(path, profile)
+# ----------------------------------------------------------------
+# Le petit bout commun à connect() et reconnect() : ouvrir, appliquer le
+# profil de connexion, activer les FK, migrer au besoin.
+def open_db(path, profile=None):
+    """
+    Ouvre `path`, applique le profil (load_profile() si None), active les
+    foreign keys et applique les migrations. Retourne (conn, cursor).
     """
-    conn = sqlite3.connect(CURRENT_DB_PATH)
+    if profile is None:
+        profile = load_profile()
+    conn = sqlite3.connect(path, timeout=profile['busy_timeout'] / 1000,
+                           factory=_connection_factory())
+    apply_profile(conn, profile)
     cursor = conn.cursor()
     cursor.execute('PRAGMA foreign_keys = ON')
-    cursor.executescript(SCHEMA)
-    conn.commit()
+    migrate(conn)
     return conn, cursor
 
 
+# ----------------------------------------------------------------
+# open_readonly(path, profile)
+# ----------------------------------------------------------------
+# Connexion en lecture seule pour les tâches de fond (exports, etc.) :
+# un thread = sa propre connexion, et mode=ro garantit qu’elle n’écrit rien.
+# Pas de migration ici (on ne peut pas écrire) : la BD a déjà été ouverte
+# par l’app avec open_db.
+def open_readonly(path, profile=None):
+    """Ouvre `path` en lecture seule (URI mode=ro). Retourne (conn, cursor)."""
+    if profile is None:
+        profile = load_profile()
+    uri = pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=profile['busy_timeout'] / 1000,
+                           check_same_thread=False, factory=_connection_factory())
+    conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+    conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+    conn.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+    return conn, conn.cursor()
+
+
+# ----------------------------------------------------------------
+# connect()
+# ----------------------------------------------------------------
+# Connexion initiale : on ouvre la BD courante avec le profil de connexion,
+# on active les FK et on migre le schéma si besoin.
+def connect():
+    """
+    Ouvre la BD courante (CURRENT_DB_PATH), active les foreign keys
+    et applique les migrations manquantes. Retourne (conn, cursor).
+    """
+    if not os.environ.get('STATTEAM_DB'):
+        remember_db(CURRENT_DB_PATH)
+    return open_db(CURRENT_DB_PATH)
+
+
 # ----------------------------------------------------------------
 # reconnect(path, conn)
 # ----------------------------------------------------------------
 # But : « basculer » l’application sur une autre BD SQLite.
 # - Ferme l’ancienne connexion (si présente)
-# - Met à jour CURRENT_DB_PATH + sauvegarde dans last_db.txt
-# - Ouvre la nouvelle connect, active les foreign keys, applique SCHEMA
+# - Met à jour CURRENT_DB_PATH + sauvegarde dans last_db.txt (et known_dbs.txt)
+# - Ouvre la nouvelle connexion (profil, foreign keys), migre au besoin
 # - La partie UI (show_login, overlays, messages) est gérée dans main.py.
 def reconnect(path, conn=None):
     """
-    Ouvre/rouvre une BD SQLite sur `path`, réapplique le schéma, met à jour
-    CURRENT_DB_PATH et mémorise le choix dans LAST_DB_FILE.
+    Ouvre/rouvre une BD SQLite sur `path`, applique les migrations manquantes,
+    met à jour CURRENT_DB_PATH et mémorise le choix dans LAST_DB_FILE.
     Retourne (conn, cursor) pour que main.py mette à jour ses globals.
     """
     global CURRENT_DB_PATH
@@ -156,15 +934,24 @@ def reconnect(path, conn=None):
 
     CURRENT_DB_PATH = path
 
-    # Garder la trace du dernier fichier ouvert
+    # Garder la trace du dernier fichier ouvert (et de toutes les BD ouvertes)
     with open(LAST_DB_FILE, 'w', encoding='utf-8') as f:
         f.write(CURRENT_DB_PATH)
+    remember_db(CURRENT_DB_PATH)
 
-    # Connexion + activer les clés étrangères (sinon SQLite laisse passer trop de trucs)
-    conn = sqlite3.connect(CURRENT_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('PRAGMA foreign_keys = ON')
-    # On s’assure que tout le schéma est bien en place
-    cursor.executescript(SCHEMA)
-    conn.commit()
-    return conn, cursor
+    return open_db(CURRENT_DB_PATH)
+
+
+# ----------------------------------------------------------------
+# backup(conn, dest)
+# ----------------------------------------------------------------
+# En WAL, les derniers commits peuvent dormir dans le fichier -wal :
+# un simple copy2 du .db donnerait une copie en retard. L’API backup
+# de SQLite copie l’état complet et cohérent.
+def backup(conn, dest):
+    """Copie la BD ouverte sur `conn` vers le fichier `dest`."""
+    target = sqlite3.connect(dest)
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
@@ -0,0 +1,201 @@
+# events.py
+# -----------------------------------------------------------------------------
+# Rôle : positions des événements d’une game (kills, morts, bombes) pour les heatmaps
+#        - stockage : GameEvents(game_id, n, data) = UN BLOB par game, tableau
+#          NumPy « packé » (EVENT_DTYPE, 16 octets par événement)
+#        - ingest_file() : fichier d’événements (NDJSON ou CSV) → GameEvents,
+#          une seule transaction comme l’import d’historique
+#        - load() : tous les événements d’une map (fenêtre de temps possible),
+#          BLOB collés puis décodés d’un coup (np.frombuffer), filtres en vectoriel
+#
+# Coordonnées : x, y en fraction de l’image de la map (0..1, origine en haut à
+# gauche) → indépendantes de la taille de l’image. Le rendu est dans heatmaps.py.
+#
+# Format NDJSON (une game par ligne) :
+#   {"game": 12, "events": [{"x": 0.42, "y": 0.61, "type": "kill", "player": "s1mple", "round": 3}, ...]}
+#   au lieu de "game" (id de Games) : "date", "map", "team_a", "team_b" (la game de ce jour-là)
+# Format CSV (un événement par ligne, regroupé par game) :
+#   game,x,y,type,player,round       (ou date,map,team_a,team_b à la place de game)
+# type : kill / death / plant / defuse ; player : nom d’un joueur d’une des 2 équipes.
+# Réimporter une game remplace ses événements.
+#
+# NumPy vient avec matplotlib ; importé seulement ici, au besoin.
+# -----------------------------------------------------------------------------
+
+import csv
+import itertools
+import json
+import os
+
+import games as games_table
+
+KINDS = {'kill': 1, 'death': 2, 'plant': 3, 'defuse': 4}
+KIND_NAMES = {v: k for k, v in KINDS.items()}
+
+# x, y en float32 ; type et round en int16 ; joueur en int32 (les ids de
+# Players dépassent vite 32 767 avec des imports). Aligné sur 16 octets.
+EVENT_FIELDS = [('x', '<f4'), ('y', '<f4'), ('player', '<i4'), ('kind', '<i2'), ('round', '<i2')]
+
+
+def event_dtype():
+    import numpy as np
+    return np.dtype(EVENT_FIELDS)
+
+
+# ----------------------------------------------------------------
+# read_events(path)
+# ----------------------------------------------------------------
+# Générateur : {ref, events: [{x, y, type, player, round}]} par game, peu
+# importe le format ; ref = id de game ou (date, map, team_a, team_b).
+def read_events(path):
+    """Lit un fichier d’événements (.ndjson/.jsonl ou .csv). Lève ValueError (avec la ligne) si invalide."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.ndjson', '.jsonl', '.json'):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    g = json.loads(line)
+                    yield {'ref': _ref(g), 'events': list(g['events'])}
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(f'Ligne {lineno} invalide : {e}') from e
+    else:
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            try:
+                for ref, rows in itertools.groupby(reader, key=_ref):
+                    yield {'ref': ref, 'events': list(rows)}
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f'Ligne {reader.line_num} invalide : {e}') from e
+
+
+def _ref(g):
+    if str(g.get('game') or '').strip():
+        return int(g['game'])
+    return (games_table.parse_date(g['date'])[:10], g['map'].strip(), g['team_a'].strip(), g['team_b'].strip())
+
+
+def _find_game(cursor, ref):
+    """(game_id, team_a, team_b) de la référence, ou ValueError."""
+    if isinstance(ref, int):
+        row = cursor.execute('SELECT id, team_a, team_b FROM Games WHERE id = ?', (ref,)).fetchone()
+    else:
+        day, map_name, name_a, name_b = ref
+        row = cursor.execute('''
+            SELECT g.id, g.team_a, g.team_b
+            FROM Games g
+            JOIN Maps mp ON mp.id = g.map_id AND mp.name = ?
+            JOIN Teams ta ON ta.id = g.team_a
+            JOIN Teams tb ON tb.id = g.team_b
+            WHERE date(g.played_at) = ? AND ((ta.name = ? AND tb.name = ?) OR (ta.name = ? AND tb.name = ?))
+            ORDER BY g.id DESC LIMIT 1
+        ''', (map_name, day, name_a, name_b, name_b, name_a)).fetchone()
+    if row is None:
+        raise ValueError(f'game introuvable : {ref}')
+    return row
+
+
+# ----------------------------------------------------------------
+# pack(cursor, team_a, team_b, raw) / store(cursor, rows)
+# ----------------------------------------------------------------
+def pack(cursor, team_a, team_b, raw):
+    """Liste brute d’événements d’une game → tableau EVENT_DTYPE (joueurs cherchés dans les 2 équipes)."""
+    import numpy as np
+
+    players = {}
+    for pid, name in cursor.execute('SELECT id, name FROM Players WHERE team_id IN (?, ?)', (team_a, team_b)):
+        players.setdefault(name, pid)
+    out = np.empty(len(raw), dtype=event_dtype())
+    for i, e in enumerate(raw):
+        x, y = float(e['x']), float(e['y'])
+        if not (0 <= x <= 1 and 0 <= y <= 1):
+            raise ValueError(f'événement {i + 1} : x / y hors de 0..1')
+        kind = KINDS.get(str(e.get('type', '')).strip().lower())
+        if kind is None:
+            raise ValueError(f"événement {i + 1} : type doit être {' / '.join(KINDS)}")
+        player = str(e.get('player', '')).strip()
+        if player not in players:
+            raise ValueError(f'événement {i + 1} : joueur inconnu « {player} »')
+        out[i] = (x, y, players[player], kind, int(e.get('round') or 0))
+    return out
+
+
+def store(cursor, rows):
+    """rows : [(game_id, tableau EVENT_DTYPE), ...] → GameEvents (remplace). Pas de commit."""
+    cursor.executemany('INSERT OR REPLACE INTO GameEvents(game_id, n, data) VALUES (?,?,?)',
+                       [(game_id, len(ev), ev.tobytes()) for game_id, ev in rows])
+
+
+# ----------------------------------------------------------------
+# ingest(conn, items) / ingest_file(conn, path)
+# ----------------------------------------------------------------
+def ingest(conn, items):
+    """Importe les games de read_events() dans une seule transaction. Retourne {games, events}."""
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        conn.commit()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        rows = []
+        for item in items:
+            game_id, team_a, team_b = _find_game(cursor, item['ref'])
+            rows.append((game_id, pack(cursor, team_a, team_b, item['events'])))
+        store(cursor, rows)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {'games': len(rows), 'events': sum(len(ev) for _g, ev in rows)}
+
+
+def ingest_file(conn, path):
+    """Raccourci : read_events(path) + ingest(conn, ...)."""
+    return ingest(conn, read_events(path))
+
+
+# ----------------------------------------------------------------
+# load(cursor, map_id, since=None) / select(ev, ...)
+# ----------------------------------------------------------------
+def load(cursor, map_id, since=None):
+    """Tous les événements des games de `map_id` (depuis `since`) : un tableau EVENT_DTYPE."""
+    import numpy as np
+
+    where = '' if since is None else ' AND g.played_at >= ?'
+    cursor.execute(f'''
+        SELECT e.data
+        FROM Games g
+        JOIN GameEvents e ON e.game_id = g.id
+        WHERE g.map_id = ?{where}
+    ''', (map_id,) + (() if since is None else (since,)))
+    return np.frombuffer(b''.join(r[0] for r in cursor.fetchall()), dtype=event_dtype())
+
+
+def select(cursor, ev, team_id=None, player_id=None, kind=None):
+    """Masque booléen : événements de ce joueur / des joueurs de cette équipe / de ce type."""
+    import numpy as np
+
+    mask = np.ones(len(ev), dtype=bool)
+    if player_id is not None:
+        mask &= ev['player'] == player_id
+    elif team_id is not None:
+        roster = [r[0] for r in cursor.execute('SELECT id FROM Players WHERE team_id = ?', (team_id,))]
+        mask &= np.isin(ev['player'], roster)
+    if kind is not None:
+        mask &= ev['kind'] == KINDS[kind]
+    return mask
+
+
+def maps_with_events(cursor, team_id=None):
+    """[(map_id, name), ...] des maps qui ont des événements (des games de `team_id` si donné)."""
+    where = '' if team_id is None else 'WHERE g.team_a = ? OR g.team_b = ?'
+    cursor.execute(f'''
+        SELECT DISTINCT mp.id, mp.name
+        FROM Games g
+        JOIN GameEvents e ON e.game_id = g.id
+        JOIN Maps mp ON mp.id = g.map_id
+        {where}
+        ORDER BY mp.name
+    ''', () if team_id is None else (team_id, team_id))
+    return cursor.fetchall()
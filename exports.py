@@ -0,0 +1,209 @@
+# exports.py
+# -----------------------------------------------------------------------------
+# Rôle : les rapports CSV (Meilleurs joueurs, Meilleures équipes, Maps les plus jouées)
+#        - le ratio ET le tri sont faits en SQL (ORDER BY), pas en Python
+#        - les lignes passent du curseur au csv.writer par paquets (fetchmany) :
+#          on ne garde jamais tout le résultat en mémoire
+#        - un seul « pipeline » (write_report) ; un nouveau rapport = une entrée dans REPORTS
+#        - file de tâches de fond (ExportQueue) : un thread, sa propre connexion en lecture seule
+# Pas de Tkinter ici : main.py s’occupe des boîtes de dialogue et de la barre de progression.
+# -----------------------------------------------------------------------------
+
+import csv
+import os
+import queue
+import threading
+
+import db
+import stats
+
+# Nombre de lignes lues/écrites à la fois
+CHUNK_ROWS = 1000
+
+# K/D et win-rate en SQL, mêmes règles que stats.kd_ratio / stats.win_rate.
+_KD_SQL = 'CASE WHEN {d} > 0 THEN CAST({k} AS REAL) / {d} ELSE {k} END'
+_WR_SQL = 'CASE WHEN ({w}) + ({l}) > 0 THEN CAST({w} AS REAL) * 100 / (({w}) + ({l})) ELSE 0 END'
+
+
+# ----------------------------------------------------------------
+# REPORTS
+# ----------------------------------------------------------------
+# Chaque rapport :
+# - title  : titre de la boîte « Enregistrer sous » / du message de succès
+# - header : première ligne du CSV
+# - sql    : requête déjà triée ; ses colonnes arrivent dans l’ordre du header
+# - count  : requête qui donne le nombre de lignes (pour une barre de progression)
+# - row    : mise en forme d’une ligne (ex. arrondis) avant l’écriture
+REPORTS = {
+    'best_players': {
+        'title': 'Meilleurs Joueurs',
+        'header': ['Joueur', 'Total_Kills', 'Total_Deaths', 'KD'],
+        # Même agrégat que la fiche d’équipe et l’analyse (stats.roster_sql), tous les joueurs
+        'sql': f'''
+            SELECT name, kills, deaths, {_KD_SQL.format(k='kills', d='deaths')} AS kd
+            FROM ({stats.roster_sql()[0]})
+            ORDER BY kd DESC, id
+        ''',
+        'count': 'SELECT COUNT(*) FROM Players',
+        'row': lambda r: (r[0], r[1], r[2], f'{r[3]:.2f}'),
+    },
+    'best_teams': {
+        'title': 'Meilleures Équipes',
+        'header': ['Équipe', 'Victoires', 'Défaites', 'WinRate_%'],
+        'sql': f'''
+            SELECT name, w, l, {_WR_SQL.format(w='w', l='l')} AS wr
+            FROM (SELECT t.id, t.name, COALESCE(SUM(m.rounds_won), 0) AS w, COALESCE(SUM(m.rounds_lost), 0) AS l
+                  FROM Teams t
+                  LEFT JOIN Matches m ON m.team_id = t.id
+                  GROUP BY t.id)
+            ORDER BY wr DESC, id
+        ''',
+        'count': 'SELECT COUNT(*) FROM Teams',
+        'row': lambda r: (r[0], r[1], r[2], f'{r[3]:.1f}'),
+    },
+    # Chaque match compté une fois (Games), pas une fois par équipe
+    'most_played_maps': {
+        'title': 'Maps les plus jouées',
+        'header': ['Map', 'Games', 'Total_Rounds'],
+        'sql': stats.MAP_GAMES_SQL + ' ORDER BY rounds DESC, mp.id',
+        'count': 'SELECT COUNT(*) FROM Maps',
+        'row': tuple,
+    },
+}
+
+
+# ----------------------------------------------------------------
+# write_report(cursor, name, path, progress=None)
+# ----------------------------------------------------------------
+# Le pipeline commun : requête → fetchmany → csv.writer.
+# progress(lignes_écrites) est appelé après chaque paquet ; s’il retourne
+# False, on arrête (le fichier reste partiel, à l’appelant de le supprimer).
+def write_report(cursor, name, path, progress=None, chunk=CHUNK_ROWS):
+    """
+    Écrit le rapport REPORTS[name] dans `path` (CSV utf-8-sig, lisible par Excel).
+    Retourne le nombre de lignes écrites (hors en-tête), ou None si arrêté par progress.
+    """
+    report = REPORTS[name]
+    fmt = report['row']
+    written = 0
+    cursor.execute(report['sql'])
+    # 👉 Excel-proof : utf-8-sig
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(report['header'])
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                break
+            writer.writerows(fmt(r) for r in rows)
+            written += len(rows)
+            if progress and progress(written) is False:
+                return None
+    return written
+
+
+def count_rows(cursor, name):
+    """Nombre de lignes que write_report va écrire pour REPORTS[name]."""
+    cursor.execute(REPORTS[name]['count'])
+    return cursor.fetchone()[0]
+
+
+# ----------------------------------------------------------------
+# ExportJob / ExportQueue
+# ----------------------------------------------------------------
+# Les exports ne roulent plus sur le thread de Tkinter (l’UI gelait).
+# - submit() met une tâche en file ; un seul thread de fond les fait une
+#   après l’autre, avec SA connexion en lecture seule (db.open_readonly).
+# - Le thread ne touche jamais à Tkinter : il met à jour job.state/done/total,
+#   et l’UI vient lire ça avec root.after (voir export_overlay dans main.py).
+# - cancel() : le job s’arrête au prochain paquet et le fichier partiel est supprimé.
+# - Écriture dans `path + '.tmp'`, puis os.replace une fois fini : un job annulé
+#   ou en erreur (BD verrouillée, mauvais chemin…) ne touche jamais au fichier
+#   choisi, même s’il existait déjà (CSV qu’on voulait écraser).
+class ExportJob:
+    """Une tâche d’export : état lisible depuis n’importe quel thread."""
+
+    # États possibles
+    WAITING, RUNNING, DONE, CANCELLED, FAILED = 'en attente', 'en cours', 'terminé', 'annulé', 'erreur'
+
+    def __init__(self, name, path, db_path):
+        self.name = name
+        self.path = path
+        self.db_path = db_path
+        self.state = self.WAITING
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self._cancel = threading.Event()
+
+    @property
+    def title(self):
+        return REPORTS[self.name]['title']
+
+    @property
+    def finished(self):
+        return self.state in (self.DONE, self.CANCELLED, self.FAILED)
+
+    def cancel(self):
+        """Demande l’arrêt (sans effet si déjà fini)."""
+        self._cancel.set()
+
+    def run(self):
+        """Exécute le job (appelé par le thread de la file)."""
+        if self._cancel.is_set():
+            self.state = self.CANCELLED
+            return
+        self.state = self.RUNNING
+        conn = None
+        tmp = self.path + '.tmp'
+        try:
+            conn, cursor = db.open_readonly(self.db_path)
+            self.total = count_rows(cursor, self.name)
+
+            def on_progress(written):
+                self.done = written
+                return not self._cancel.is_set()
+
+            if write_report(cursor, self.name, tmp, progress=on_progress) is None:
+                self.state = self.CANCELLED
+            else:
+                os.replace(tmp, self.path)
+                self.state = self.DONE
+        except Exception as e:
+            self.error = e
+            self.state = self.FAILED
+        finally:
+            if conn is not None:
+                conn.close()
+        if self.state != self.DONE:
+            # Pas de fichier à moitié écrit qui traîne (le .tmp, jamais self.path)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+class ExportQueue:
+    """File d’exports traitée par un thread de fond (démarré au premier submit)."""
+
+    def __init__(self):
+        self.jobs = []
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, name, path, db_path):
+        """Ajoute un export à la file et retourne son ExportJob."""
+        job = ExportJob(name, path, db_path)
+        self.jobs.append(job)
+        self._queue.put(job)
+        with self._lock:
+            if self._thread is None:
+                # Thread « daemon » : il dort sur la file et meurt avec l’app.
+                self._thread = threading.Thread(target=self._worker, name='exports', daemon=True)
+                self._thread.start()
+        return job
+
+    def _worker(self):
+        while True:
+            self._queue.get().run()
@@ -0,0 +1,117 @@
+# games.py
+# -----------------------------------------------------------------------------
+# Rôle : une « game » = un match entre deux équipes, avec ses deux côtés
+#        - Games(map_id, team_a, team_b, rounds_a, rounds_b) : une ligne par match,
+#          team_a < team_b toujours (« A contre B » et « B contre A » = même clé)
+#        - Matches.game_id : chaque côté (une ligne Matches par équipe, comme avant)
+#          pointe vers sa game
+#        - index (team_a, team_b, map_id) : face-à-face et win-rate contre un
+#          adversaire = une seule plage d’index (voir stats.head_to_head)
+#        - link_legacy() : recolle les côtés des matchs enregistrés avant Games
+#        - played_at : date du match ('AAAA-MM-JJ HH:MM:SS', heure locale), copiée
+#          sur la game et ses deux côtés (fenêtres de temps, voir stats.py)
+#
+# Si une équipe est supprimée, ses games partent (cascade) et le côté de
+# l’adversaire reste dans Matches avec game_id = NULL : ses stats ne bougent pas.
+# -----------------------------------------------------------------------------
+
+import datetime
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def now():
+    """played_at de « maintenant »."""
+    return datetime.datetime.now().strftime(DATE_FORMAT)
+
+
+def parse_date(value):
+    """
+    'AAAA-MM-JJ', 'AAAA-MM-JJ HH:MM[:SS]' (ou ISO avec T) → played_at normalisé.
+    Vide / None → None (match sans date). Lève ValueError si la date est invalide.
+    """
+    if value is None or not str(value).strip():
+        return None
+    return datetime.datetime.fromisoformat(str(value).strip()).strftime(DATE_FORMAT)
+
+
+def ordered(team1, score1, team2, score2):
+    """(team_a, team_b, rounds_a, rounds_b) avec team_a < team_b."""
+    if team1 < team2:
+        return team1, team2, score1, score2
+    return team2, team1, score2, score1
+
+
+# ----------------------------------------------------------------
+# record(cursor, map_id, team1, score1, team2, score2, played_at=None)
+# ----------------------------------------------------------------
+# Ce que add_match_dual_overlay.save() faisait à la main (2 INSERT Matches),
+# plus la ligne Games qui les relie. Pas de commit : transaction de l’appelant.
+def record(cursor, map_id, team1, score1, team2, score2, played_at=None):
+    """Enregistre une game et ses deux côtés (played_at défaut : maintenant). Retourne (game_id, match1_id, match2_id)."""
+    played_at = played_at or now()
+    team_a, team_b, rounds_a, rounds_b = ordered(team1, score1, team2, score2)
+    cursor.execute('INSERT INTO Games(map_id, team_a, team_b, rounds_a, rounds_b, played_at) VALUES (?,?,?,?,?,?)',
+                   (map_id, team_a, team_b, rounds_a, rounds_b, played_at))
+    game_id = cursor.lastrowid
+    sides = []
+    for tid, won, lost in ((team1, score1, score2), (team2, score2, score1)):
+        cursor.execute('INSERT INTO Matches(team_id, map_id, rounds_won, rounds_lost, game_id, played_at) '
+                       'VALUES (?,?,?,?,?,?)', (tid, map_id, won, lost, game_id, played_at))
+        sides.append(cursor.lastrowid)
+    return game_id, sides[0], sides[1]
+
+
+# ----------------------------------------------------------------
+# pair_matches(cursor) / link_legacy(cursor)
+# ----------------------------------------------------------------
+# Avant Games, save() et l’import écrivaient la ligne de l’équipe A puis
+# celle de B juste après : ids consécutifs, même map, rounds inversés.
+# Une ligne sans partenaire (l’autre équipe supprimée…) reste sans game.
+# (pair_matches ne lit pas game_id : la migration ELO n° 5 l’utilise avant qu’il existe)
+def pair_matches(cursor):
+    """Côtés recollés, par ids : [(match_a, team_a, score_a, match_b, team_b, score_b), ...]."""
+    pairs, prev = [], None
+    for row in cursor.execute('SELECT id, team_id, map_id, rounds_won, rounds_lost FROM Matches ORDER BY id').fetchall():
+        if prev is not None and row[0] == prev[0] + 1 and row[2] == prev[2] \
+                and row[1] != prev[1] and row[3] == prev[4] and row[4] == prev[3]:
+            pairs.append((prev[0], prev[1], prev[3], row[0], row[1], row[3]))
+            prev = None
+        else:
+            prev = row
+    return pairs
+
+
+def link_legacy(cursor):
+    """Crée les Games des matchs d’avant (voir pair_matches). Retourne le nb de games créées."""
+    maps = dict(cursor.execute('SELECT id, map_id FROM Matches WHERE game_id IS NULL').fetchall())
+    pairs = [p for p in pair_matches(cursor) if p[0] in maps and p[3] in maps]
+    if not pairs:
+        return 0
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM Games')
+    next_id = cursor.fetchone()[0] + 1
+    rows, links = [], []
+    for game_id, (ma, ta, sa, mb, tb, sb) in enumerate(pairs, next_id):
+        rows.append((game_id, maps[ma]) + ordered(ta, sa, tb, sb))
+        links += [(game_id, ma), (game_id, mb)]
+    cursor.executemany('INSERT INTO Games(id, map_id, team_a, team_b, rounds_a, rounds_b) VALUES (?,?,?,?,?,?)',
+                       rows)
+    cursor.executemany('UPDATE Matches SET game_id = ? WHERE id = ?', links)
+    return len(rows)
+
+
+# ----------------------------------------------------------------
+# all_sides(cursor)
+# ----------------------------------------------------------------
+# Pour rejouer l’ELO : chaque game avec l’id Matches de chaque côté, dans
+# l’ordre où elles ont été jouées.
+def all_sides(cursor):
+    """[(match_a, team_a, rounds_a, match_b, team_b, rounds_b), ...] par ordre de game."""
+    cursor.execute('''
+        SELECT ma.id, g.team_a, g.rounds_a, mb.id, g.team_b, g.rounds_b
+        FROM Games g
+        JOIN Matches ma ON ma.game_id = g.id AND ma.team_id = g.team_a
+        JOIN Matches mb ON mb.game_id = g.id AND mb.team_id = g.team_b
+        ORDER BY g.id
+    ''')
+    return cursor.fetchall()
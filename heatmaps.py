@@ -0,0 +1,162 @@
+# heatmaps.py
+# -----------------------------------------------------------------------------
+# Rôle : heatmaps des positions (events.py) par-dessus l’image de la map
+#        - densité : np.histogram2d sur une grille BINS × BINS, flou gaussien
+#          séparable (quelques décalages de tableau, pas de boucle par événement)
+#        - couleur : table de 256 couleurs (bleu → vert → jaune → rouge), alpha
+#          selon la densité, puis alpha_composite sur l’image de la map (Pillow)
+#        - HeatmapService : PNG rendus en cache LRU, clé (map, équipe ou joueur,
+#          type, fenêtre, génération des données) ; fonds de map gardés aussi
+#
+# La « génération » vient de main.py (screens_mgr.snapshot(...)), comme charts.py.
+# NumPy et Pillow ne sont importés qu’au premier rendu.
+# -----------------------------------------------------------------------------
+
+import io
+import os
+import time
+from collections import OrderedDict
+
+import events
+from db import IMAGES_DIR
+
+BINS = 128            # grille de la densité (BINS × BINS cases)
+BLUR_SIGMA = 1.5      # flou, en cases
+SIZE = 512            # côté max de l’image rendue (px)
+MAX_ALPHA = 200       # opacité de la zone la plus chaude (0-255)
+BG_COLOR = (15, 17, 21, 255)   # même fond que charts.BG_COLOR, si la map n’a pas d’image
+
+# Rendus gardés (PNG ≈ 100-300 Ko chacun à 512 px)
+DEFAULT_LIMIT = 32
+
+# Dégradé : (position 0..1, R, G, B)
+_STOPS = ((0.0, 0, 0, 255), (0.35, 0, 255, 128), (0.65, 255, 255, 0), (1.0, 255, 0, 0))
+
+
+# ----------------------------------------------------------------
+# density(x, y, bins, sigma)
+# ----------------------------------------------------------------
+def density(x, y, bins=BINS, sigma=BLUR_SIGMA):
+    """Grille (lignes = y, colonnes = x) des événements, lissée, normalisée 0..1."""
+    import numpy as np
+
+    grid, _ye, _xe = np.histogram2d(y, x, bins=bins, range=[[0, 1], [0, 1]])
+    if sigma > 0:
+        radius = max(1, int(3 * sigma))
+        kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+        kernel /= kernel.sum()
+        for axis in (0, 1):
+            padded = np.pad(grid, [(radius, radius) if a == axis else (0, 0) for a in (0, 1)])
+            n = grid.shape[axis]
+            grid = sum(w * np.take(padded, np.arange(i, i + n), axis=axis) for i, w in enumerate(kernel))
+    peak = grid.max()
+    return grid / peak if peak > 0 else grid
+
+
+def _lut():
+    """256 couleurs RGB (uint8) du dégradé _STOPS."""
+    import numpy as np
+    pos = np.linspace(0, 1, 256)
+    stops = np.array(_STOPS)
+    return np.stack([np.interp(pos, stops[:, 0], stops[:, c]) for c in (1, 2, 3)], axis=1).astype(np.uint8)
+
+
+def colorize(grid):
+    """Densité 0..1 → tableau RGBA uint8 (transparent là où il n’y a rien)."""
+    import numpy as np
+    level = np.sqrt(grid)   # racine : les zones tièdes restent visibles à côté d’un gros point chaud
+    idx = (level * 255).astype(np.uint8)
+    rgba = np.empty(grid.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = _lut()[idx]
+    rgba[..., 3] = (level * MAX_ALPHA).astype(np.uint8)
+    return rgba
+
+
+# ----------------------------------------------------------------
+# background(image_name) / render(cursor, map_id, ...)
+# ----------------------------------------------------------------
+def background(image_name, size=SIZE):
+    """Image de la map (RGBA, ramenée à `size` px de côté max) ; carré uni si pas d’image ou illisible."""
+    from PIL import Image
+    if image_name:
+        try:
+            with Image.open(os.path.join(IMAGES_DIR, image_name)) as im:
+                scale = size / max(im.size)   # petites images agrandies aussi : la heatmap reste lisible
+                return im.convert('RGBA').resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))),
+                                                 Image.BILINEAR)
+        except OSError:
+            pass
+    return Image.new('RGBA', (size, size), BG_COLOR)
+
+
+def compose(bg, grid):
+    """Densité colorée, agrandie à la taille du fond, puis alpha_composite → image RGBA."""
+    from PIL import Image
+    heat = Image.fromarray(colorize(grid), 'RGBA').resize(bg.size, Image.BILINEAR)
+    return Image.alpha_composite(bg, heat)
+
+
+def to_png(image):
+    buf = io.BytesIO()
+    image.save(buf, format='PNG', compress_level=1)   # vitesse avant taille : c’est un cache
+    return buf.getvalue()
+
+
+def render(cursor, map_id, team_id=None, player_id=None, kind=None, since=None, bg=None):
+    """Heatmap de la map en PNG (bytes) + nb d’événements dessinés."""
+    ev = events.load(cursor, map_id, since)
+    mask = events.select(cursor, ev, team_id, player_id, kind)
+    if bg is None:
+        row = cursor.execute('SELECT image FROM Maps WHERE id = ?', (map_id,)).fetchone()
+        bg = background(row[0] if row else None)
+    grid = density(ev['x'][mask], ev['y'][mask])
+    return to_png(compose(bg, grid)), int(mask.sum())
+
+
+class HeatmapService:
+    """
+    PNG de heatmaps en cache LRU, clé (map, portée, type, fenêtre, génération).
+    portée : ('team', id), ('player', id) ou None (toute la ligue).
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.limit = limit
+        self._cache = OrderedDict()      # clé → (png, nb d’événements)
+        self._backgrounds = {}           # nom d’image → image RGBA réduite
+        self.hits = self.misses = 0
+        self.render_ms = 0.0
+
+    def get(self, cursor, map_id, scope=None, kind=None, since=None, generation=()):
+        """(png, nb d’événements) ; rendu seulement si la clé n’est pas en cache."""
+        key = (map_id, scope, kind, since, generation)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return hit
+        self.misses += 1
+
+        t0 = time.perf_counter()
+        row = cursor.execute('SELECT image FROM Maps WHERE id = ?', (map_id,)).fetchone()
+        image_name = row[0] if row else None
+        bg = self._backgrounds.get(image_name)
+        if bg is None:
+            bg = self._backgrounds[image_name] = background(image_name)
+        team_id = scope[1] if scope and scope[0] == 'team' else None
+        player_id = scope[1] if scope and scope[0] == 'player' else None
+        result = render(cursor, map_id, team_id, player_id, kind, since, bg)
+        self.render_ms += (time.perf_counter() - t0) * 1000
+
+        self._cache[key] = result
+        while len(self._cache) > self.limit:
+            self._cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Vide les caches (changement de BD)."""
+        self._cache.clear()
+        self._backgrounds.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._cache),
+                'render_ms': round(self.render_ms, 1)}
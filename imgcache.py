@@ -0,0 +1,220 @@
+# imgcache.py
+# -----------------------------------------------------------------------------
+# Rôle : cache des vignettes (PhotoImage) pour load_img
+#        - clé (chemin, taille, mtime) : un fichier modifié = nouvelle entrée
+#          (la taille du fichier aussi : copy2 garde le mtime de la source)
+#        - budget mémoire (octets ≈ largeur × hauteur × 4) avec éviction LRU
+#        - « cache négatif » : fichier absent ou illisible → None mémorisé,
+#          plus d’exception ni de relecture à chaque écran
+#        - compteurs hits / misses pour voir si ça sert vraiment
+#        - on décode la vignette pré-calculée la plus proche (thumbs.py) si elle existe
+#        - get_async : décodage PIL dans un pool de threads, placeholder tout de suite ;
+#          les PhotoImage sont créées sur le thread de Tk (pompe root.after)
+# Le budget se règle dans statteam.ini :
+#   [images]
+#   cache_mb = 32
+# Les méthodes d’ImageCache s’appellent depuis le thread de Tkinter seulement ;
+# les threads du pool ne font que decode() (aucun objet Tk).
+# -----------------------------------------------------------------------------
+
+import configparser
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import thumbs
+
+DEFAULT_BUDGET_MB = 32
+
+# Coût fixe d’une entrée négative (None) : petit, mais pas gratuit
+_NEGATIVE_COST = 64
+
+# Décodages en parallèle, et intervalle (ms) de la pompe root.after qui les ramasse
+DECODE_WORKERS = min(4, os.cpu_count() or 1)
+POLL_MS = 25
+
+# Couleur des placeholders (carré sombre, même taille que l’image attendue)
+PLACEHOLDER_RGBA = (34, 39, 51, 255)
+
+
+def load_budget(config_file=None):
+    """Budget du cache en octets, selon [images] cache_mb de statteam.ini."""
+    parser = configparser.ConfigParser()
+    parser.read(config_file or db.CONFIG_FILE, encoding='utf-8')
+    try:
+        mb = parser.getfloat('images', 'cache_mb', fallback=DEFAULT_BUDGET_MB)
+    except ValueError:
+        mb = DEFAULT_BUDGET_MB
+    return max(0, int(mb * 1024 * 1024))
+
+
+# ----------------------------------------------------------------
+# decode(path, size)
+# ----------------------------------------------------------------
+# Ouvre + réduit (LANCZOS) ; retourne une image PIL, ou None si ça échoue.
+# Pas de Tkinter ici : utilisable hors du thread principal.
+def decode(path, size):
+    """Image PIL réduite à `size` (max), ou None si le fichier est absent / corrompu."""
+    try:
+        from PIL import Image  # import paresseux (coûteux au démarrage)
+        img = Image.open(path)
+        try:
+            resample = Image.Resampling.LANCZOS
+        except AttributeError:
+            resample = Image.LANCZOS
+        img.thumbnail(size, resample)
+        return img
+    except Exception:
+        return None
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# ----------------------------------------------------------------
+# ImageCache
+# ----------------------------------------------------------------
+class ImageCache:
+    """Cache LRU de PhotoImage borné en octets (voir en-tête du module)."""
+
+    def __init__(self, budget=None):
+        self.budget = load_budget() if budget is None else budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # clé → (photo ou None, coût)
+        # Asynchrone : clé → callbacks en attente ; résultats des threads → _done
+        self._pending = {}
+        self._done = queue.Queue()
+        self._pool = None
+        self._root = None
+        self._polling = False
+        self._placeholders = {}
+
+    def _lookup(self, path, size):
+        """(clé, entrée ou None) ; compte le hit s’il y a lieu."""
+        key = (path, tuple(size), _stamp(path))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return key, entry
+
+    def _finish(self, key, img):
+        """Image PIL décodée (ou None) → PhotoImage en cache. Thread de Tk seulement."""
+        photo = None
+        if img is not None:
+            try:
+                from PIL import ImageTk
+                photo = ImageTk.PhotoImage(img)
+            except Exception:
+                photo = None
+        cost = photo.width() * photo.height() * 4 if photo is not None else _NEGATIVE_COST
+        self._put(key, photo, cost)
+        return photo
+
+    def get(self, path, size=(100, 100)):
+        """PhotoImage de `path` réduite à `size`, ou None (absent / illisible)."""
+        key, entry = self._lookup(path, size)
+        if entry is not None:
+            return entry[0]
+        self.misses += 1
+        img = decode(thumbs.best_variant(path, size), size) if key[2] is not None else None
+        return self._finish(key, img)
+
+    # ------------------------------------------------------------
+    # get_async(path, size, callback)
+    # ------------------------------------------------------------
+    # - En cache : retourne la PhotoImage (callback pas appelé).
+    # - Sinon : retourne un placeholder de la taille demandée, lance decode()
+    #   dans le pool, et callback(photo ou None) sera appelé plus tard sur le
+    #   thread de Tk, par la pompe root.after (voir attach).
+    # Deux demandes de la même image pendant le décodage = un seul décodage.
+    def attach(self, root):
+        """Donne la fenêtre Tk qui porte la pompe root.after (obligatoire pour get_async)."""
+        self._root = root
+
+    def get_async(self, path, size, callback):
+        """PhotoImage si en cache, sinon placeholder + callback(photo) plus tard."""
+        key, entry = self._lookup(path, size)
+        if entry is not None:
+            return entry[0] if entry[0] is not None else self.placeholder(size)
+        if key[2] is None:
+            # Fichier absent : rien à décoder, on le retient tout de suite
+            self.misses += 1
+            self._finish(key, None)
+            return self.placeholder(size)
+
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            waiting.append(callback)
+            return self.placeholder(size)
+        self.misses += 1
+        self._pending[key] = [callback]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix='imgdecode')
+        src = thumbs.best_variant(path, size)
+        self._pool.submit(lambda: self._done.put((key, decode(src, size))))
+        if not self._polling:
+            self._polling = True
+            self._root.after(POLL_MS, self._poll)
+        return self.placeholder(size)
+
+    def _poll(self):
+        # Thread de Tk : on crée les PhotoImage et on prévient les écrans.
+        while True:
+            try:
+                key, img = self._done.get_nowait()
+            except queue.Empty:
+                break
+            photo = self._finish(key, img)
+            for callback in self._pending.pop(key, ()):
+                callback(photo)
+        if self._pending:
+            self._root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def placeholder(self, size):
+        """PhotoImage unie de la taille `size` (une par taille, gardée hors LRU)."""
+        size = tuple(size)
+        photo = self._placeholders.get(size)
+        if photo is None:
+            from PIL import Image, ImageTk
+            photo = ImageTk.PhotoImage(Image.new('RGBA', size, PLACEHOLDER_RGBA))
+            self._placeholders[size] = photo
+        return photo
+
+    def _put(self, key, photo, cost):
+        # Même clé décodée deux fois (get() pendant un get_async en cours) :
+        # on remplace l’entrée, son coût ne compte qu’une fois
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.used -= old[1]
+        if cost > self.budget:
+            return  # plus gros que le cache au complet : on ne garde pas
+        self._entries[key] = (photo, cost)
+        self.used += cost
+        while self.used > self.budget:
+            _key, (_photo, old_cost) = self._entries.popitem(last=False)
+            self.used -= old_cost
+            self.evictions += 1
+
+    def clear(self):
+        """Vide le cache (les widgets gardent leurs propres références)."""
+        self._entries.clear()
+        self.used = 0
+
+    def stats(self):
+        """Compteurs : hits, misses, evictions, entries, used (octets), budget, pending."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._entries), 'used': self.used, 'budget': self.budget,
+                'pending': len(self._pending)}
@@ -0,0 +1,283 @@
+# importer.py
+# -----------------------------------------------------------------------------
+# Rôle : import en lot des matchs historiques (CSV ou NDJSON)
+#        - lecture en flux (générateur) : le fichier n’est jamais chargé au complet
+#        - noms d’équipes / joueurs / maps résolus par dictionnaires en mémoire
+#        - une seule transaction, un SAVEPOINT par paquet, executemany partout
+#        - l’ELO (ratings.py) est mis à jour au fil des paquets, dans la même transaction
+#
+# Formats acceptés (une « game » = un match entre deux équipes, comme
+# add_match_dual_overlay) :
+#
+#   CSV (une ligne par joueur, les colonnes de la game se répètent ;
+#        les lignes d’une même game doivent se suivre) :
+#     game,date,map,team_a,team_b,score_a,score_b,team,player,kills,deaths,bombs
+#     g1,2025-03-14,Bazaar,Faze,Raven,13,9,Faze,Bob,21,12,1
+#     g1,2025-03-14,Bazaar,Faze,Raven,13,9,Raven,Zed,10,17,0
+#
+#   NDJSON (une game par ligne) :
+#     {"date": "2025-03-14 20:30", "map": "Bazaar", "team_a": "Faze", "team_b": "Raven",
+#      "score_a": 13, "score_b": 9,
+#      "players": [{"team": "Faze", "player": "Bob", "kills": 21, "deaths": 12, "bombs": 1}, ...]}
+#
+# date : optionnelle (AAAA-MM-JJ, avec ou sans l’heure). Sans date, la game ne
+# compte que dans les stats « Tout » (pas dans les fenêtres de temps).
+# rounds (NDJSON seulement, optionnel) : le détail des manches, format dans
+# rounds.py ; le nombre de rounds gagnés doit correspondre à score_a / score_b.
+#
+# Équipes, joueurs et maps inconnus sont créés au passage (create_missing=True).
+# -----------------------------------------------------------------------------
+
+import csv
+import itertools
+import json
+import os
+
+import db
+import games as games_table   # « games » est aussi le paramètre d’import_games
+import ratings
+import rounds as rounds_table
+
+# Nombre de games par paquet (un SAVEPOINT + quelques executemany par paquet)
+CHUNK_GAMES = 2000
+
+
+# ----------------------------------------------------------------
+# read_games(path)
+# ----------------------------------------------------------------
+# Générateur : donne une game à la fois, peu importe le format.
+def read_games(path):
+    """
+    Lit `path` (.csv ou .ndjson/.jsonl) et produit des dicts
+    {played_at, map, team_a, team_b, score_a, score_b, players: [{team, player, kills, deaths, bombs}],
+    rounds: [(gagné_par_a, a_en_attaque, bombe, durée)] ou None}.
+    Lève ValueError (avec le numéro de ligne) si une ligne est invalide.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.ndjson', '.jsonl', '.json'):
+        yield from _read_ndjson(path)
+    else:
+        yield from _read_csv(path)
+
+
+def _read_ndjson(path):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield _clean_game(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f'Ligne {lineno} invalide : {e}') from e
+
+
+# Colonnes obligatoires du CSV (date, kills, deaths, bombs sont optionnelles).
+# Sans « game », tout le fichier tomberait dans un seul groupe (une seule game).
+CSV_REQUIRED = ('game', 'map', 'team_a', 'team_b', 'score_a', 'score_b', 'team', 'player')
+
+
+def _read_csv(path):
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:   # fichier vide
+            return
+        missing = [c for c in CSV_REQUIRED if c not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Ligne 1 invalide : colonne(s) manquante(s) : {', '.join(missing)}")
+        for _key, rows in itertools.groupby(reader, key=lambda r: r.get('game')):
+            rows = list(rows)
+            first = rows[0]
+            try:
+                yield _clean_game({
+                    'date': first.get('date'),
+                    'map': first['map'],
+                    'team_a': first['team_a'], 'team_b': first['team_b'],
+                    'score_a': first['score_a'], 'score_b': first['score_b'],
+                    'players': [r for r in rows if (r.get('player') or '').strip()],
+                })
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f'Ligne {reader.line_num} invalide : {e}') from e
+
+
+def _clean_game(g):
+    """Normalise une game brute (str → int, espaces) et vérifie le minimum."""
+    game = {
+        'played_at': games_table.parse_date(g.get('date', g.get('played_at'))),
+        'map': g['map'].strip(),
+        'team_a': g['team_a'].strip(),
+        'team_b': g['team_b'].strip(),
+        'score_a': int(g['score_a']),
+        'score_b': int(g['score_b']),
+        'players': [{
+            'team': p['team'].strip(),
+            'player': p['player'].strip(),
+            'kills': int(p.get('kills') or 0),
+            'deaths': int(p.get('deaths') or 0),
+            'bombs': int(p.get('bombs') or 0),
+        } for p in g.get('players', ())],
+    }
+    if not game['map'] or not game['team_a'] or not game['team_b']:
+        raise ValueError('map, team_a et team_b sont requis')
+    if game['team_a'] == game['team_b']:
+        raise ValueError('team_a et team_b doivent être différentes')
+    for p in game['players']:
+        if p['team'] not in (game['team_a'], game['team_b']):
+            raise ValueError(f"le joueur {p['player']} n’est ni dans team_a ni dans team_b")
+    game['rounds'] = None
+    if g.get('rounds'):
+        game['rounds'] = rounds_table.parse(g['rounds'], game['team_a'], game['team_b'])
+        if rounds_table.wins(game['rounds']) != (game['score_a'], game['score_b']):
+            raise ValueError('les rounds détaillés ne donnent pas score_a / score_b')
+    return game
+
+
+# ----------------------------------------------------------------
+# _Names : dictionnaires nom → id
+# ----------------------------------------------------------------
+# On charge une fois les équipes / maps / joueurs existants, puis on
+# crée les inconnus au besoin (un INSERT chacun, c’est rare).
+class _Names:
+    def __init__(self, cursor, create_missing):
+        self.cursor = cursor
+        self.create_missing = create_missing
+        self.teams = {name: tid for tid, name in cursor.execute('SELECT id, name FROM Teams')}
+        self.maps = {name: mid for mid, name in cursor.execute('SELECT id, name FROM Maps')}
+        self.players = {(tid, name): pid for pid, tid, name in
+                        cursor.execute('SELECT id, team_id, name FROM Players')}
+        self.created = {'teams': 0, 'maps': 0, 'players': 0}
+
+    def _missing(self, what, name):
+        if not self.create_missing:
+            raise ValueError(f'{what} inconnu(e) : {name}')
+        self.created[what] += 1
+
+    def team(self, name):
+        if name not in self.teams:
+            self._missing('teams', name)
+            self.cursor.execute("INSERT INTO Teams(name, side) VALUES (?, 'opp')", (name,))
+            self.teams[name] = self.cursor.lastrowid
+        return self.teams[name]
+
+    def map(self, name):
+        if name not in self.maps:
+            self._missing('maps', name)
+            self.cursor.execute('INSERT INTO Maps(name) VALUES (?)', (name,))
+            self.maps[name] = self.cursor.lastrowid
+        return self.maps[name]
+
+    def player(self, team_id, name):
+        key = (team_id, name)
+        if key not in self.players:
+            self._missing('players', name)
+            self.cursor.execute('INSERT INTO Players(team_id, name) VALUES (?, ?)', key)
+            self.players[key] = self.cursor.lastrowid
+        return self.players[key]
+
+
+def _next_id(cursor, table):
+    """Prochain id libre de `table` (respecte AUTOINCREMENT / sqlite_sequence)."""
+    cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}')
+    top = cursor.fetchone()[0]
+    cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,))
+    row = cursor.fetchone()
+    return max(top, row[0] if row else 0) + 1
+
+
+# ----------------------------------------------------------------
+# import_games(conn, games, progress=None, ...)
+# ----------------------------------------------------------------
+# Le cœur de l’import :
+# - BEGIN IMMEDIATE : on prend le verrou d’écriture tout de suite, donc
+#   on peut pré-attribuer les ids de Matches et de Games (pas besoin de lastrowid,
+#   et donc executemany pour tout).
+# - Un SAVEPOINT par paquet de CHUNK_GAMES games. Si un paquet plante,
+#   on revient au savepoint puis on annule tout (rien d’importé à moitié).
+# - Les triggers des agrégats (PlayerMapTotals, totaux par semaine) sont suspendus
+#   le temps de l’import et le delta est appliqué d’un coup à la fin (db.resume_totals).
+# - progress(games, stats_rows) est appelé après chaque paquet.
+def import_games(conn, games, progress=None, create_missing=True, chunk=CHUNK_GAMES):
+    """
+    Importe l’itérable `games` (voir read_games) dans une seule transaction.
+    Retourne un dict : games, matches, player_stats, created {teams, maps, players}.
+    En cas d’erreur, tout est annulé et l’exception remonte.
+    """
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        conn.commit()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        names = _Names(cursor, create_missing)
+        first_id = next_id = _next_id(cursor, 'Matches')
+        next_game = _next_id(cursor, 'Games')
+        db.suspend_totals(cursor)
+        settings = ratings.load_settings()
+        totals = {'games': 0, 'matches': 0, 'player_stats': 0}
+
+        it = iter(games)
+        while True:
+            batch = list(itertools.islice(it, chunk))
+            if not batch:
+                break
+            game_rows, matches, lines, rated, round_rows = [], [], [], [], []
+            for g in batch:
+                mid = names.map(g['map'])
+                side_ids = {}
+                for team, won, lost in ((g['team_a'], g['score_a'], g['score_b']),
+                                        (g['team_b'], g['score_b'], g['score_a'])):
+                    tid = names.team(team)
+                    side_ids[team] = (next_id, tid)
+                    matches.append((next_id, tid, mid, won, lost, next_game, g.get('played_at')))
+                    next_id += 1
+                (ma, ta), (mb, tb) = side_ids[g['team_a']], side_ids[g['team_b']]
+                game_rows.append((next_game, mid) + games_table.ordered(ta, g['score_a'], tb, g['score_b'])
+                                 + (g.get('played_at'),))
+                if g.get('rounds'):
+                    round_rows.append((next_game, rounds_table.encode(g['rounds'], swap=ta > tb)))
+                next_game += 1
+                rated.append((ma, ta, g['score_a'], mb, tb, g['score_b']))
+                for p in g['players']:
+                    match_id, tid = side_ids[p['team']]
+                    lines.append((match_id, names.player(tid, p['player']),
+                                  p['kills'], p['deaths'], p['bombs']))
+
+            cursor.execute('SAVEPOINT import_chunk')
+            try:
+                cursor.executemany(
+                    'INSERT INTO Games(id, map_id, team_a, team_b, rounds_a, rounds_b, played_at) VALUES (?,?,?,?,?,?,?)',
+                    game_rows)
+                cursor.executemany(
+                    'INSERT INTO Matches(id, team_id, map_id, rounds_won, rounds_lost, game_id, played_at) '
+                    'VALUES (?,?,?,?,?,?,?)',
+                    matches)
+                cursor.executemany(
+                    'INSERT INTO PlayerStats(match_id, player_id, kills, deaths, bombs) VALUES (?,?,?,?,?)',
+                    lines)
+                cursor.executemany('INSERT INTO GameRounds(game_id, data) VALUES (?,?)', round_rows)
+                ratings.apply(cursor, rated, settings)
+            except Exception:
+                cursor.execute('ROLLBACK TO import_chunk')
+                raise
+            cursor.execute('RELEASE import_chunk')
+
+            totals['games'] += len(batch)
+            totals['matches'] += len(matches)
+            totals['player_stats'] += len(lines)
+            if progress:
+                progress(totals['games'], totals['player_stats'])
+
+        db.resume_totals(cursor, first_id)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    totals['created'] = names.created
+    return totals
+
+
+# ----------------------------------------------------------------
+# import_file(conn, path, progress=None, ...)
+# ----------------------------------------------------------------
+def import_file(conn, path, progress=None, create_missing=True):
+    """Raccourci : read_games(path) + import_games(conn, ...)."""
+    return import_games(conn, read_games(path), progress=progress, create_missing=create_missing)
@@ -0,0 +1,180 @@
+# leaguegen.py
+# -----------------------------------------------------------------------------
+# Rôle : fabriquer des ligues synthétiques de la taille voulue (outil de dev)
+#        - déterministe : même graine + mêmes paramètres = même contenu de BD
+#          (les dates partent de `end`, pas d’aujourd’hui, si on la donne)
+#        - ignore les limites « éducatives » de l’UI (12 équipes, 40 joueurs) :
+#          le but est justement de voir l’app à l’échelle d’une vraie ligue
+#        - passe par importer.import_games (même chemin que l’import d’historique :
+#          agrégats, ELO, Games, totaux par semaine, index de recherche)
+#        - options : détail des rounds (rounds.py), positions (events.py, NumPy)
+#
+# Usage :
+#   python leaguegen.py ligue.db --teams 1000 --players 40 --games 100000
+#       → 1 000 équipes, 40 000 joueurs, 1 000 000 lignes PlayerStats
+#   python leaguegen.py petite.db --preset small --rounds --events 40
+# -----------------------------------------------------------------------------
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+import db
+import importer
+import rounds
+
+# (équipes, joueurs par équipe, games) ; large = 1 M lignes PlayerStats
+PRESETS = {
+    'small': (50, 40, 5_000),
+    'medium': (200, 40, 25_000),
+    'large': (1_000, 40, 100_000),
+}
+
+PLAYERS_PER_SIDE = 5
+MAPS = ('Bazaar', 'Crash', 'Crossfire', 'Killhouse', 'Overgrown', 'Strike', 'Vacant', 'Wetwork')
+_WORDS = ('shadow', 'faze', 'raven', 'zorro', 'alpha', 'nova', 'ghost', 'viper', 'blaze', 'echo',
+          'titan', 'frost', 'storm', 'lynx', 'omega', 'pixel', 'rogue', 'sable', 'drake', 'kilo')
+
+
+def round_detail(rnd, p_a=0.5):
+    """
+    Une game au détail des rounds (MR12, changement de côté à 12, prolongation par 3),
+    format rounds.parse() ; p_a = chance que A gagne un round.
+    """
+    out, score = [], [0, 0]
+    a_attack = rnd.random() < 0.5
+    while True:
+        n = len(out)
+        if n == 12 or (n > 24 and (n - 24) % 3 == 0):
+            a_attack = not a_attack
+        won_a = rnd.random() < p_a
+        planted = rnd.random() < 0.45
+        bomb = (rounds.BOMB_DEFUSED if rnd.random() < 0.3 else rounds.BOMB_PLANTED) if planted else rounds.BOMB_NONE
+        out.append((won_a, a_attack, bomb, rnd.choice((0, rnd.randint(20, 115)))))
+        score[not won_a] += 1
+        if len(out) <= 24 and max(score) == 13:
+            return out
+        if len(out) >= 24 and len(out) % 6 == 0 and score[0] != score[1]:
+            return out
+
+
+# ----------------------------------------------------------------
+# generate(path, teams, players, games, ...)
+# ----------------------------------------------------------------
+# Équipes et rosters créés d’abord (ids stables, tous les joueurs existent
+# même s’ils jouent peu), puis les games en flux vers import_games. Chaque
+# équipe a une « force » : les résultats ne sont pas du pur hasard (ELO,
+# leaderboard et win-rates ont une vraie distribution).
+def generate(path, teams=200, players=40, games=25_000, seed=0, days=365, end=None,
+             with_rounds=False, events_per_game=0, progress=None):
+    """Crée la BD `path` (ne doit pas exister). Retourne un dict de comptes."""
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    rnd = random.Random(seed)
+    end = datetime.date.fromisoformat(end) if end else datetime.date.today()
+    names = [f'{rnd.choice(_WORDS).title()} {rnd.choice(_WORDS).title()} {i}' for i in range(teams)]
+    strength = [rnd.gauss(0, 1) for _ in range(teams)]
+    rosters = [[f'{rnd.choice(_WORDS)}{t}_{p}' for p in range(players)] for t in range(teams)]
+
+    conn, cursor = db.open_db(path)
+    cursor.executemany("INSERT INTO Teams(id, name, side) VALUES (?, ?, 'opp')",
+                       [(i + 1, name) for i, name in enumerate(names)])
+    cursor.executemany('INSERT INTO Players(team_id, name) VALUES (?, ?)',
+                       [(t + 1, name) for t in range(teams) for name in rosters[t]])
+    conn.commit()
+
+    def gen():
+        for _ in range(games):
+            a, b = rnd.sample(range(teams), 2)
+            day = end - datetime.timedelta(days=rnd.randint(0, days - 1))
+            played_at = f'{day.isoformat()} {rnd.randint(12, 23):02d}:{rnd.randint(0, 59):02d}:00'
+            p_a = 1 / (1 + 10 ** ((strength[b] - strength[a]) / 2))
+            if with_rounds:
+                detail = round_detail(rnd, 0.5 + (p_a - 0.5) / 3)   # un round est moins joué d’avance qu’une game
+                score_a, score_b = rounds.wins(detail)
+            else:
+                detail = None
+                loser = rnd.randint(0, 11)
+                score_a, score_b = (13, loser) if rnd.random() < p_a else (loser, 13)
+            lines = []
+            for t, won in ((a, score_a > score_b), (b, score_b > score_a)):
+                for name in rnd.sample(rosters[t], min(PLAYERS_PER_SIDE, players)):
+                    kills = max(0, int(rnd.gauss(17 + 3 * won + 2 * strength[t], 5)))
+                    lines.append({'team': names[t], 'player': name, 'kills': kills,
+                                  'deaths': max(0, int(rnd.gauss(17 - 3 * won, 5))), 'bombs': rnd.randint(0, 2)})
+            yield {'played_at': played_at, 'map': rnd.choice(MAPS), 'team_a': names[a], 'team_b': names[b],
+                   'score_a': score_a, 'score_b': score_b, 'players': lines, 'rounds': detail}
+
+    res = importer.import_games(conn, gen(), progress=progress)
+    if events_per_game:
+        _add_events(conn, cursor, events_per_game, seed)
+    counts = {table: cursor.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+              for table in ('Teams', 'Players', 'Maps', 'Games', 'Matches', 'PlayerStats', 'GameRounds',
+                            'GameEvents')}
+    conn.close()
+    counts['imported_games'] = res['games']
+    return counts
+
+
+def _add_events(conn, cursor, per_game, seed):
+    """Positions (events.py) autour de quelques zones chaudes par map, pour chaque game."""
+    import numpy as np
+    import events
+
+    rng = np.random.default_rng(seed)
+    hot = {mid: rng.uniform(0.15, 0.85, size=(8, 2)) for mid, in cursor.execute('SELECT id FROM Maps')}
+    rosters = {}
+    for pid, tid in cursor.execute('SELECT id, team_id FROM Players ORDER BY id'):
+        rosters.setdefault(tid, []).append(pid)
+    rows = []
+    for game_id, map_id, team_a, team_b in cursor.execute(
+            'SELECT id, map_id, team_a, team_b FROM Games ORDER BY id').fetchall():
+        ev = np.empty(per_game, dtype=events.event_dtype())
+        centers = hot[map_id][rng.integers(0, len(hot[map_id]), per_game)]
+        ev['x'] = np.clip(centers[:, 0] + rng.normal(0, 0.04, per_game), 0, 1)
+        ev['y'] = np.clip(centers[:, 1] + rng.normal(0, 0.04, per_game), 0, 1)
+        ev['player'] = rng.choice(rosters[team_a] + rosters[team_b], per_game)
+        ev['kind'] = rng.integers(1, len(events.KINDS) + 1, per_game)
+        ev['round'] = rng.integers(1, 25, per_game)
+        rows.append((game_id, ev))
+    cursor.execute('BEGIN IMMEDIATE')
+    events.store(cursor, rows)
+    conn.commit()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Ligue synthétique StatTeam (déterministe)')
+    ap.add_argument('output', help='fichier .db à créer')
+    ap.add_argument('--preset', choices=sorted(PRESETS), help='tailles toutes faites (écrasées par les options)')
+    ap.add_argument('--teams', type=int)
+    ap.add_argument('--players', type=int, help='joueurs par équipe')
+    ap.add_argument('--games', type=int)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--days', type=int, default=365, help='étalement des dates (jours avant --end)')
+    ap.add_argument('--end', help='dernière date AAAA-MM-JJ (défaut : aujourd’hui)')
+    ap.add_argument('--rounds', action='store_true', help='avec le détail des rounds')
+    ap.add_argument('--events', type=int, default=0, metavar='N', help='N positions par game (heatmaps)')
+    ap.add_argument('--force', action='store_true', help='remplacer le fichier s’il existe')
+    args = ap.parse_args(argv)
+
+    teams, players, games = PRESETS[args.preset or 'medium']
+    teams, players, games = args.teams or teams, args.players or players, args.games or games
+    if args.force and os.path.exists(args.output):
+        os.remove(args.output)
+    t0 = time.perf_counter()
+    try:
+        counts = generate(args.output, teams, players, games, args.seed, args.days, args.end,
+                          args.rounds, args.events,
+                          progress=lambda n, lines: print(f'\r{n}/{games} games', end='', file=sys.stderr))
+    except FileExistsError:
+        raise SystemExit(f'{args.output} existe déjà (--force pour le remplacer)')
+    print(file=sys.stderr)
+    print(' | '.join(f'{k} {v}' for k, v in counts.items()))
+    print(f'{time.perf_counter() - t0:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
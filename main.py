@@ -1,142 +1,74 @@
 # ================================================================
 # IMPORTATIONS DE BIBLIOTHÈQUES
 # ------------------------------------------------
+# startup : chrono du démarrage (EN PREMIER, avant tout le reste)
+import startup
+
 # Tkinter et ttk : interface graphique (widgets, styles, boîtes de dialogue)
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
 # sqlite3 : petite BD locale intégrée à Python
-# os/shutil/sys : fichiers, chemins, infos du système
-# pyperclip : copier du texte dans le presse-papier
-import sqlite3, os, shutil, pyperclip
-
-# PIL (Pillow) : ouvrir/redimensionner des images
-from PIL import Image, ImageTk
-
-# Matplotlib : graphiques intégrés dans Tkinter
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-
-# CSV : export de rapports
-import csv
-
-# sys : détecter si l’app roule en exécutable (PyInstaller, etc.)
-import sys
-
-# ───────────────────────── PATHS / DB ──────────────────────────
-# Truc simple : si on est dans un .exe, on prend le dossier de l’exe,
-# sinon on prend le dossier du script. Pas plus compliqué que ça.
-if getattr(sys, 'frozen', False):
-    BASE_DIR = os.path.dirname(sys.executable)
-else:
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# Emplacements par défaut : fichier de BD, dossier d’images,
-# et petit fichier texte qui retient la dernière BD ouverte.
-DB_PATH = os.path.join(BASE_DIR, 'statteam.db')
-IMAGES_DIR = os.path.join(BASE_DIR, 'images')
-LAST_DB_FILE = os.path.join(BASE_DIR, 'last_db.txt')
-
-def get_last_db():
-    """
-    Recharge la dernière BD utilisée si on la retrouve (question de qualité de vie).
-    S’il n’y a rien, on retombe sur la BD par défaut à côté de l’app.
-    """
-    if os.path.exists(LAST_DB_FILE):
-        with open(LAST_DB_FILE, 'r', encoding='utf-8') as f:
-            path = f.read().strip()
-            if os.path.exists(path):
-                return path
-    return DB_PATH
-
-# Chemin courant vers la BD (peut changer si l’usager en ouvre une autre)
-CURRENT_DB_PATH = get_last_db()
-
-# S’assurer que le dossier d’images existe pour éviter des erreurs bêtes.
-os.makedirs(IMAGES_DIR, exist_ok=True)
-
-# ────────────────────────── SCHEMA ─────────────────────────────
-# Schéma SQL complet. On crée « au besoin » (IF NOT EXISTS) tout ce qu’il faut :
-# équipes, joueurs, maps, matchs, stats de joueurs, comptes capitaines,
-# et le lien « capitaine propriétaire » d’une équipe.
-SCHEMA = '''
-CREATE TABLE IF NOT EXISTS Teams(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    logo TEXT,
-    side TEXT NOT NULL DEFAULT 'my');
-
-CREATE TABLE IF NOT EXISTS Players(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_id INTEGER NOT NULL,
-    name TEXT NOT NULL,
-    logo TEXT,
-    FOREIGN KEY(team_id) REFERENCES Teams(id) ON DELETE CASCADE);
-
-CREATE TABLE IF NOT EXISTS Maps(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT UNIQUE NOT NULL,
-    image TEXT DEFAULT '');
-
-CREATE TABLE IF NOT EXISTS Matches(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_id INTEGER NOT NULL,
-    map_id INTEGER NOT NULL,
-    rounds_won INTEGER DEFAULT 0,
-    rounds_lost INTEGER DEFAULT 0,
-    FOREIGN KEY(team_id) REFERENCES Teams(id) ON DELETE CASCADE,
-    FOREIGN KEY(map_id) REFERENCES Maps(id) ON DELETE CASCADE);
-
-CREATE TABLE IF NOT EXISTS PlayerStats(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    match_id INTEGER NOT NULL,
-    player_id INTEGER NOT NULL,
-    kills INTEGER DEFAULT 0,
-    deaths INTEGER DEFAULT 0,
-    bombs INTEGER DEFAULT 0,
-    FOREIGN KEY(match_id) REFERENCES Matches(id) ON DELETE CASCADE,
-    FOREIGN KEY(player_id) REFERENCES Players(id) ON DELETE CASCADE);
-
-CREATE TABLE IF NOT EXISTS Captains(
-    username TEXT PRIMARY KEY,
-    password TEXT NOT NULL);
-
-CREATE TABLE IF NOT EXISTS TeamOwners(
-    team_id INTEGER UNIQUE,
-    captain TEXT NOT NULL,
-    FOREIGN KEY(team_id) REFERENCES Teams(id) ON DELETE CASCADE,
-    FOREIGN KEY(captain) REFERENCES Captains(username) ON DELETE CASCADE);
-
--- Règle d’affaires claire :
--- - 1 capitaine max par équipe (déjà UNIQUE(team_id))
--- - un capitaine ne peut pas gérer deux équipes.
--- On met un UNIQUE sur la colonne captain et c’est réglé.
-CREATE UNIQUE INDEX IF NOT EXISTS uq_teamowners_captain ON TeamOwners(captain);
--- Fin des règles d’affaires
-'''
+# os : fichiers, chemins ; sys : le module de l’app, passé au crochet de démarrage
+import sqlite3, os, sys, base64
+
+# PIL (Pillow) et Matplotlib : importés seulement au besoin (load_img,
+# charts.py). Ce sont les plus gros imports : les garder ici
+# retardait l’écran de connexion pour rien.
+
+# db : chemins, schéma/migrations et connexion (tout est dans db.py)
+import db
+from db import BASE_DIR, IMAGES_DIR
+
+# stats : requêtes de statistiques (fiches joueurs, équipes, etc.)
+import stats
+
+# ratings : classement ELO des équipes (mis à jour à chaque match enregistré)
+import ratings
+
+# games : les deux côtés d’un match reliés (face-à-face, win-rate contre un adversaire)
+import games
+
+# importer : import en lot des matchs historiques (CSV / NDJSON)
+import importer
+
+# exports : rapports CSV (requêtes triées en SQL, écriture en flux)
+import exports
+
+# vlist : listes défilantes « virtuelles » (seules les lignes visibles ont des widgets)
+import vlist
+
+# screens : écrans gardés en mémoire (retour sans tout reconstruire)
+import screens
+
+# charts : graphiques de l’analyse (figures réutilisées, rendus en cache)
+import charts
+
+# rounds : détail des manches (import NDJSON) et stats par round (NumPy, au besoin)
+import rounds
+
+# events / heatmaps : positions des kills / morts / bombes et heatmaps par map (NumPy + Pillow, au besoin)
+import events, heatmaps
+
+# search : recherche par nom pendant la frappe (index FTS5 tenu à jour par triggers)
+import search
+
+# imgcache : cache LRU des vignettes utilisées par load_img
+# thumbs : vignettes pré-calculées sur disque (images/.thumbs)
+# blobs : images rangées par hash de contenu (pas de doublons, ménage des orphelines)
+import imgcache, thumbs, blobs
+
+startup.mark('imports')
 
 def reconnect_db(path):
     """
-    Ouvre/rouvre une BD SQLite, réapplique le schéma, met à jour le curseur
-    et mémorise le choix dans LAST_DB_FILE. Ensuite on retourne à l’écran de connexion.
+    Ouvre/rouvre une BD SQLite (db.reconnect : migrations au besoin, LAST_DB_FILE mis à jour),
+    met à jour le curseur global. Ensuite on retourne à l’écran de connexion.
     """
-    global conn, cursor, CURRENT_DB_PATH
-    try:
-        conn.close()
-    except:
-        # Si ça existait pas ou c’était déjà fermé : pas grave.
-        pass
-    CURRENT_DB_PATH = path
-    # Garder la trace du dernier fichier ouvert
-    with open(LAST_DB_FILE, 'w', encoding='utf-8') as f:
-        f.write(CURRENT_DB_PATH)
-    # Connexion + activer les clés étrangères (sinon SQLite laisse passer trop de trucs)
-    conn = sqlite3.connect(CURRENT_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('PRAGMA foreign_keys = ON')
-    # On s’assure que tout le schéma est bien en place
-    cursor.executescript(SCHEMA)
-    conn.commit()
+    global conn, cursor
+    conn, cursor = db.reconnect(path, conn)
+    chart_service.clear()  # mêmes id / générations, mais autre BD
+    heatmap_service.clear()
     # Retour à l’accueil
     show_login()
 
@@ -162,13 +94,64 @@ def load_db():
     except Exception as e:
         messagebox.showerror('Erreur', f'Échec chargement : {e}')
 
+def import_history():
+    """
+    Import en lot de matchs historiques (CSV ou NDJSON, voir importer.py).
+    Une seule transaction : si le fichier a un problème, rien n’est importé.
+    """
+    file = filedialog.askopenfilename(
+        title='Importer un historique de matchs',
+        filetypes=[('CSV / NDJSON', '*.csv;*.ndjson;*.jsonl'), ('Tous Fichiers', '*.*')]
+    )
+    if not file:
+        return
+    win = tk.Toplevel(root)
+    win.title('Import en cours')
+    win.configure(bg=BG)
+    open_child(win, width=420, height=140)
+    status = tk.Label(win, text='Lecture du fichier…', fg=FG, bg=BG, font=('Consolas', 12))
+    status.pack(expand=True)
+
+    def on_progress(n_games, lines):
+        status.configure(text=f'{n_games} games | {lines} lignes joueurs')
+        win.update_idletasks()
+
+    try:
+        res = importer.import_file(conn, file, progress=on_progress)
+    except Exception as e:
+        win.destroy()
+        messagebox.showerror('Erreur', f'Import annulé : {e}')
+        return
+    win.destroy()
+    screens_mgr.bump('teams', 'players', 'maps', 'matches')
+    created = res['created']
+    messagebox.showinfo('Succès',
+                        f"{res['games']} games importées ({res['player_stats']} lignes joueurs).\n"
+                        f"Créés : {created['teams']} équipes, {created['players']} joueurs, {created['maps']} maps.")
+    load_home()
+
+def import_events():
+    """Import des positions (kills, morts, bombes) des games déjà en BD (voir events.py)."""
+    file = filedialog.askopenfilename(
+        title='Importer des positions (heatmaps)',
+        filetypes=[('NDJSON / CSV', '*.ndjson;*.jsonl;*.csv'), ('Tous Fichiers', '*.*')]
+    )
+    if not file:
+        return
+    try:
+        res = events.ingest_file(conn, file)
+    except Exception as e:
+        messagebox.showerror('Erreur', f'Import annulé : {e}')
+        return
+    screens_mgr.bump('events')
+    messagebox.showinfo('Succès', f"{res['events']} positions importées ({res['games']} games).")
+
 # Connexion initiale
-# On ouvre la BD courante, on active les FK et on applique le schéma.
-conn = sqlite3.connect(CURRENT_DB_PATH)
-cursor = conn.cursor()
-cursor.execute('PRAGMA foreign_keys = ON')
-cursor.executescript(SCHEMA)
-conn.commit()
+# On ouvre la BD courante, on active les FK et on migre le schéma si besoin.
+conn, cursor = db.connect()
+startup.mark('base de données')
+# Noms d’images par hash et vignettes manquantes : une seule fois par BD,
+# avec les migrations (étape 14, db._migrate_images)
 
 # ───────────────────────── CONSTANTES UI ───────────────────────
 BG = '#0f1115'
@@ -184,6 +167,7 @@ root = tk.Tk()
 root.title('Statistic Team')
 root.geometry('1400x800')
 root.configure(bg=BG)
+startup.mark('fenêtre Tk')
 
 # États globaux
 current_team = None
@@ -194,10 +178,30 @@ _overlay = None
 current_role = None              # 'visitor' | 'captain' | 'admin'
 current_captain = None           # username si captain
 
-# Caches images
+# Tri du leaderboard de l’accueil : 'wins' (défaut) ou 'rating' (ELO)
+leaderboard_order = 'wins'
+
+# Fenêtre de temps des stats (stats.py : None = tout, sinon un lundi 'AAAA-MM-JJ').
+# window_var : libellé choisi, partagé par tous les sélecteurs (window_picker)
+stats_since = None
+window_var = tk.StringVar(root, value=stats.WINDOWS[0][0])
+
+# Références d’images de l’écran d’analyse (les autres écrans : set_img_async / widget.image)
 team_images = {}
-player_images = {}
-map_images = {}
+
+# Exports en tâche de fond (un thread, sa propre connexion en lecture seule)
+export_jobs = exports.ExportQueue()
+
+# Écrans visités gardés en mémoire ; après chaque écriture en BD : screens_mgr.bump(domaines)
+screens_mgr = screens.ScreenManager(root, bg=BG)
+
+# Graphiques de l’analyse : une Figure par type, rendus gardés par (équipe, génération des données)
+chart_service = charts.ChartService()
+chart_service.register('winrate', 'Win Rate (%)')
+chart_service.register('kd', 'K/D')
+
+# Heatmaps de l’analyse : PNG gardés par (map, équipe, type, fenêtre, génération des données)
+heatmap_service = heatmaps.HeatmapService()
 
 # ───────────────────────── UTILITAIRES STYLE ───────────────────
 def configure_styles():
@@ -236,34 +240,46 @@ def configure_styles():
     style.map('Login.TNotebook.Tab', background=[('selected', '#2a3142')])
 
 configure_styles()
+startup.mark('styles')
 
 # ────────────────────────── HELPERS ────────────────────────────
+# Cache des vignettes pour toute l’app (voir imgcache.py) : revenir sur un
+# écran ne redécode plus les mêmes logos, et un fichier absent n’est tenté qu’une fois.
+img_cache = imgcache.ImageCache()
+img_cache.attach(root)
+
 def load_img(path, size=(100, 100)):
-    """Ouvre une image, la réduit et retourne PhotoImage; None si ça échoue. Simple de même."""
-    try:
-        img = Image.open(path)
-        try:
-            resample = Image.Resampling.LANCZOS
-        except AttributeError:
-            resample = Image.LANCZOS
-        img.thumbnail(size, resample)
-        return ImageTk.PhotoImage(img)
-    except Exception:
-        return None
+    """Retourne la PhotoImage réduite (depuis le cache); None si l’image est absente/illisible."""
+    return img_cache.get(path, size)
+
+def set_img_async(widget, path, size):
+    """
+    Met l’image `path` sur `widget` (Label/Button) sans bloquer l’écran :
+    placeholder tout de suite (ou l’image si déjà en cache), vraie image dès
+    qu’un thread l’a décodée. Le widget garde sa référence (widget.image).
+    """
+    def swap(photo):
+        if photo is not None and widget.winfo_exists():
+            widget.configure(image=photo)
+            widget.image = photo
+    photo = img_cache.get_async(path, size, swap)
+    widget.configure(image=photo)
+    widget.image = photo
 
 def copy_to_images(src):
     """
-    Copie un fichier image dans /images et retourne juste le nom du fichier.
-    Si rien passé : retourne '' (pas d’image).
+    Range l’image dans /images sous son hash (blobs.store) et retourne ce nom.
+    Même image déjà là → pas de copie. Les vignettes (thumbs.py) suivent en arrière-plan.
+    Si rien passé (ou fichier illisible) : retourne '' (pas d’image).
     """
     if not src:
         return ''
-    dest = os.path.join(IMAGES_DIR, os.path.basename(src))
     try:
-        shutil.copy2(src, dest)
-    except Exception:
-        pass
-    return os.path.basename(dest)
+        name = blobs.store(src)
+    except OSError:
+        return ''
+    thumbs.build_async(name)
+    return name
 
 def show_overlay():
     """
@@ -324,6 +340,107 @@ def bind_mousewheel(canvas):
     canvas.bind("<Enter>", _bind)
     canvas.bind("<Leave>", _unbind)
 
+def make_vlist(parent, row_height, create_row, fill_row, items, columns=1, **pack):
+    """
+    Liste virtuelle (vlist.VirtualList) prête à l’emploi : packée dans `parent`,
+    molette branchée, remplie avec `items`. Voir vlist.py pour create_row/fill_row.
+    """
+    vl = vlist.VirtualList(parent, row_height, create_row, fill_row, columns=columns, bg=BG)
+    vl.frame.pack(fill='both', expand=True, **pack)
+    bind_mousewheel(vl.canvas)  # 👈 molette
+    vl.set_items(items)
+    return vl
+
+# ----------------------------------------------------------------
+# window_picker(parent)
+# ----------------------------------------------------------------
+# Sélecteur « Tout / 7 jours / 30 jours / 90 jours / Split ». Même StringVar
+# partout : changer ici change l’affichage de tous les écrans gardés. Les
+# parties qui dépendent de 'window' sont refaites (tout de suite pour l’écran
+# affiché, au retour pour les autres).
+def window_picker(parent):
+    def on_select(_event=None):
+        global stats_since
+        stats_since = dict(stats.load_windows()).get(window_var.get())
+        screens_mgr.bump('window')
+        root.after_idle(screens_mgr.refresh)
+    box = ttk.Combobox(parent, textvariable=window_var, state='readonly', width=10,
+                       values=[label for label, _since in stats.load_windows()])
+    box.bind('<<ComboboxSelected>>', on_select)
+    return box
+
+# Recherche : on attend cette pause dans la frappe avant d’interroger l’index
+SEARCH_DELAY_MS = 150
+SEARCH_LABELS = {'team': 'Équipe', 'player': 'Joueur', 'map': 'Map'}
+
+def search_entry(parent, host, kinds, on_pick, width=24, text=''):
+    """
+    Champ de recherche (search.py) : les résultats s’affichent sous le champ, dans `host`
+    (l’écran ou l’overlay), SEARCH_DELAY_MS après la dernière touche. on_pick(type, id, nom) au choix.
+    """
+    var = tk.StringVar(value=text)
+    entry = ttk.Entry(parent, textvariable=var, width=width, style='Login.TEntry')
+    popup = tk.Listbox(host, bg=SUB_HDR, fg=FG, selectbackground=ACCENT, selectforeground=BG,
+                       font=('Consolas', 11), activestyle='none', highlightthickness=1,
+                       highlightbackground=ACCENT, bd=0)
+    results = []
+    pending = None
+
+    def hide(_event=None):
+        popup.place_forget()
+
+    def run():
+        nonlocal pending
+        pending = None
+        results[:] = search.search(cursor, var.get(), kinds)
+        popup.delete(0, 'end')
+        if not results or not entry.winfo_ismapped():
+            hide(); return
+        for kind, _id, name, team in results:
+            popup.insert('end', f"{SEARCH_LABELS[kind]} · {name}" + (f"  ({team})" if team else ''))
+        popup.configure(height=len(results))
+        popup.place(x=entry.winfo_rootx() - host.winfo_rootx(),
+                    y=entry.winfo_rooty() - host.winfo_rooty() + entry.winfo_height(),
+                    width=max(entry.winfo_width(), 320))
+        popup.lift()
+
+    def on_key(event):
+        nonlocal pending
+        if event.keysym in ('Return', 'Escape', 'Down', 'Up', 'Tab'):
+            return
+        if pending:
+            entry.after_cancel(pending)
+        pending = entry.after(SEARCH_DELAY_MS, run)
+
+    def pick(index):
+        if 0 <= index < len(results):
+            kind, item_id, name, _team = results[index]
+            var.set(name); hide()
+            on_pick(kind, item_id, name)
+
+    def selected():
+        sel = popup.curselection()
+        return sel[0] if sel else 0
+
+    def to_list(_event=None):
+        if results:
+            popup.focus_set(); popup.selection_clear(0, 'end'); popup.selection_set(0); popup.activate(0)
+
+    entry.bind('<KeyRelease>', on_key)
+    entry.bind('<Return>', lambda _e: pick(selected()) if results else None)
+    entry.bind('<Down>', to_list)
+    entry.bind('<Escape>', hide)
+    entry.bind('<FocusOut>', lambda _e: entry.after(
+        SEARCH_DELAY_MS, lambda: hide() if popup.winfo_exists() and root.focus_get() is not popup else None))
+    popup.bind('<Button-1>', lambda e: pick(popup.nearest(e.y)))
+    popup.bind('<Return>', lambda _e: pick(selected()))
+    popup.bind('<Escape>', lambda _e: (hide(), entry.focus_set()))
+    return entry
+
+def window_suffix():
+    """' (30 jours)' si une fenêtre est choisie, '' sinon (pour les libellés)."""
+    return f' ({window_var.get()})' if stats_since is not None else ''
+
 def is_admin(): return current_role == 'admin'
 
 def is_captain():
@@ -356,6 +473,7 @@ def show_login():
     if _overlay:
         _overlay.destroy()
         _overlay = None
+    screens_mgr.clear()  # changement de rôle / de BD : aucun écran gardé n’est valide
     for w in root.winfo_children():
         w.destroy()
     current_role = None
@@ -616,6 +734,7 @@ def delete_map_overlay():
         if messagebox.askyesno('Confirmer', f'Supprimer la map « {sel.get()} » ?'):
             cursor.execute('DELETE FROM Maps WHERE id=?', (mid,))
             conn.commit()
+            screens_mgr.bump('maps', 'matches')  # ses matchs partent en cascade
             ov.destroy()
             load_home()
     frm = tk.Frame(ov, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
@@ -657,14 +776,14 @@ def database_overlay():
                     filetypes=[('SQLite DB','*.db;*.sqlite'),('Tous Fichiers','*.*')]
                 )
                 if backup:
-                    shutil.copy2(CURRENT_DB_PATH, backup)
+                    db.backup(conn, backup)
             reconnect_db(new_file)
             messagebox.showinfo('Succès', f'Nouvelle base créée : {os.path.basename(new_file)}')
             ov.destroy()
         except Exception as e:
             messagebox.showerror('Erreur', f'Échec création : {e}')
     frm = tk.Frame(ov, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
-    frm.place(relx=0.5, rely=0.5, anchor='center', width=520, height=280)
+    frm.place(relx=0.5, rely=0.5, anchor='center', width=520, height=330)
     tk.Label(frm, text='NAVIGATION BASE DE DONNÉES', fg=FG, bg=SUB_HDR,
              font=('Arial', 18, 'bold')).pack(pady=(14,10))
     btn_frame = tk.Frame(frm, bg=BG)
@@ -672,6 +791,10 @@ def database_overlay():
     opt_btn = dict(bg=ACCENT, fg=BG, font=('Arial', 12, 'bold'), bd=0, width=20, pady=10)
     tk.Button(btn_frame, text='Créer nouvelle base vide', command=create_new_db, **opt_btn).pack(pady=5)
     tk.Button(btn_frame, text='Charger base existante', command=load_db, **opt_btn).pack(pady=5)
+    tk.Button(btn_frame, text='Importer historique', command=lambda: (ov.destroy(), import_history()),
+              **opt_btn).pack(pady=5)
+    tk.Button(btn_frame, text='Importer positions', command=lambda: (ov.destroy(), import_events()),
+              **opt_btn).pack(pady=5)
     bar = tk.Frame(frm, bg=SUB_HDR)
     bar.pack(side='bottom', fill='x', pady=8)
     tk.Button(bar, text='Annuler', command=ov.destroy, bg=ACCENT, fg=BG,
@@ -718,6 +841,7 @@ def add_team_overlay():
 
         # Pas d’auto-association de propriétaire ici : l’admin attribue ça ailleurs.
         conn.commit()
+        screens_mgr.bump('teams')
         ov.destroy()
         load_home()
 
@@ -778,6 +902,7 @@ def edit_team_overlay(tid):
         cursor.execute('UPDATE Teams SET name=?,logo=?,side=? WHERE id=?',
                        (name, logo, new_side, tid))
         conn.commit()
+        screens_mgr.bump('teams')
         ov.destroy()
         open_team(tid)
     root.update_idletasks()
@@ -828,6 +953,7 @@ def add_map_overlay():
         img = copy_to_images(img_path)
         cursor.execute('UPDATE Maps SET image=? WHERE name=?', (img, name))
         conn.commit()
+        screens_mgr.bump('maps')
         ov.destroy(); load_home()
     frm = tk.Frame(ov, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
     frm.place(relx=0.5, rely=0.5, anchor='center', width=620, height=400)
@@ -868,7 +994,8 @@ def edit_map_overlay(mid):
             messagebox.showerror('Erreur', 'Le nom ne peut pas dépasser 35 caractères'); return
         new_img = copy_to_images(img_path)
         cursor.execute('UPDATE Maps SET name=?,image=? WHERE id=?', (name, new_img, mid))
-        conn.commit(); ov.destroy(); load_home()
+        conn.commit(); screens_mgr.bump('maps')
+        ov.destroy(); load_home()
     frm = tk.Frame(ov, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
     frm.place(relx=0.5, rely=0.5, anchor='center', width=620, height=400)
     tk.Label(frm, text='MODIFIER MAP', fg=FG, bg=SUB_HDR, font=('Arial', 18, 'bold')).pack(pady=(14, 10))
@@ -910,7 +1037,8 @@ def add_player_overlay(team_id):
             messagebox.showerror('Limite atteinte', 'Version payante nécessaire pour plus de 40 joueurs'); return
         logo = copy_to_images(logo_path)
         cursor.execute('INSERT INTO Players(team_id,name,logo) VALUES (?,?,?)', (team_id, name, logo))
-        conn.commit(); ov.destroy(); open_team(team_id)
+        conn.commit(); screens_mgr.bump('players')
+        ov.destroy(); open_team(team_id)
     frm = tk.Frame(ov, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
     frm.place(relx=0.5, rely=0.5, anchor='center', width=620, height=400)
     tk.Label(frm, text='AJOUTER UN JOUEUR', fg=FG, bg=SUB_HDR, font=('Arial', 18, 'bold')).pack(pady=(14, 10))
@@ -950,7 +1078,8 @@ def edit_player_overlay(pid):
             messagebox.showerror('Erreur', 'Le nom ne peut pas dépasser 35 caractères'); return
         logo = copy_to_images(logo_path)
         cursor.execute('UPDATE Players SET name=?,logo=? WHERE id=?', (name, logo, pid))
-        conn.commit(); ov.destroy(); open_team(team_id)
+        conn.commit(); screens_mgr.bump('players')
+        ov.destroy(); open_team(team_id)
     frm = tk.Frame(ov, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
     frm.place(relx=0.5, rely=0.5, anchor='center', width=620, height=400)
     tk.Label(frm, text='MODIFIER JOUEUR', fg=FG, bg=SUB_HDR, font=('Arial', 18, 'bold')).pack(pady=(14, 10))
@@ -972,7 +1101,11 @@ def delete_team(tid):
     if not (is_admin() or team_owned_by_current_captain(tid)): return
     if messagebox.askyesno('Confirmer', 'Supprimer cette équipe ?'):
         cursor.execute('DELETE FROM Teams WHERE id=?', (tid,))
-        conn.commit(); load_home()
+        conn.commit()
+        # Cascade : joueurs, matchs et propriétaire partent avec l’équipe
+        screens_mgr.bump('teams', 'players', 'matches', 'owners')
+        screens_mgr.drop(('team', tid)); screens_mgr.drop(('analyse', tid))
+        load_home()
 
 def delete_player(pid):
     """Supprime un joueur (admin/capitaine proprio)."""
@@ -983,91 +1116,48 @@ def delete_player(pid):
     if not (is_admin() or team_owned_by_current_captain(team_id)): return
     if messagebox.askyesno('Confirmer', 'Supprimer ce joueur ?'):
         cursor.execute('DELETE FROM Players WHERE id=?', (pid,))
-        conn.commit(); open_team(team_id)
+        conn.commit(); screens_mgr.bump('players', 'matches')
+        screens_mgr.drop(('player', pid))
+        open_team(team_id)
 
 # ======================================================================
 # Exports CSV
 # ======================================================================
-def export_best_players():
+def export_report(name):
+    """
+    Demande où enregistrer puis met le rapport `name` (voir exports.REPORTS) dans
+    la file d’exports. L’écriture se fait en arrière-plan : l’UI ne gèle plus,
+    et la progression s’affiche dans la fenêtre « Exporter rapports ».
+    """
+    title = exports.REPORTS[name]['title']
     path = filedialog.asksaveasfilename(
-        title='Enregistrer rapport Meilleurs Joueurs',
+        title=f'Enregistrer rapport {title}',
         defaultextension='.csv',
         filetypes=[('CSV','*.csv')]
     )
     if not path: return
-    cursor.execute('''
-        SELECT p.name, COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0)
-        FROM Players p
-        LEFT JOIN PlayerStats ps ON ps.player_id=p.id
-        GROUP BY p.id
-    ''')
-    data = cursor.fetchall()
-    players = [(name, k, d, (k/d if d else k)) for name, k, d in data]
-    players.sort(key=lambda x: x[3], reverse=True)
-    # 👉 Excel-proof : utf-8-sig
-    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Joueur','Total_Kills','Total_Deaths','KD'])
-        for name, k, d, kd in players:
-            writer.writerow([name, k, d, f"{kd:.2f}"])
-    messagebox.showinfo('Succès', 'Rapport Meilleurs Joueurs enregistré.')
+    export_jobs.submit(name, path, db.CURRENT_DB_PATH)
+
+def export_best_players():
+    export_report('best_players')
 
 def export_best_teams():
-    path = filedialog.asksaveasfilename(
-        title='Enregistrer rapport Meilleures Équipes',
-        defaultextension='.csv',
-        filetypes=[('CSV','*.csv')]
-    )
-    if not path: return
-    cursor.execute('''
-        SELECT t.name, COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
-        FROM Teams t
-        LEFT JOIN Matches m ON m.team_id=t.id
-        GROUP BY t.id
-    ''')
-    data = cursor.fetchall()
-    teams = [(name, w, l, (w/(w+l)*100 if (w+l) else 0)) for name, w, l in data]
-    teams.sort(key=lambda x: x[3], reverse=True)
-    # 👉 Excel-proof : utf-8-sig
-    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Équipe','Victoires','Défaites','WinRate_%'])
-        for name, w, l, wr in teams:
-            writer.writerow([name, w, l, f"{wr:.1f}"])
-    messagebox.showinfo('Succès', 'Rapport Meilleures Équipes enregistré.')
+    export_report('best_teams')
 
 def export_most_played_maps():
-    path = filedialog.asksaveasfilename(
-        title='Enregistrer rapport Maps les plus jouées',
-        defaultextension='.csv',
-        filetypes=[('CSV','*.csv')]
-    )
-    if not path: return
-    cursor.execute('''
-        SELECT mp.name,
-               COALESCE(SUM(mt.rounds_won),0)+COALESCE(SUM(mt.rounds_lost),0)
-        FROM Maps mp
-        LEFT JOIN Matches mt ON mt.map_id=mp.id
-        GROUP BY mp.id
-    ''')
-    data = cursor.fetchall()
-    maps = sorted(data, key=lambda x: x[1], reverse=True)
-    # 👉 Excel-proof : utf-8-sig
-    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Map','Total_Rounds'])
-        for name, total in maps:
-            writer.writerow([name, total])
-    messagebox.showinfo('Succès', 'Rapport Maps les plus jouées enregistré.')
+    export_report('most_played_maps')
 
 def export_overlay():
     """
     Version fenêtre (Toplevel) — ne bloque plus toute l’UI.
+    Les exports lancés ici roulent en arrière-plan (file export_jobs); on
+    vient lire leur avancement avec root.after, sans jamais toucher Tkinter
+    depuis le thread de fond.
     """
     win = tk.Toplevel(root)
     win.title("Exporter rapports")
     win.configure(bg=BG)
-    open_child(win, width=420, height=300)
+    open_child(win, width=460, height=520)
 
     frm = tk.Frame(win, bg=SUB_HDR, bd=2, highlightbackground=ACCENT, highlightthickness=2)
     frm.pack(fill='both', expand=True, padx=12, pady=12)
@@ -1076,7 +1166,7 @@ def export_overlay():
              font=('Arial', 18, 'bold')).pack(pady=(14,10))
 
     btn_frame = tk.Frame(frm, bg=BG)
-    btn_frame.pack(fill='both', expand=True, pady=10)
+    btn_frame.pack(fill='x', pady=10)
 
     opt_btn = dict(bg=ACCENT, fg='#04120d', font=('Arial', 12, 'bold'), bd=0, width=25, pady=8)
 
@@ -1085,132 +1175,172 @@ def export_overlay():
     tk.Button(btn_frame, text='3 - Maps les plus jouées', command=export_most_played_maps, **opt_btn).pack(pady=4)
 
     tk.Button(frm, text='Fermer', command=win.destroy, bg=ACCENT, fg='#04120d',
-              font=('Arial', 12, 'bold'), bd=0, padx=20, pady=8).pack(pady=(0,8))
+              font=('Arial', 12, 'bold'), bd=0, padx=20, pady=8).pack(side='bottom', pady=(0,8))
+
+    # File des exports : une ligne par tâche (titre, barre, état, Annuler)
+    jobs_box = tk.Frame(frm, bg=BG)
+    jobs_box.pack(fill='both', expand=True, padx=10, pady=(0, 8))
+    rows = {}
+
+    def add_job_row(job):
+        row = tk.Frame(jobs_box, bg=BG); row.pack(fill='x', pady=2)
+        top = tk.Frame(row, bg=BG); top.pack(fill='x')
+        tk.Label(top, text=job.title, fg=FG, bg=BG, font=('Consolas', 10, 'bold')).pack(side='left')
+        state = tk.Label(top, text=job.state, fg=MUTED, bg=BG, font=('Consolas', 10))
+        state.pack(side='left', padx=6)
+        cancel = ttk.Button(top, text='Annuler', command=job.cancel)
+        cancel.pack(side='right')
+        bar = ttk.Progressbar(row, mode='determinate', maximum=1)
+        bar.pack(fill='x', pady=(2, 0))
+        rows[job] = (state, bar, cancel)
+
+    def poll():
+        if not win.winfo_exists():
+            return
+        for job in export_jobs.jobs:
+            if job not in rows:
+                add_job_row(job)
+            state, bar, cancel = rows[job]
+            text = job.state if not job.error else f'{job.state} : {job.error}'
+            state.configure(text=text, fg=ACCENT if job.state == job.DONE else MUTED)
+            bar.configure(maximum=max(job.total, 1), value=job.done if job.state != job.DONE else max(job.total, 1))
+            if job.finished:
+                cancel.configure(state='disabled')
+        root.after(150, poll)
+
+    poll()
 
 # ======================================================================
 # Analyses / Vues
 # ======================================================================
 def build_team_winrate_data(tid: int):
-    cursor.execute('''
-        SELECT m.name, COALESCE(SUM(mat.rounds_won),0), COALESCE(SUM(mat.rounds_lost),0)
-        FROM Maps m
-        LEFT JOIN Matches mat ON mat.map_id=m.id AND mat.team_id=?
-        GROUP BY m.id
-    ''', (tid,))
-    data = cursor.fetchall()
     labels, values = [], []
-    for name, won, lost in data:
-        total = won + lost
+    for name, won, lost in stats.team_winrate_by_map(cursor, tid, since=stats_since):
         labels.append(name)
-        values.append((won/total*100) if total else 0)
+        values.append(stats.win_rate(won, lost))
     return labels, values
 
 def build_players_kd_data(tid: int):
-    cursor.execute('''
-        SELECT p.name, COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0)
-        FROM Players p
-        LEFT JOIN Matches m ON m.team_id=?
-        LEFT JOIN PlayerStats ps ON ps.player_id=p.id AND ps.match_id=m.id
-        WHERE p.team_id=?
-        GROUP BY p.id
-    ''', (tid, tid))
-    data = cursor.fetchall()
     labels, values = [], []
-    for name, k, d in data:
+    for name, kd in stats.players_kd(cursor, tid, stats_since):
         labels.append(name)
-        values.append((k/d) if d else (k if k else 0))
+        values.append(kd)
     return labels, values
 
 def analyse_team_interface(tid: int):
-    for w in root.winfo_children():
-        if w is not _overlay:
-            w.destroy()
-    cursor.execute('SELECT name, logo FROM Teams WHERE id = ?', (tid,))
-    r = cursor.fetchone()
-    if not r:
-        load_home(); return
-    team_name, team_logo = r
-
-    topbar = tk.Frame(root, bg=BG); topbar.pack(fill='x', pady=4, padx=4)
+    cursor.execute('SELECT 1 FROM Teams WHERE id = ?', (tid,))
+    if not cursor.fetchone():
+        screens_mgr.drop(('analyse', tid)); load_home(); return
+    screens_mgr.show(('analyse', tid), lambda scr: build_analyse_screen(scr, tid), keep=(_overlay,))
+
+def build_analyse_screen(scr, tid):
+    """Écran d’analyse : en-tête + graphiques (reconstruits seulement si les données changent)."""
+    topbar = tk.Frame(scr.frame, bg=BG); topbar.pack(fill='x', pady=4, padx=4)
     back_ic = load_img(os.path.join(IMAGES_DIR, 'back.png'), (40, 40))
     btn = tk.Button(topbar, image=back_ic if back_ic else None, text='← Retour' if not back_ic else '',
                     compound='left', bd=0, bg=BG, fg=FG, activebackground=BG,
                     command=lambda i=tid: open_team(i))
     btn.pack(side='left')
     if back_ic: btn.image = back_ic
-
-    header = tk.Frame(root, bg=BG); header.pack(fill='x', pady=8, padx=10)
-    logo_box = tk.Frame(header, bg=BG, bd=2, highlightbackground=ACCENT, highlightthickness=2,
-                        width=200, height=200)
-    logo_box.pack(side='left'); logo_box.pack_propagate(False)
-    lpath = (os.path.join(IMAGES_DIR, team_logo)
-             if team_logo else os.path.join(IMAGES_DIR, 'anonymous.png'))
-    big_logo = load_img(lpath, (190, 190))
-    if big_logo:
-        lbl = tk.Label(logo_box, image=big_logo, bg=BG); lbl.pack(expand=True)
-        team_images[tid] = big_logo
-    tk.Label(header, text=team_name, fg=FG, bg=BG, font=('Arial', 26, 'bold')).pack(side='left', padx=20)
-
-    body = tk.Frame(root, bg=BG); body.pack(fill='both', expand=True, padx=20, pady=10)
-    bg_color = '#0f1115'; text_color = 'lightgrey'
-    vibrant_colors = ['#e6194B','#3cb44b','#ffe119','#4363d8','#f58231','#911eb4','#46f0f0','#f032e6',
-                      '#bcf60c','#fabebe','#008080','#e6beff','#9A6324','#fffac8','#800000','#aaffc3',
-                      '#808000','#ffd8b1','#000075','#808080']
-
-    left = tk.Frame(body, bg=BG); left.pack(side='left', fill='both', expand=True, padx=10)
-    tk.Label(left, text='Win-rate de l’équipe par map', fg=text_color, bg=BG,
-             font=('Consolas', 14, 'bold')).pack(pady=6)
-    labels, values = build_team_winrate_data(tid)
-    fig1 = Figure(figsize=(5, 4), dpi=100); fig1.patch.set_facecolor(bg_color)
-    ax1 = fig1.add_subplot(111); ax1.set_facecolor(bg_color)
-    colors1 = [vibrant_colors[i % len(vibrant_colors)] for i in range(len(labels))]
-    ax1.bar(labels, values, color=colors1)
-    ax1.set_ylabel('Win Rate (%)', color=text_color)
-    ax1.tick_params(axis='x', colors=text_color, rotation=45)
-    ax1.tick_params(axis='y', colors=text_color)
-    for spine in ax1.spines.values(): spine.set_color(text_color)
-    fig1.tight_layout()
-    canvas1 = FigureCanvasTkAgg(fig1, master=left); canvas1.draw()
-    canvas1.get_tk_widget().pack(fill='both', expand=True)
-
-    right = tk.Frame(body, bg=BG); right.pack(side='left', fill='both', expand=True, padx=10)
-    tk.Label(right, text='Ratios K/D des joueurs', fg=text_color, bg=BG,
-             font=('Consolas', 14, 'bold')).pack(pady=6)
-    pl_labels, pl_values = build_players_kd_data(tid)
-    xticks = list(range(len(pl_labels)))
-    fig2 = Figure(figsize=(5, 4), dpi=100); fig2.patch.set_facecolor(bg_color)
-    ax2 = fig2.add_subplot(111); ax2.set_facecolor(bg_color)
-    colors2 = [vibrant_colors[i % len(vibrant_colors)] for i in range(len(pl_labels))]
-    ax2.bar(xticks, pl_values, color=colors2)
-    ax2.set_ylabel('K/D', color=text_color)
-    ax2.set_xticks(xticks); ax2.set_xticklabels(pl_labels, rotation=45)
-    ax2.tick_params(axis='x', colors=text_color); ax2.tick_params(axis='y', colors=text_color)
-    for spine in ax2.spines.values(): spine.set_color(text_color)
-    fig2.tight_layout()
-    canvas2 = FigureCanvasTkAgg(fig2, master=right); canvas2.draw()
-    canvas2.get_tk_widget().pack(fill='both', expand=True)
+    window_picker(topbar).pack(side='right', padx=6)
+
+    def build_header(header):
+        cursor.execute('SELECT name, logo FROM Teams WHERE id = ?', (tid,))
+        team_name, team_logo = cursor.fetchone()
+        logo_box = tk.Frame(header, bg=BG, bd=2, highlightbackground=ACCENT, highlightthickness=2,
+                            width=200, height=200)
+        logo_box.pack(side='left'); logo_box.pack_propagate(False)
+        lpath = (os.path.join(IMAGES_DIR, team_logo)
+                 if team_logo else os.path.join(IMAGES_DIR, 'anonymous.png'))
+        big_logo = load_img(lpath, (190, 190))
+        if big_logo:
+            lbl = tk.Label(logo_box, image=big_logo, bg=BG); lbl.pack(expand=True)
+            team_images[tid] = big_logo
+        tk.Label(header, text=team_name, fg=FG, bg=BG, font=('Arial', 26, 'bold')).pack(side='left', padx=20)
+
+    scr.part(scr.frame, ('teams',), build_header, fill='x', pady=8, padx=10)
+
+    def build_charts(body):
+        # Rendus en cache (charts.py) : même équipe + mêmes données = aucune passe matplotlib
+        for kind, title, deps, data in (
+                ('winrate', 'Win-rate de l’équipe par map', ('matches', 'maps', 'window'), build_team_winrate_data),
+                ('kd', 'Ratios K/D des joueurs', ('matches', 'players', 'window'), build_players_kd_data)):
+            col = tk.Frame(body, bg=BG); col.pack(side='left', fill='both', expand=True, padx=10)
+            tk.Label(col, text=title + window_suffix(), fg=charts.TEXT_COLOR, bg=BG,
+                     font=('Consolas', 14, 'bold')).pack(pady=6)
+            img = chart_service.get(kind, tid, screens_mgr.snapshot(deps), lambda data=data: data(tid))
+            lbl = tk.Label(col, image=img, bg=BG); lbl.image = img
+            lbl.pack(fill='both', expand=True)
+
+    # Graphiques : le plus cher de l’écran, refaits seulement si matchs/joueurs/maps/fenêtre changent
+    scr.part(scr.frame, ('matches', 'players', 'maps', 'window'), build_charts,
+             fill='both', expand=True, padx=20, pady=10)
+
+    def build_rounds(body):
+        # Rien tant qu’aucune game de l’équipe n’a de rounds détaillés (import NDJSON)
+        rows = rounds.team_round_stats(cursor, tid, stats_since)
+        if not rows:
+            return
+        tk.Label(body, text='Stats par round' + window_suffix(), fg=charts.TEXT_COLOR, bg=BG,
+                 font=('Consolas', 14, 'bold')).pack(pady=6)
+        grid = tk.Frame(body, bg=BG); grid.pack()
+        header = ('Map', 'Games', 'Pistols', 'Meilleure série', 'Remontées', 'Bombe posée', 'Désamorçage', 'Durée moy.')
+        for c, text in enumerate(header):
+            tk.Label(grid, text=text, fg=ACCENT, bg=BG, font=('Consolas', 11, 'bold')).grid(row=0, column=c, padx=8)
+        for r, (mname, n_games, _n, _won, pis, pis_won, best, trailed, comebacks,
+                att, plants, def_planted, defuses, avg) in enumerate(rows, 1):
+            values = (mname, n_games, f'{rounds.rate(pis_won, pis):.0f} %', best, f'{comebacks}/{trailed}',
+                      f'{rounds.rate(plants, att):.0f} %', f'{rounds.rate(defuses, def_planted):.0f} %',
+                      f'{avg:.0f} s')
+            font = ('Consolas', 11, 'bold') if mname == 'Total' else ('Consolas', 11)
+            for c, v in enumerate(values):
+                tk.Label(grid, text=v, fg=FG, bg=BG, font=font).grid(row=r, column=c, padx=8)
+
+    scr.part(scr.frame, ('matches', 'maps', 'window'), build_rounds, fill='x', padx=20, pady=(0, 10))
+
+    def build_heatmap(body):
+        # Seulement si des positions ont été importées pour cette équipe
+        maps_ev = events.maps_with_events(cursor, tid)
+        if not maps_ev:
+            return
+        tk.Label(body, text='Heatmap des positions' + window_suffix(), fg=charts.TEXT_COLOR, bg=BG,
+                 font=('Consolas', 14, 'bold')).pack(pady=6)
+        bar = tk.Frame(body, bg=BG); bar.pack()
+        map_v = tk.StringVar(value=maps_ev[0][1])
+        kind_labels = {'Tout': None, 'Kills': 'kill', 'Morts': 'death', 'Bombes posées': 'plant',
+                       'Désamorçages': 'defuse'}
+        kind_v = tk.StringVar(value='Kills')
+        ttk.Combobox(bar, textvariable=map_v, state='readonly', width=16,
+                     values=[name for _mid, name in maps_ev]).pack(side='left', padx=6)
+        ttk.Combobox(bar, textvariable=kind_v, state='readonly', width=14,
+                     values=list(kind_labels)).pack(side='left', padx=6)
+        count = tk.Label(bar, fg=FG, bg=BG); count.pack(side='left', padx=6)
+        img_lbl = tk.Label(body, bg=BG); img_lbl.pack(pady=6)
+
+        def show(_event=None):
+            map_id = dict((name, mid) for mid, name in maps_ev)[map_v.get()]
+            # PNG en cache (heatmaps.py) : même map / filtre / données = aucun rendu
+            png, n = heatmap_service.get(cursor, map_id, ('team', tid), kind_labels[kind_v.get()], stats_since,
+                                         screens_mgr.snapshot(('events', 'players', 'maps', 'matches')))
+            img = tk.PhotoImage(data=base64.b64encode(png))
+            img_lbl.configure(image=img); img_lbl.image = img
+            count.configure(text=f'{n} événements')
+
+        for box in bar.winfo_children():
+            if isinstance(box, ttk.Combobox):
+                box.bind('<<ComboboxSelected>>', show)
+        show()
+
+    scr.part(scr.frame, ('events', 'players', 'maps', 'matches', 'window'), build_heatmap,
+             fill='x', padx=20, pady=(0, 10))
 
 def copy_player_stats(pid, pname):
     stats_lines = []
-    cursor.execute('SELECT id, name FROM Maps')
-    for mid, mname in cursor.fetchall():
-        cursor.execute('''
-            SELECT
-              COUNT(ps.id),
-              COALESCE(SUM(ps.kills), 0),
-              COALESCE(SUM(ps.deaths), 0),
-              COALESCE(SUM(ps.bombs), 0),
-              COALESCE(SUM(m.rounds_won), 0),
-              COALESCE(SUM(m.rounds_lost), 0)
-            FROM Matches m
-            LEFT JOIN PlayerStats ps ON ps.match_id = m.id
-            WHERE ps.player_id = ? AND m.map_id = ?
-        ''', (pid, mid))
-        games, k, d, b, rw, rl = cursor.fetchone()
-        kd = (k / d) if d else (k if k else 0)
-        wr = (rw / (rw + rl) * 100) if (rw + rl) else 0
-        stats_lines.append(f"{mname}: Games={games}, KD={kd:.2f}, Win-rate={wr:.1f}%, Bombs={b}")
-    text = pname + "\n" + "\n".join(stats_lines)
+    for _mid, mname, _mimg, n_games, k, d, b, rw, rl in stats.player_map_totals(cursor, pid, stats_since):
+        kd = stats.kd_ratio(k, d)
+        wr = stats.win_rate(rw, rl)
+        stats_lines.append(f"{mname}: Games={n_games}, KD={kd:.2f}, Win-rate={wr:.1f}%, Bombs={b}")
+    text = pname + window_suffix() + "\n" + "\n".join(stats_lines)
     root.clipboard_clear()
     root.clipboard_append(text)
     messagebox.showinfo('Copié', 'Nom et stats du joueur copiés !')
@@ -1218,80 +1348,76 @@ def copy_player_stats(pid, pname):
 def open_player(pid: int):
     global current_player
     current_player = pid
-    for w in root.winfo_children():
-        if w is not _overlay:
-            w.destroy()
-    cursor.execute('SELECT team_id,name,logo FROM Players WHERE id=?', (pid,))
+    cursor.execute('SELECT team_id FROM Players WHERE id=?', (pid,))
     r = cursor.fetchone()
     if not r:
-        load_home(); return
-    team_id, pname, plogo = r
-    cursor.execute('SELECT COALESCE(SUM(kills),0), COALESCE(SUM(deaths),0) FROM PlayerStats WHERE player_id=?', (pid,))
-    k_tot, d_tot = cursor.fetchone()
-    overall_kd = (k_tot / d_tot) if d_tot else (k_tot if k_tot else 0)
+        screens_mgr.drop(('player', pid)); load_home(); return
+    screens_mgr.show(('player', pid), lambda scr: build_player_screen(scr, pid, r[0]), keep=(_overlay,))
 
-    tb = tk.Frame(root, bg=BG); tb.pack(fill='x', pady=4, padx=4)
+def build_player_screen(scr, pid, team_id):
+    """Fiche joueur dans scr.frame (en-tête et maps reconstruits séparément)."""
+    tb = tk.Frame(scr.frame, bg=BG); tb.pack(fill='x', pady=4, padx=4)
     back_ic = load_img(os.path.join(IMAGES_DIR, 'back.png'), (40, 40))
     btn = tk.Button(tb, image=back_ic if back_ic else None, text='← Retour' if not back_ic else '',
                     compound='left', bd=0, bg=BG, fg=FG, activebackground=BG,
                     command=lambda: open_team(team_id))
     btn.pack(side='left')
     if back_ic: btn.image = back_ic
+    window_picker(tb).pack(side='right', padx=6)
+
+    def build_header(header):
+        cursor.execute('SELECT name,logo FROM Players WHERE id=?', (pid,))
+        pname, plogo = cursor.fetchone()
+        # Somme des totaux par map (fenêtre de temps comprise), pas un scan de PlayerStats
+        per_map = stats.player_map_totals(cursor, pid, stats_since)
+        overall_kd = stats.kd_ratio(sum(r[4] for r in per_map), sum(r[5] for r in per_map))
 
-    header = tk.Frame(root, bg=BG); header.pack(fill='x', pady=10, padx=20)
-    p_path = (os.path.join(IMAGES_DIR, plogo) if plogo else os.path.join(IMAGES_DIR, 'anonymous.png'))
-    p_img = load_img(p_path, (220, 220))
-    if p_img:
-        lbl = tk.Label(header, image=p_img, bg=BG, bd=2, highlightbackground=ACCENT, highlightthickness=2)
+        p_path = (os.path.join(IMAGES_DIR, plogo) if plogo else os.path.join(IMAGES_DIR, 'anonymous.png'))
+        lbl = tk.Label(header, bg=BG, bd=2, highlightbackground=ACCENT, highlightthickness=2)
         lbl.pack(side='left', padx=(0, 40))
-        player_images[pid] = p_img
-
-    rt = tk.Frame(header, bg=BG); rt.pack(side='left', fill='both', expand=True)
-    name_row = tk.Frame(rt, bg=BG); name_row.pack(fill='x')
-    tk.Label(name_row, text=pname, fg=FG, bg=BG, font=('Arial', 22, 'bold')).pack(side='left', padx=10, pady=8)
-    tk.Button(name_row, text='Copier', bg=ACCENT, fg='#04120d', bd=0,
-              command=lambda: copy_player_stats(pid, pname)).pack(side='left', padx=8)
-
-    kd_box = tk.Frame(rt, bg=SUB_HDR); kd_box.pack(fill='x', pady=8)
-    tk.Label(kd_box, text=f"KD global : {overall_kd:.2f}", fg=FG, bg=SUB_HDR,
-             font=('Consolas', 16, 'bold')).pack(padx=10, pady=12)
-
-    body = tk.Frame(root, bg=BG); body.pack(fill='both', expand=True, padx=20, pady=10)
-    canvas = tk.Canvas(body, bg=BG, highlightthickness=0)
-    yscr = tk.Scrollbar(body, orient='vertical', command=canvas.yview)
-    canvas.configure(yscrollcommand=yscr.set)
-    yscr.pack(side='right', fill='y'); canvas.pack(side='left', fill='both', expand=True)
-    bind_mousewheel(canvas)  # 👈 molette
-    inner = tk.Frame(canvas, bg=BG); wid = canvas.create_window((0, 0), window=inner, anchor='nw')
-    canvas.bind('<Configure>', lambda e: canvas.itemconfig(wid, width=canvas.winfo_width()))
-    inner.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
-
-    cursor.execute('SELECT id, name, image FROM Maps')
-    for mid, mname, mimg in cursor.fetchall():
-        cursor.execute('''SELECT COUNT(DISTINCT m.id),
-                                 COALESCE(SUM(ps.kills),0),
-                                 COALESCE(SUM(ps.deaths),0),
-                                 COALESCE(SUM(ps.bombs),0),
-                                 COALESCE(SUM(m.rounds_won),0),
-                                 COALESCE(SUM(m.rounds_lost),0)
-                          FROM Matches m
-                          JOIN PlayerStats ps ON ps.match_id=m.id
-                          WHERE ps.player_id=? AND m.map_id=?''', (pid, mid))
-        games, k, d, b, rw, rl = cursor.fetchone()
-        kd = (k / d) if d else (k if k else 0)
-        wr = (rw / (rw + rl) * 100) if (rw + rl) else 0
-
-        row = tk.Frame(inner, bg=BG); row.pack(fill='x', padx=30, pady=12)
-        m_path = os.path.join(IMAGES_DIR, mimg) if mimg else os.path.join(IMAGES_DIR, 'anonymous.png')
-        mp = load_img(m_path, (120, 120))
-        lbl = tk.Label(row, image=mp, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
-        lbl.pack(side='left'); map_images[(pid, mname)] = mp
+        set_img_async(lbl, p_path, (220, 220))
+
+        rt = tk.Frame(header, bg=BG); rt.pack(side='left', fill='both', expand=True)
+        name_row = tk.Frame(rt, bg=BG); name_row.pack(fill='x')
+        tk.Label(name_row, text=pname, fg=FG, bg=BG, font=('Arial', 22, 'bold')).pack(side='left', padx=10, pady=8)
+        tk.Button(name_row, text='Copier', bg=ACCENT, fg='#04120d', bd=0,
+                  command=lambda: copy_player_stats(pid, pname)).pack(side='left', padx=8)
+
+        kd_box = tk.Frame(rt, bg=SUB_HDR); kd_box.pack(fill='x', pady=8)
+        tk.Label(kd_box, text=f"KD global{window_suffix()} : {overall_kd:.2f}", fg=FG, bg=SUB_HDR,
+                 font=('Consolas', 16, 'bold')).pack(padx=10, pady=12)
+
+    scr.part(scr.frame, ('players', 'matches', 'window'), build_header, fill='x', pady=10, padx=20)
+
+    # Une ligne par map (liste virtuelle : widgets recyclés en défilant)
+    def make_map_row(master):
+        slot = tk.Frame(master, bg=BG)
+        row = tk.Frame(slot, bg=BG); row.pack(fill='x', padx=30, pady=12)
+        slot.img = tk.Label(row, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
+        slot.img.pack(side='left')
         big = tk.Frame(row, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
         big.pack(side='left', fill='x', expand=True, padx=10)
-        tk.Label(big, text=mname, fg=FG, bg=BG, font=('Arial', 14, 'bold')).pack(anchor='w', padx=8, pady=(6, 2))
-        tk.Label(big, text=f"KD : {kd:.2f}", fg=FG, bg=BG).pack(anchor='w', padx=8)
-        tk.Label(big, text=f"Win-rate : {wr:.1f} %", fg=FG, bg=BG).pack(anchor='w', padx=8)
-        tk.Label(big, text=f"Games joués : {games} | Bombs : {b}", fg=FG, bg=BG).pack(anchor='w', padx=8, pady=(0, 6))
+        slot.name = tk.Label(big, fg=FG, bg=BG, font=('Arial', 14, 'bold'))
+        slot.name.pack(anchor='w', padx=8, pady=(6, 2))
+        slot.kd = tk.Label(big, fg=FG, bg=BG); slot.kd.pack(anchor='w', padx=8)
+        slot.wr = tk.Label(big, fg=FG, bg=BG); slot.wr.pack(anchor='w', padx=8)
+        slot.games = tk.Label(big, fg=FG, bg=BG); slot.games.pack(anchor='w', padx=8, pady=(0, 6))
+        return slot
+
+    def fill_map_row(slot, m, _index):
+        _mid, mname, mimg, n_games, k, d, b, rw, rl = m
+        m_path = os.path.join(IMAGES_DIR, mimg) if mimg else os.path.join(IMAGES_DIR, 'anonymous.png')
+        set_img_async(slot.img, m_path, (120, 120))
+        slot.name.configure(text=mname)
+        slot.kd.configure(text=f"KD : {stats.kd_ratio(k, d):.2f}")
+        slot.wr.configure(text=f"Win-rate : {stats.win_rate(rw, rl):.1f} %")
+        slot.games.configure(text=f"Games joués : {n_games} | Bombs : {b}")
+
+    # Une seule lecture (PlayerMapTotals) au lieu d’une requête par map.
+    def build_maps(body):
+        make_vlist(body, 148, make_map_row, fill_map_row, stats.player_map_totals(cursor, pid, stats_since))
+
+    scr.part(scr.frame, ('maps', 'matches', 'window'), build_maps, fill='both', expand=True, padx=20, pady=10)
 
 # ─────────────────────────────────────────────────────────────────────────
 # Assignation de capitaine (ADMIN, par équipe)
@@ -1370,6 +1496,7 @@ def assign_captain_overlay(team_id: int):
         else:
             cursor.execute('INSERT OR REPLACE INTO TeamOwners(team_id, captain) VALUES (?,?)', (team_id, chosen))
         conn.commit()
+        screens_mgr.bump('owners')
         messagebox.showinfo('Succès', "Capitaine assigné à l’équipe.")
         ov.destroy()
         open_team(team_id)
@@ -1385,162 +1512,144 @@ def open_team(tid: int):
     """
     global current_team
     current_team = tid
-    for w in root.winfo_children():
-        if w is not _overlay:
-            w.destroy()
-    cursor.execute('SELECT name, logo FROM Teams WHERE id=?', (tid,))
-    r = cursor.fetchone()
-    if not r:
-        load_home(); return
-    team_name, team_logo = r
-    cursor.execute('''SELECT COALESCE(SUM(rounds_won),0), COALESCE(SUM(rounds_lost),0)
-                      FROM Matches WHERE team_id=?''', (tid,))
-    tw, tl = cursor.fetchone()
-    overall_wr = tw / (tw + tl) * 100 if tw + tl else 0
-
-    tb = tk.Frame(root, bg=BG); tb.pack(fill='x', pady=4, padx=4)
-    back_ic = load_img(os.path.join(IMAGES_DIR, 'back.png'), (40, 40))
-    tk.Button(tb, image=back_ic if back_ic else None, text='← Retour' if not back_ic else '', compound='left',
-              bd=0, bg=BG, fg=FG, activebackground=BG, command=load_home).pack(side='left')
-    if back_ic:
-        tb.children[list(tb.children)[0]].image = back_ic
-
-    is_owner = team_owned_by_current_captain(tid)
-    if is_admin() or is_owner:
-        ttk.Button(tb, text='Modifier équipe', style='Neon.TButton',
-                   command=lambda: edit_team_overlay(tid)).pack(side='right', padx=3)
-        ttk.Button(tb, text='Supprimer équipe', style='Neon.TButton',
-                   command=lambda: delete_team(tid)).pack(side='right', padx=3)
-
-    # Bouton pour attribuer un capitaine (admin)
-    if is_admin():
-        ttk.Button(tb, text='Assigner capitaine', style='Neon.TButton',
-                   command=lambda: assign_captain_overlay(tid)).pack(side='right', padx=3)
-
-    header = tk.Frame(root, bg=BG); header.pack(fill='x', pady=8, padx=10)
-    logo_box = tk.Frame(header, bg=BG, bd=2, highlightbackground=ACCENT, highlightthickness=2,
-                        width=250, height=250)
-    logo_box.pack(side='left'); logo_box.pack_propagate(False)
-    lpath = (os.path.join(IMAGES_DIR, team_logo)
-             if team_logo else os.path.join(IMAGES_DIR, 'anonymous.png'))
-    big_logo = load_img(lpath, (240, 240))
-    if big_logo:
-        lbl = tk.Label(logo_box, image=big_logo, bg=BG); lbl.pack(expand=True)
-        team_images[tid] = big_logo
-
-    info = tk.Frame(header, bg=BG); info.pack(side='left', fill='both', expand=True, padx=12)
-    nm_box = tk.Frame(info, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
-    nm_box.pack(fill='x')
-    tk.Label(nm_box, text=team_name, fg=FG, bg=BG, font=('Arial', 22, 'bold')).pack(pady=12)
-    wr_box = tk.Frame(info, bg=SUB_HDR); wr_box.pack(fill='x', pady=6)
-    tk.Label(wr_box, text=f'Win-rate (toutes maps) : {overall_wr:.1f} %',
-             fg=FG, bg=SUB_HDR, font=('Consolas', 14, 'bold')).pack(pady=10)
-
-    tk.Button(root, text='Analyse', bg=ACCENT, fg='#04120d', bd=0, font=('Arial', 12, 'bold'),
+    cursor.execute('SELECT 1 FROM Teams WHERE id=?', (tid,))
+    if not cursor.fetchone():
+        screens_mgr.drop(('team', tid)); load_home(); return
+    # Écran gardé en mémoire (screens.py) : au retour, seules les parties périmées sont refaites
+    screens_mgr.show(('team', tid), lambda scr: build_team_screen(scr, tid), keep=(_overlay,))
+
+def build_team_screen(scr, tid):
+    """Construit la fiche d’équipe dans scr.frame, partie par partie (voir screens.py)."""
+    def build_topbar(tb):
+        back_ic = load_img(os.path.join(IMAGES_DIR, 'back.png'), (40, 40))
+        tk.Button(tb, image=back_ic if back_ic else None, text='← Retour' if not back_ic else '', compound='left',
+                  bd=0, bg=BG, fg=FG, activebackground=BG, command=load_home).pack(side='left')
+        if back_ic:
+            tb.children[list(tb.children)[0]].image = back_ic
+
+        is_owner = team_owned_by_current_captain(tid)
+        if is_admin() or is_owner:
+            ttk.Button(tb, text='Modifier équipe', style='Neon.TButton',
+                       command=lambda: edit_team_overlay(tid)).pack(side='right', padx=3)
+            ttk.Button(tb, text='Supprimer équipe', style='Neon.TButton',
+                       command=lambda: delete_team(tid)).pack(side='right', padx=3)
+
+        # Bouton pour attribuer un capitaine (admin)
+        if is_admin():
+            ttk.Button(tb, text='Assigner capitaine', style='Neon.TButton',
+                       command=lambda: assign_captain_overlay(tid)).pack(side='right', padx=3)
+        window_picker(tb).pack(side='right', padx=6)
+
+    scr.part(scr.frame, ('owners',), build_topbar, fill='x', pady=4, padx=4)
+
+    def build_header(header):
+        cursor.execute('SELECT name, logo FROM Teams WHERE id=?', (tid,))
+        team_name, team_logo = cursor.fetchone()
+        per_map = stats.team_map_totals(cursor, tid, stats_since)
+        overall_wr = stats.win_rate(sum(r[4] for r in per_map), sum(r[5] for r in per_map))
+
+        logo_box = tk.Frame(header, bg=BG, bd=2, highlightbackground=ACCENT, highlightthickness=2,
+                            width=250, height=250)
+        logo_box.pack(side='left'); logo_box.pack_propagate(False)
+        lpath = (os.path.join(IMAGES_DIR, team_logo)
+                 if team_logo else os.path.join(IMAGES_DIR, 'anonymous.png'))
+        lbl = tk.Label(logo_box, bg=BG); lbl.pack(expand=True)
+        set_img_async(lbl, lpath, (240, 240))
+
+        info = tk.Frame(header, bg=BG); info.pack(side='left', fill='both', expand=True, padx=12)
+        nm_box = tk.Frame(info, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
+        nm_box.pack(fill='x')
+        tk.Label(nm_box, text=team_name, fg=FG, bg=BG, font=('Arial', 22, 'bold')).pack(pady=12)
+        wr_box = tk.Frame(info, bg=SUB_HDR); wr_box.pack(fill='x', pady=6)
+        tk.Label(wr_box, text=f'Win-rate (toutes maps){window_suffix()} : {overall_wr:.1f} %',
+                 fg=FG, bg=SUB_HDR, font=('Consolas', 14, 'bold')).pack(pady=10)
+
+    scr.part(scr.frame, ('teams', 'matches', 'window'), build_header, fill='x', pady=8, padx=10)
+
+    tk.Button(scr.frame, text='Analyse', bg=ACCENT, fg='#04120d', bd=0, font=('Arial', 12, 'bold'),
               command=lambda i=tid: analyse_team_interface(i)).pack(pady=5)
 
-    body = tk.Frame(root, bg=BG); body.pack(fill='both', expand=True, padx=10, pady=10)
+    body = tk.Frame(scr.frame, bg=BG); body.pack(fill='both', expand=True, padx=10, pady=10)
 
     left_outer = tk.Frame(body, bg=ACCENT, bd=1)
     left_outer.pack(side='left', fill='both', expand=True, padx=10)
     left_inner = tk.Frame(left_outer, bg=BG); left_inner.pack(fill='both', expand=True, padx=4, pady=4)
 
-    if is_admin() or is_owner:
-        tk.Button(left_inner, text='Ajouter joueur', bg=ACCENT, fg='#04120d', bd=0,
-                  command=lambda: add_player_overlay(tid)).pack(pady=6)
-
-    pl_canvas = tk.Canvas(left_inner, bg=BG, highlightthickness=0)
-    bind_mousewheel(pl_canvas)  # 👈 molette
-    pl_scroll = tk.Scrollbar(left_inner, orient='vertical', command=pl_canvas.yview)
-    pl_canvas.configure(yscrollcommand=pl_scroll.set)
-    pl_scroll.pack(side='right', fill='y'); pl_canvas.pack(side='left', fill='both', expand=True)
-    players_frame = tk.Frame(pl_canvas, bg=BG)
-    wid_pl = pl_canvas.create_window((0, 0), window=players_frame, anchor='nw')
-    pl_canvas.bind('<Configure>', lambda e: pl_canvas.itemconfig(wid_pl, width=pl_canvas.winfo_width()))
-    players_frame.bind('<Configure>', lambda e: pl_canvas.configure(scrollregion=pl_canvas.bbox('all')))
-
-    cursor.execute('SELECT id, name, logo FROM Players WHERE team_id=?', (tid,))
-    for pid, pname, plogo in cursor.fetchall():
-        cursor.execute('''SELECT COALESCE(SUM(ps.kills),0), COALESCE(SUM(ps.deaths),0),
-                                 COALESCE(SUM(m.rounds_won),0), COALESCE(SUM(m.rounds_lost),0)
-                          FROM PlayerStats ps
-                          JOIN Matches m ON ps.match_id = m.id
-                          WHERE ps.player_id=?''', (pid,))
-        k, d, rw, rl = cursor.fetchone()
-        kd = (k / d) if d else (k if k else 0)
-        wr = rw / (rw + rl) * 100 if rw + rl else 0
-
-        row = tk.Frame(players_frame, bg=BG); row.pack(fill='x', pady=6, padx=4)
-        p_path = os.path.join(IMAGES_DIR, plogo) if plogo else os.path.join(IMAGES_DIR, 'anonymous.png')
-        p_img = load_img(p_path, (80, 80))
-        lbl = tk.Label(row, image=p_img, bg=BG); lbl.pack(side='left')
-        player_images[pid] = p_img
-        box = tk.Frame(row, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
-        box.pack(side='left', fill='x', expand=True)
-        top = tk.Frame(box, bg=BG); top.pack(fill='x')
-        tk.Label(top, text=pname, fg=FG, bg=BG, font=('Arial', 12, 'bold')).pack(side='left', padx=6)
-        btns = tk.Frame(top, bg=BG); btns.pack(side='right', padx=4)
-        ttk.Button(btns, text='👁', width=2, command=lambda p=pid: open_player(p)).pack(side='left')
-        if is_admin() or is_owner:
-            ttk.Button(btns, text='✎', width=2, command=lambda p=pid: edit_player_overlay(p)).pack(side='left', padx=2)
-            ttk.Button(btns, text='🗑', width=2, command=lambda p=pid: delete_player(p)).pack(side='left')
-        tk.Label(box, text=f"Win-rate : {wr:.1f} % | K/D : {kd:.2f}", fg=FG, bg=BG
-                ).pack(anchor='w', padx=6, pady=(0, 6))
+    def build_players(parent):
+        can_edit = is_admin() or team_owned_by_current_captain(tid)
+        if can_edit:
+            tk.Button(parent, text='Ajouter joueur', bg=ACCENT, fg='#04120d', bd=0,
+                      command=lambda: add_player_overlay(tid)).pack(pady=6)
+
+        def make_player_row(master):
+            slot = tk.Frame(master, bg=BG)
+            row = tk.Frame(slot, bg=BG); row.pack(fill='x', pady=6, padx=4)
+            slot.img = tk.Label(row, bg=BG); slot.img.pack(side='left')
+            box = tk.Frame(row, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
+            box.pack(side='left', fill='x', expand=True)
+            top = tk.Frame(box, bg=BG); top.pack(fill='x')
+            slot.name = tk.Label(top, fg=FG, bg=BG, font=('Arial', 12, 'bold')); slot.name.pack(side='left', padx=6)
+            btns = tk.Frame(top, bg=BG); btns.pack(side='right', padx=4)
+            slot.view = ttk.Button(btns, text='👁', width=2); slot.view.pack(side='left')
+            if can_edit:
+                slot.edit = ttk.Button(btns, text='✎', width=2); slot.edit.pack(side='left', padx=2)
+                slot.delete = ttk.Button(btns, text='🗑', width=2); slot.delete.pack(side='left')
+            slot.stats = tk.Label(box, fg=FG, bg=BG); slot.stats.pack(anchor='w', padx=6, pady=(0, 6))
+            return slot
+
+        def fill_player_row(slot, p, _index):
+            pid, pname, plogo, _games, k, d, _b, rw, rl = p
+            p_path = os.path.join(IMAGES_DIR, plogo) if plogo else os.path.join(IMAGES_DIR, 'anonymous.png')
+            set_img_async(slot.img, p_path, (80, 80))
+            slot.name.configure(text=pname)
+            slot.view.configure(command=lambda: open_player(pid))
+            if can_edit:
+                slot.edit.configure(command=lambda: edit_player_overlay(pid))
+                slot.delete.configure(command=lambda: delete_player(pid))
+            slot.stats.configure(text=f"Win-rate : {stats.win_rate(rw, rl):.1f} % | K/D : {stats.kd_ratio(k, d):.2f}")
+
+        # Roster + totaux en une seule requête (stats.roster_stats)
+        make_vlist(parent, 94, make_player_row, fill_player_row, stats.roster_stats(cursor, tid, stats_since))
+
+    scr.part(left_inner, ('players', 'matches', 'owners', 'window'), build_players, fill='both', expand=True)
 
     right_outer = tk.Frame(body, bg=ACCENT, bd=1)
     right_outer.pack(side='left', fill='both', expand=True, padx=10)
     right_inner = tk.Frame(right_outer, bg=BG); right_inner.pack(fill='both', expand=True, padx=4, pady=4)
-    map_canvas = tk.Canvas(right_inner, bg=BG, highlightthickness=0)
-    bind_mousewheel(map_canvas)  # 👈 molette
-    ms = tk.Scrollbar(right_inner, orient='vertical', command=map_canvas.yview)
-    map_canvas.configure(yscrollcommand=ms.set)
-    ms.pack(side='right', fill='y'); map_canvas.pack(side='left', fill='both', expand=True)
-
-    maps_frame = tk.Frame(map_canvas, bg=BG)
-    wid_mp = map_canvas.create_window((0, 0), window=maps_frame, anchor='nw')
-    map_canvas.bind('<Configure>', lambda e: map_canvas.itemconfig(wid_mp, width=map_canvas.winfo_width()))
-    maps_frame.bind('<Configure>', lambda e: map_canvas.configure(scrollregion=map_canvas.bbox('all')))
-
-    cursor.execute('''SELECT m.id, m.name, m.image,
-                             COUNT(matches.id),
-                             COALESCE(SUM(matches.rounds_won),0),
-                             COALESCE(SUM(matches.rounds_lost),0)
-                      FROM Maps m
-                      LEFT JOIN Matches matches ON matches.map_id = m.id
-                          AND matches.team_id = ?
-                      GROUP BY m.id''', (tid,))
-    for mid, mname, mimg, games, rw, rl in cursor.fetchall():
-        row = tk.Frame(maps_frame, bg=BG); row.pack(fill='x', pady=6, padx=4)
-        m_path = os.path.join(IMAGES_DIR, mimg) if mimg else os.path.join(IMAGES_DIR, 'anonymous.png')
-        m_img = load_img(m_path, (80, 80))
-        lbl = tk.Label(row, image=m_img, bg=BG); lbl.pack(side='left')
-        map_images[mid] = m_img
+
+    def make_team_map_row(master):
+        slot = tk.Frame(master, bg=BG)
+        row = tk.Frame(slot, bg=BG); row.pack(fill='x', pady=6, padx=4)
+        slot.img = tk.Label(row, bg=BG); slot.img.pack(side='left')
         bbox = tk.Frame(row, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
         bbox.pack(side='left', fill='x', expand=True)
-        tk.Label(bbox, text=mname, fg=FG, bg=BG, font=('Arial', 12, 'bold')).pack(anchor='w', padx=6)
+        slot.name = tk.Label(bbox, fg=FG, bg=BG, font=('Arial', 12, 'bold')); slot.name.pack(anchor='w', padx=6)
+        slot.stats = tk.Label(bbox, fg=FG, bg=BG); slot.stats.pack(anchor='w', padx=6, pady=(0, 6))
+        return slot
+
+    def fill_team_map_row(slot, m, _index):
+        _mid, mname, mimg, n_games, rw, rl = m
+        m_path = os.path.join(IMAGES_DIR, mimg) if mimg else os.path.join(IMAGES_DIR, 'anonymous.png')
+        set_img_async(slot.img, m_path, (80, 80))
+        slot.name.configure(text=mname)
         wr_val = rw / (rw + rl) * 100 if rw + rl else 0
-        tk.Label(bbox, text=f"Games : {games} | Win-rate rounds : {wr_val:.1f} %",
-                 fg=FG, bg=BG).pack(anchor='w', padx=6, pady=(0, 6))
+        slot.stats.configure(text=f"Games : {n_games} | Win-rate rounds : {wr_val:.1f} %")
 
-    tk.Button(root, text='Exporter', bg=ACCENT, fg='#04120d', bd=0, font=('Arial', 12, 'bold'),
+    def build_maps(parent):
+        # Totaux par semaine de l’équipe (TeamWeekTotals), sommés sur la fenêtre choisie
+        make_vlist(parent, 94, make_team_map_row, fill_team_map_row,
+                   stats.team_map_totals(cursor, tid, stats_since))
+
+    scr.part(right_inner, ('maps', 'matches', 'window'), build_maps, fill='both', expand=True)
+
+    tk.Button(scr.frame, text='Exporter', bg=ACCENT, fg='#04120d', bd=0, font=('Arial', 12, 'bold'),
               command=export_overlay).pack(pady=10)
 
 # ======================================================================
 # Leaderboard + Match overlay
 # ======================================================================
 def get_leaderboard():
-    cursor.execute('''
-        SELECT
-            t.id,
-            t.name,
-            t.logo,
-            COALESCE(SUM(CASE WHEN m.rounds_won > m.rounds_lost THEN 1 ELSE 0 END), 0) AS wins
-        FROM Teams t
-        LEFT JOIN Matches m ON m.team_id = t.id
-        GROUP BY t.id
-        ORDER BY wins DESC, t.name COLLATE NOCASE ASC
-    ''')
-    return cursor.fetchall()
+    return stats.leaderboard(cursor, leaderboard_order, stats_since)
 
 def add_match_dual_overlay():
     """
@@ -1553,30 +1662,35 @@ def add_match_dual_overlay():
 
     ov = show_overlay()
 
-    cursor.execute('SELECT id,name FROM Maps ORDER BY name COLLATE NOCASE')
-    maps = cursor.fetchall()
-    map_names = [m[1] for m in maps] or ['Aucune map']
-    map_v = tk.StringVar(value=(map_names[0] if map_names else ''))
-
-    cursor.execute('SELECT id,name FROM Teams ORDER BY name COLLATE NOCASE')
-    teams = cursor.fetchall()
-    team_names = [t[1] for t in teams]
-    team1_v = tk.StringVar(value=(team_names[0] if team_names else ''))
-    team2_v = tk.StringVar(value=(team_names[1] if len(team_names) > 1 else (team_names[0] if team_names else '')))
+    # Map / équipes : champs de recherche (search.py) au lieu de menus avec tous les noms ;
+    # pré-remplis avec la 1re map et les 2 premières équipes (ordre alpha)
+    cursor.execute('SELECT id,name FROM Maps ORDER BY name COLLATE NOCASE LIMIT 1')
+    first_maps = cursor.fetchall()
+    cursor.execute('SELECT id,name FROM Teams ORDER BY name COLLATE NOCASE LIMIT 2')
+    first_teams = cursor.fetchall()
+    picked = {'map': first_maps[0] if first_maps else None,
+              'team1': first_teams[0] if first_teams else None,
+              'team2': first_teams[-1] if first_teams else None}
 
     team1_rounds_v = tk.IntVar(value=0)
     team2_rounds_v = tk.IntVar(value=0)
 
+    # Date du match (fenêtres de temps des stats) : aujourd’hui par défaut
+    today = games.now()[:10]
+    date_v = tk.StringVar(value=today)
+
     team1_entries = {}
     team2_entries = {}
 
     def only_digits(P): return P.isdigit() or P == ''
     vcmd = (root.register(only_digits), '%P')
 
-    def find_id_by_name(seq, name):
-        for _id, nm in seq:
-            if nm == name: return _id
-        return None
+    def picked_id(slot, kind, entry):
+        """Id choisi dans la liste, ou celui du nom tapé tel quel (None si inconnu)."""
+        name = entry.get().strip()
+        if picked[slot] and picked[slot][1] == name:
+            return picked[slot][0]
+        return search.lookup(cursor, kind, name) if name else None
 
     def build_entries_for_team(parent, tid, target_dict):
         for w in parent.winfo_children(): w.destroy()
@@ -1622,19 +1736,36 @@ def add_match_dual_overlay():
     sel.pack(fill='x', padx=16, pady=8)
     mpbox = tk.Frame(sel, bg=BG); mpbox.pack(side='left', padx=12, pady=8)
     ttk.Label(mpbox, text='Map :').pack(anchor='w')
-    ttk.OptionMenu(mpbox, map_v, map_v.get(), *map_names).pack()
+
+    def on_pick(slot):
+        def pick(_kind, item_id, name):
+            picked[slot] = (item_id, name)
+            if slot != 'map':
+                refresh_rosters()
+        return pick
+
+    map_e = search_entry(mpbox, ov, ('map',), on_pick('map'), width=16,
+                         text=picked['map'][1] if picked['map'] else '')
+    map_e.pack()
     t1box = tk.Frame(sel, bg=BG); t1box.pack(side='left', padx=24, pady=8)
     ttk.Label(t1box, text='Équipe A :').pack(anchor='w')
-    ttk.OptionMenu(t1box, team1_v, team1_v.get(), *team_names).pack()
+    team1_e = search_entry(t1box, ov, ('team',), on_pick('team1'), width=18,
+                           text=picked['team1'][1] if picked['team1'] else '')
+    team1_e.pack()
     t2box = tk.Frame(sel, bg=BG); t2box.pack(side='left', padx=24, pady=8)
     ttk.Label(t2box, text='Équipe B :').pack(anchor='w')
-    ttk.OptionMenu(t2box, team2_v, team2_v.get(), *team_names).pack()
+    team2_e = search_entry(t2box, ov, ('team',), on_pick('team2'), width=18,
+                           text=picked['team2'][1] if picked['team2'] else '')
+    team2_e.pack()
     sc = tk.Frame(sel, bg=BG); sc.pack(side='left', padx=24, pady=8)
     ttk.Label(sc, text='Score (Rounds) :').pack(anchor='w')
     scrow = tk.Frame(sc, bg=BG); scrow.pack()
     ttk.Entry(scrow, textvariable=team1_rounds_v, width=6, validate='key', validatecommand=vcmd, style='Login.TEntry').pack(side='left')
     ttk.Label(scrow, text='  —  ').pack(side='left')
     ttk.Entry(scrow, textvariable=team2_rounds_v, width=6, validate='key', validatecommand=vcmd, style='Login.TEntry').pack(side='left')
+    dtbox = tk.Frame(sel, bg=BG); dtbox.pack(side='left', padx=24, pady=8)
+    ttk.Label(dtbox, text='Date (AAAA-MM-JJ) :').pack(anchor='w')
+    ttk.Entry(dtbox, textvariable=date_v, width=12, style='Login.TEntry').pack()
 
     body = tk.Frame(frm, bg=BG); body.pack(fill='both', expand=True, padx=16, pady=8)
 
@@ -1664,24 +1795,30 @@ def add_match_dual_overlay():
     t2_canvas.bind('<Configure>', lambda e: t2_canvas.itemconfig(t2_id, width=t2_canvas.winfo_width()))
     t2_frame.bind('<Configure>', lambda e: t2_canvas.configure(scrollregion=t2_canvas.bbox('all')))
 
-    def refresh_rosters(*_args):
-        tid1 = find_id_by_name(teams, team1_v.get())
-        tid2 = find_id_by_name(teams, team2_v.get())
-        build_entries_for_team(t1_frame, tid1, team1_entries)
-        build_entries_for_team(t2_frame, tid2, team2_entries)
+    # Rosters refaits seulement quand l’équipe choisie change (pas à chaque touche)
+    shown = {}
+    def refresh_rosters():
+        for slot, frame, target in (('team1', t1_frame, team1_entries), ('team2', t2_frame, team2_entries)):
+            tid = picked[slot][0] if picked[slot] else None
+            if slot not in shown or shown[slot] != tid:
+                shown[slot] = tid
+                build_entries_for_team(frame, tid, target)
 
-    team1_v.trace_add('write', refresh_rosters)
-    team2_v.trace_add('write', refresh_rosters)
     refresh_rosters()
 
     def save():
-        if not teams or len(teams) < 2:
+        if len(first_teams) < 2:
             messagebox.showerror('Erreur', "Il faut au moins 2 équipes dans la ligue."); return
-        tid1 = find_id_by_name(teams, team1_v.get())
-        tid2 = find_id_by_name(teams, team2_v.get())
+        tid1 = picked_id('team1', 'team', team1_e)
+        tid2 = picked_id('team2', 'team', team2_e)
         if tid1 is None or tid2 is None or tid1 == tid2:
             messagebox.showerror('Erreur', "Sélectionnez deux équipes différentes."); return
-        mid = find_id_by_name(maps, map_v.get())
+        if tid1 != shown.get('team1') or tid2 != shown.get('team2'):
+            # Nom tapé sans passer par la liste : on montre d’abord le bon roster
+            picked['team1'], picked['team2'] = (tid1, team1_e.get().strip()), (tid2, team2_e.get().strip())
+            refresh_rosters()
+            messagebox.showinfo('Équipes', "Rosters mis à jour : cochez les joueurs puis enregistrez."); return
+        mid = picked_id('map', 'map', map_e)
         if mid is None:
             messagebox.showerror('Erreur', "Sélectionnez une map."); return
         try:
@@ -1690,10 +1827,15 @@ def add_match_dual_overlay():
             messagebox.showerror('Erreur', "Scores invalides (entiers requis)."); return
         if (s1 + s2) < 4:
             messagebox.showerror('Erreur', "Au moins 4 rounds au total pour enregistrer un match."); return
-        cursor.execute('INSERT INTO Matches(team_id,map_id,rounds_won,rounds_lost) VALUES (?,?,?,?)', (tid1, mid, s1, s2))
-        match1_id = cursor.lastrowid
-        cursor.execute('INSERT INTO Matches(team_id,map_id,rounds_won,rounds_lost) VALUES (?,?,?,?)', (tid2, mid, s2, s1))
-        match2_id = cursor.lastrowid
+        try:
+            # Date du jour laissée telle quelle → on garde l’heure exacte
+            played_at = games.now() if date_v.get().strip() == today else games.parse_date(date_v.get())
+        except ValueError:
+            played_at = None
+        if played_at is None:
+            messagebox.showerror('Erreur', "Date invalide (AAAA-MM-JJ)."); return
+        # Une game (games.py) + une ligne Matches par équipe, reliées par game_id
+        _game_id, match1_id, match2_id = games.record(cursor, mid, tid1, s1, tid2, s2, played_at)
         for pid, (played, k, d, b) in team1_entries.items():
             if played.get() and (k.get() or d.get() or b.get()):
                 cursor.execute('INSERT INTO PlayerStats(match_id,player_id,kills,deaths,bombs) VALUES (?,?,?,?,?)',
@@ -1702,7 +1844,10 @@ def add_match_dual_overlay():
             if played.get() and (k.get() or d.get() or b.get()):
                 cursor.execute('INSERT INTO PlayerStats(match_id,player_id,kills,deaths,bombs) VALUES (?,?,?,?,?)',
                                (match2_id, pid, k.get(), d.get(), b.get()))
+        # ELO des deux équipes, dans la même transaction que le match (ratings.py)
+        ratings.apply(cursor, [(match1_id, tid1, s1, match2_id, tid2, s2)])
         conn.commit()
+        screens_mgr.bump('matches')
         messagebox.showinfo('Succès', 'Match enregistré pour les deux équipes.')
         ov.destroy(); load_home()
 
@@ -1721,10 +1866,12 @@ def load_home():
     global _overlay
     if _overlay:
         _overlay.destroy(); _overlay = None
-    for w in root.winfo_children():
-        w.destroy()
+    # Gardée en mémoire : le retour depuis une fiche ne refait que les panneaux périmés
+    screens_mgr.show('home', build_home)
 
-    header = tk.Frame(root, bg=HEADER_BG); header.pack(fill='x')
+def build_home(scr):
+    """Construit l’accueil dans scr.frame (vignettes d’équipes et leaderboard en parties)."""
+    header = tk.Frame(scr.frame, bg=HEADER_BG); header.pack(fill='x')
 
     logo_big = load_img(os.path.join(IMAGES_DIR, 'logoapp.png'), (150, 150))
     if logo_big:
@@ -1734,6 +1881,12 @@ def load_home():
     tk.Label(header, text='𝕾𝖙𝖆𝖙𝖎𝖘𝖙𝖎𝖖𝖚𝖊 LEAGUE',
              font=('Consolas', 28, 'bold'), bg=HEADER_BG, fg=FG).pack(side='left', padx=10)
 
+    # Recherche d’équipe / de joueur (index FTS5) : ouvre la fiche choisie
+    find = tk.Frame(header, bg=HEADER_BG); find.pack(side='left', padx=20)
+    tk.Label(find, text='Rechercher', bg=HEADER_BG, fg=FG, font=('Consolas', 12)).pack(anchor='w')
+    search_entry(find, scr.frame, ('team', 'player'),
+                 lambda kind, item_id, _name: open_team(item_id) if kind == 'team' else open_player(item_id)).pack()
+
     def icon(img, cmd, fallback, img_size=(160, 160)):
         frame = tk.Frame(header, bg=HEADER_BG); frame.pack(side='right', padx=10, pady=10)
         ic = load_img(os.path.join(IMAGES_DIR, img), img_size)
@@ -1757,63 +1910,44 @@ def load_home():
         # Le capitaine attend d’être assigné par l’admin; ensuite il gère juste SA team.
         pass
 
-    body = tk.Frame(root, bg=BG); body.pack(fill='both', expand=True, padx=20, pady=12)
+    body = tk.Frame(scr.frame, bg=BG); body.pack(fill='both', expand=True, padx=20, pady=12)
 
-    left_column = tk.Frame(body, bg=BG); left_column.pack(side='left', fill='both', expand=True, padx=(0, 10))
+    # Grille de vignettes d’équipes, 4 par rangée (liste virtuelle : seules les
+    # rangées visibles ont des widgets, recyclés en défilant)
+    def make_team_cell(master):
+        cell = tk.Frame(master, bg=BG)
+        cell.btn = tk.Button(cell, compound='top', bg=BG, fg=FG, bd=0, activebackground=BG)
+        cell.btn.pack(padx=10, pady=10)
+        return cell
 
-    def make_stack_panel(parent, title):
+    def fill_team_cell(cell, team, _index):
+        tid, name, logo = team[:3]
+        img_path = os.path.join(IMAGES_DIR, logo) if logo else os.path.join(IMAGES_DIR, 'anonymous.png')
+        cell.btn.configure(text=name, command=lambda: open_team(tid))
+        set_img_async(cell.btn, img_path, (100, 100))
+
+    def make_stack_panel(parent, title, teams):
         outer = tk.Frame(parent, bg=ACCENT, bd=1); outer.pack(fill='both', expand=True, pady=8)
         inner = tk.Frame(outer, bg=BG); inner.pack(fill='both', expand=True, padx=4, pady=4)
         bar = tk.Frame(inner, bg=SUB_HDR); bar.pack(fill='x')
         tk.Label(bar, text=title, font=('Consolas', 16, 'bold'), bg=SUB_HDR, fg=FG).pack(pady=6)
-        wrap = tk.Frame(inner, bg=BG); wrap.pack(fill='both', expand=True, pady=(4, 2))
-        canvas = tk.Canvas(wrap, bg=BG, highlightthickness=0)
-        ybar = tk.Scrollbar(wrap, orient='vertical', command=canvas.yview)
-        canvas.configure(yscrollcommand=ybar.set)
-        ybar.pack(side='right', fill='y')
-        canvas.pack(side='left', fill='both', expand=True)
-        bind_mousewheel(canvas)  # 👈 molette
-        grid = tk.Frame(canvas, bg=BG)
-        wid = canvas.create_window((0, 0), window=grid, anchor='nw')
-        canvas.bind('<Configure>', lambda e: canvas.itemconfig(wid, width=canvas.winfo_width()))
-        grid.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
-        return grid
-
-    grid_my = None
-    if is_captain():
-        grid_my = make_stack_panel(left_column, 'Mon équipe ')
-    grid_league = make_stack_panel(left_column, 'équipes')
-
-    def add_team_thumbnail(panel, tid, name, logo):
-        n = len(panel.grid_slaves())
-        r, c = divmod(n, 4)
-        cell = tk.Frame(panel, bg=BG); cell.grid(row=r, column=c, padx=10, pady=10)
-        img_path = os.path.join(IMAGES_DIR, logo) if logo else os.path.join(IMAGES_DIR, 'anonymous.png')
-        img = load_img(img_path, (100, 100))
-        team_images[tid] = img
-        btn = tk.Button(cell, image=img, text=name, compound='top',
-                        bg=BG, fg=FG, bd=0, activebackground=BG,
-                        command=lambda i=tid: open_team(i))
-        btn.image = img; btn.pack()
+        return make_vlist(inner, 150, make_team_cell, fill_team_cell, teams, columns=4, pady=(4, 2))
 
-    cursor.execute('SELECT id, name, logo, side FROM Teams ORDER BY name COLLATE NOCASE')
-    all_teams = cursor.fetchall()
+    def build_team_panels(left_column):
+        cursor.execute('SELECT id, name, logo, side FROM Teams ORDER BY name COLLATE NOCASE')
+        all_teams = cursor.fetchall()
 
-    if is_admin():
-        for tid, name, logo, side in all_teams:
-            add_team_thumbnail(grid_league, tid, name, logo)
-    elif is_captain():
-        my_tid = get_captain_team_id(current_captain)
-        if my_tid:
-            cursor.execute('SELECT id,name,logo FROM Teams WHERE id=?', (my_tid,))
-            t = cursor.fetchone()
-            if t and grid_my is not None:
-                add_team_thumbnail(grid_my, t[0], t[1], t[2])
-        for tid, name, logo, side in all_teams:
-            add_team_thumbnail(grid_league, tid, name, logo)
-    else:
-        for tid, name, logo, side in all_teams:
-            add_team_thumbnail(grid_league, tid, name, logo)
+        if is_captain():
+            my_team = []
+            my_tid = get_captain_team_id(current_captain)
+            if my_tid:
+                cursor.execute('SELECT id,name,logo FROM Teams WHERE id=?', (my_tid,))
+                my_team = cursor.fetchall()
+            make_stack_panel(left_column, 'Mon équipe ', my_team)
+        make_stack_panel(left_column, 'équipes', all_teams)
+
+    scr.part(body, ('teams', 'owners'), build_team_panels,
+             side='left', fill='both', expand=True, padx=(0, 10))
 
     right_column = tk.Frame(body, bg=BG); right_column.pack(side='left', fill='both', expand=True, padx=(10, 0))
     leaderboard_outer = tk.Frame(right_column, bg=ACCENT, bd=1); leaderboard_outer.pack(fill='both', expand=True)
@@ -1821,41 +1955,55 @@ def load_home():
 
     title_bar = tk.Frame(leaderboard_inner, bg=SUB_HDR); title_bar.pack(fill='x')
     tk.Label(title_bar, text='LEADERBOARD ', font=('Consolas', 16, 'bold'), bg=SUB_HDR, fg=FG).pack(pady=6)
-
-    lb_wrap = tk.Frame(leaderboard_inner, bg=BG); lb_wrap.pack(fill='both', expand=True, pady=(4, 2))
-    lb_canvas = tk.Canvas(lb_wrap, bg=BG, highlightthickness=0); lb_canvas.pack(side='left', fill='both', expand=True)
-    bind_mousewheel(lb_canvas)  # 👈 molette
-    lb_scroll = tk.Scrollbar(lb_wrap, orient='vertical', command=lb_canvas.yview); lb_scroll.pack(side='right', fill='y')
-    lb_canvas.configure(yscrollcommand=lb_scroll.set)
-    lb_frame = tk.Frame(lb_canvas, bg=BG); wid_lb = lb_canvas.create_window((0, 0), window=lb_frame, anchor='nw')
-    lb_canvas.bind('<Configure>', lambda e: lb_canvas.itemconfig(wid_lb, width=lb_canvas.winfo_width()))
-    lb_frame.bind('<Configure>', lambda e: lb_canvas.configure(scrollregion=lb_canvas.bbox('all')))
-
-    leaderboard = get_leaderboard()
-    rank = 1
-    for tid, name, logo, wins in leaderboard:
-        row = tk.Frame(lb_frame, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
-        row.pack(fill='x', pady=4, padx=6)
-        tk.Label(row, text=f"{rank:>2}.", width=4, anchor='w', fg=FG, bg=BG,
-                 font=('Consolas', 14, 'bold')).pack(side='left', padx=(6, 4))
+    # Fenêtre de temps : compte pour « Victoires » (la cote ELO est toujours la cote actuelle)
+    window_picker(title_bar).place(relx=1.0, rely=0.5, anchor='e', x=-8)
+
+    def make_lb_row(master):
+        slot = tk.Frame(master, bg=BG)
+        slot.row = tk.Frame(slot, bg=BG, bd=1, highlightbackground=ACCENT, highlightthickness=1)
+        slot.row.pack(fill='x', pady=4, padx=6)
+        slot.rank = tk.Label(slot.row, width=4, anchor='w', fg=FG, bg=BG, font=('Consolas', 14, 'bold'))
+        slot.rank.pack(side='left', padx=(6, 4))
+        slot.img = tk.Label(slot.row, bg=BG); slot.img.pack(side='left', padx=4)
+        slot.name = tk.Label(slot.row, fg=FG, bg=BG, font=('Arial', 12, 'bold')); slot.name.pack(side='left', padx=8)
+        slot.value = tk.Label(slot.row, fg=FG, bg=BG, font=('Consolas', 12)); slot.value.pack(side='right', padx=8)
+        return slot
+
+    def fill_lb_row(slot, team, index):
+        tid, name, logo, value = team
         img_path = os.path.join(IMAGES_DIR, logo) if logo else os.path.join(IMAGES_DIR, 'anonymous.png')
-        img_small = load_img(img_path, (32, 32))
-        team_images[(tid, 'lb')] = img_small
-        tk.Label(row, image=img_small, bg=BG).pack(side='left', padx=4)
-        tk.Label(row, text=name, fg=FG, bg=BG, font=('Arial', 12, 'bold')).pack(side='left', padx=8)
-        tk.Label(row, text=f"Wins: {wins}", fg=FG, bg=BG, font=('Consolas', 12)).pack(side='right', padx=8)
-        row.bind('<Button-1>', lambda _e, i=tid: open_team(i))
-        for child in row.winfo_children():
-            child.bind('<Button-1>', lambda _e, i=tid: open_team(i))
-        rank += 1
-
-    tk.Button(root, text='Exporter', bg=ACCENT, fg='#04120d', bd=0, font=('Arial', 12, 'bold'),
+        slot.rank.configure(text=f"{index + 1:>2}.")
+        set_img_async(slot.img, img_path, (32, 32))
+        slot.name.configure(text=name)
+        slot.value.configure(text=f"Elo: {value:.0f}" if leaderboard_order == 'rating' else f"Wins: {value}")
+        for w in [slot.row] + slot.row.winfo_children():
+            w.bind('<Button-1>', lambda _e: open_team(tid))
+
+    def build_leaderboard(parent):
+        # Tri : nombre de victoires (défaut) ou cote ELO (colonne indexée)
+        bar = tk.Frame(parent, bg=BG); bar.pack(fill='x', pady=(4, 0))
+        def sort_by(order):
+            global leaderboard_order
+            leaderboard_order = order
+            vl.set_items(get_leaderboard())
+        for order, text in (('wins', 'Victoires'), ('rating', 'Elo')):
+            ttk.Button(bar, text=text, style='Neon.TButton',
+                       command=lambda o=order: sort_by(o)).pack(side='left', padx=6)
+        vl = make_vlist(parent, 48, make_lb_row, fill_lb_row, get_leaderboard(), pady=(4, 2))
+
+    scr.part(leaderboard_inner, ('teams', 'matches', 'window'), build_leaderboard, fill='both', expand=True)
+
+    tk.Button(scr.frame, text='Exporter', bg=ACCENT, fg='#04120d', bd=0, font=('Arial', 12, 'bold'),
               command=export_overlay).pack(pady=10)
 
 # ======================================================================
 # Boucle principale
 # ======================================================================
 show_login()
+startup.mark('écran de connexion')
+# Journal du démarrage (une ligne JSON par lancement) et crochet STATTEAM_STARTUP_HOOK
+# (outils de dev) ; voir startup.py / bench.py startup
+startup.finish(root, os.path.join(BASE_DIR, 'startup.log'), sys.modules[__name__])
 root.mainloop()
 
 
@@ -1,5 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
+# Mode de build :
+#   (défaut)                 un seul main.exe (onefile) : pratique à distribuer, mais
+#                            chaque lancement décompresse tout dans un dossier temporaire
+#   STATTEAM_BUILD=onedir    dossier dist/main/ (onedir, sans UPX) : rien à décompresser,
+#                            démarrage à froid nettement plus rapide
+#   ex. : set STATTEAM_BUILD=onedir && pyinstaller main.spec
+# Comparer les deux avec : python bench.py startup --exe dist/main/main.exe
+ONEDIR = os.environ.get('STATTEAM_BUILD', '').lower() == 'onedir'
 
 a = Analysis(
     ['main.py'],
@@ -19,14 +28,14 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
+    *([] if ONEDIR else [a.binaries, a.datas]),
     [],
+    exclude_binaries=ONEDIR,
     name='main',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=not ONEDIR,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -36,3 +45,14 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+if ONEDIR:
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='main',
+    )
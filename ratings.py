@@ -0,0 +1,143 @@
+# ratings.py
+# -----------------------------------------------------------------------------
+# Rôle : classement ELO des équipes
+#        - Teams.rating : cote courante (indexée → leaderboard trié sans relire Matches)
+#        - RatingHistory : une ligne par équipe et par match (avant / après / delta)
+#        - apply() : mise à jour incrémentale, appelée dans la MÊME transaction que
+#          l’enregistrement du match (add_match_dual_overlay, importer)
+#        - replay() / rebuild() : tout recalculer depuis Games (autre K, autre
+#          pondération, après une suppression d’équipe / de map…)
+#
+# Une game = les 2 lignes Matches d’un même match (une par équipe), reliées
+# par la table Games (games.py) : le replay les relit dans l’ordre des games.
+#
+# Réglages dans statteam.ini (optionnels) :
+#   [ratings]
+#   k_factor = 32
+#   mov_weight = 1.0     ; 0 = ELO classique (l’écart de rounds ne compte pas)
+# -----------------------------------------------------------------------------
+
+import configparser
+import math
+
+import db
+import games
+
+INITIAL_RATING = 1500.0     # aussi le DEFAULT de la colonne Teams.rating (db.py)
+DEFAULT_K = 32.0
+DEFAULT_MOV_WEIGHT = 1.0
+
+
+def load_settings(config_file=None):
+    """{'k_factor', 'mov_weight'} selon [ratings] de statteam.ini (valeurs invalides ignorées)."""
+    parser = configparser.ConfigParser()
+    parser.read(config_file or db.CONFIG_FILE, encoding='utf-8')
+    settings = {'k_factor': DEFAULT_K, 'mov_weight': DEFAULT_MOV_WEIGHT}
+    for key in settings:
+        try:
+            value = parser.getfloat('ratings', key, fallback=settings[key])
+        except ValueError:
+            continue
+        if value >= 0:
+            settings[key] = value
+    return settings
+
+
+# ----------------------------------------------------------------
+# expected(ra, rb) / delta(...)
+# ----------------------------------------------------------------
+# ELO standard : score attendu de A contre B, puis K × (résultat − attendu).
+# Écart de rounds (mov_weight > 0) : multiplicateur 1 + w·ln(1 + écart),
+# corrigé pour un favori qui gagne (sinon les grosses cotes gonflent toutes
+# seules, même idée que l’ELO de FiveThirtyEight). Nul = 0,5, pas de bonus.
+def expected(ra, rb):
+    """Probabilité que A batte B selon leurs cotes."""
+    return 1.0 / (1.0 + 10 ** ((rb - ra) / 400.0))
+
+
+def delta(ra, rb, score_a, score_b, k_factor=DEFAULT_K, mov_weight=DEFAULT_MOV_WEIGHT):
+    """Points gagnés (ou perdus si négatif) par A ; B reçoit l’opposé."""
+    result = 1.0 if score_a > score_b else 0.0 if score_a < score_b else 0.5
+    mult = 1.0
+    if mov_weight and score_a != score_b:
+        winner_gap = (ra - rb) if score_a > score_b else (rb - ra)
+        mult = (1.0 + mov_weight * math.log1p(abs(score_a - score_b))) \
+            * 2.2 / (2.2 + 0.001 * max(winner_gap, -1000.0))
+    return k_factor * mult * (result - expected(ra, rb))
+
+
+# ----------------------------------------------------------------
+# apply(cursor, sides, settings=None)
+# ----------------------------------------------------------------
+# `sides` : [(match_a, team_a, score_a, match_b, team_b, score_b), ...] dans
+# l’ordre où ils ont été joués. Cotes lues une fois, calcul en Python, puis
+# executemany : 1 game (save) ou 100 000 (import), même chemin.
+# Pas de commit ici : c’est la transaction de l’appelant.
+def apply(cursor, sides, settings=None):
+    """Met à jour Teams.rating et RatingHistory pour `sides`. Retourne le nb de games notées."""
+    settings = settings or load_settings()
+    sides = list(sides)
+    if not sides:
+        return 0
+    teams = {g[1] for g in sides} | {g[4] for g in sides}
+    marks = ','.join('?' * len(teams))
+    ratings = {tid: r for tid, r in cursor.execute(
+        f'SELECT id, rating FROM Teams WHERE id IN ({marks})', tuple(teams))}
+
+    history = []
+    for match_a, team_a, score_a, match_b, team_b, score_b in sides:
+        ra = ratings.get(team_a, INITIAL_RATING)
+        rb = ratings.get(team_b, INITIAL_RATING)
+        d = delta(ra, rb, score_a, score_b, settings['k_factor'], settings['mov_weight'])
+        ratings[team_a], ratings[team_b] = ra + d, rb - d
+        history.append((match_a, match_b, team_a, team_b, ra, ra + d, d))
+        history.append((match_b, match_a, team_b, team_a, rb, rb - d, -d))
+
+    cursor.executemany('''INSERT INTO RatingHistory(match_id, opponent_match_id, team_id, opponent_id,
+                                                    rating_before, rating_after, delta)
+                          VALUES (?,?,?,?,?,?,?)''', history)
+    cursor.executemany('UPDATE Teams SET rating = ? WHERE id = ?',
+                       [(r, tid) for tid, r in ratings.items()])
+    return len(sides)
+
+
+# ----------------------------------------------------------------
+# replay(cursor, settings) / rebuild(conn, settings)
+# ----------------------------------------------------------------
+def replay(cursor, settings=None, sides=None):
+    """
+    Remet toutes les cotes à INITIAL_RATING et rejoue toutes les games (dans la
+    transaction en cours). sides : défaut = games.all_sides(cursor).
+    """
+    if sides is None:
+        sides = games.all_sides(cursor)
+    cursor.execute('DELETE FROM RatingHistory')
+    cursor.execute('UPDATE Teams SET rating = ?', (INITIAL_RATING,))
+    return apply(cursor, sides, settings)
+
+
+def rebuild(conn, settings=None):
+    """replay() dans sa propre transaction. Retourne le nb de games notées."""
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        conn.commit()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        n = replay(cursor, settings)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return n
+
+
+def history(cursor, team_id):
+    """[(match_id, opponent_name, rating_before, rating_after, delta), ...] de `team_id`, du plus récent au plus ancien."""
+    cursor.execute('''
+        SELECT h.match_id, COALESCE(t.name, '?'), h.rating_before, h.rating_after, h.delta
+        FROM RatingHistory h
+        LEFT JOIN Teams t ON t.id = h.opponent_id
+        WHERE h.team_id = ?
+        ORDER BY h.id DESC
+    ''', (team_id,))
+    return cursor.fetchall()
@@ -0,0 +1,241 @@
+# rounds.py
+# -----------------------------------------------------------------------------
+# Rôle : le détail des manches (rounds) d’une game et les stats par round
+#        - stockage compact : GameRounds(game_id, data) = UN BLOB par game,
+#          2 octets par round (uint16 little-endian) → 24 rounds = 48 octets
+#        - écriture avec le module array (pas de NumPy pour importer)
+#        - lecture / stats avec NumPy : tous les rounds d’une équipe décodés
+#          d’un bloc (np.frombuffer), puis pistol rounds, séries, remontées,
+#          bombe et durée calculés en vectoriel (aucune boucle Python par round)
+#
+# Un round (bits du uint16), du point de vue de Games.team_a (games.py) :
+#   bit 0      : 1 = round gagné par team_b
+#   bit 1      : 1 = team_a en attaque (0 = en défense)
+#   bits 2-3   : bombe : 0 = pas posée, 1 = posée (explosée), 2 = posée puis désamorcée
+#   bits 4-15  : durée du round en secondes (0 = inconnue, max 4095)
+#
+# NumPy vient avec matplotlib ; importé seulement quand on calcule des stats.
+# -----------------------------------------------------------------------------
+
+import sys
+from array import array
+
+WINNER_B = 0x1
+A_ATTACK = 0x2
+BOMB_SHIFT, BOMB_MASK = 2, 0x3
+DURATION_SHIFT, DURATION_MAX = 4, 0xFFF
+
+BOMB_NONE, BOMB_PLANTED, BOMB_DEFUSED = 0, 1, 2
+_BOMBS = {None: BOMB_NONE, '': BOMB_NONE, 'none': BOMB_NONE,
+          'planted': BOMB_PLANTED, 'exploded': BOMB_PLANTED, 'defused': BOMB_DEFUSED}
+
+# Remontée : être mené d’au moins ce nombre de rounds, puis gagner la game
+COMEBACK_DEFICIT = 3
+
+
+# ----------------------------------------------------------------
+# parse(raw, team_a, team_b) / encode(rounds, swap)
+# ----------------------------------------------------------------
+# Format d’import (NDJSON, clé "rounds" d’une game), un dict par round :
+#   {"winner": "Faze", "side": "attack", "bomb": "planted", "duration": 94}
+# winner : nom d’équipe (ou "a" / "b") ; side : côté de team_a du fichier
+# (attack / defense) ; bomb : none / planted / exploded / defused ; duration en s.
+def parse(raw, team_a, team_b):
+    """Liste brute → [(gagné_par_a, a_en_attaque, bombe, durée), ...]. Lève ValueError si invalide."""
+    parsed = []
+    for i, r in enumerate(raw, 1):
+        winner = str(r.get('winner', '')).strip()
+        if winner in (team_a, 'a', 'A'):
+            won_a = True
+        elif winner in (team_b, 'b', 'B'):
+            won_a = False
+        else:
+            raise ValueError(f'round {i} : gagnant inconnu « {winner} »')
+        side = str(r.get('side', '')).strip().lower()
+        if side not in ('attack', 'defense'):
+            raise ValueError(f'round {i} : side doit être attack ou defense')
+        bomb = r.get('bomb')
+        bomb = _BOMBS.get(bomb.strip().lower() if isinstance(bomb, str) else bomb)
+        if bomb is None:
+            raise ValueError(f'round {i} : bomb invalide')
+        duration = int(r.get('duration') or 0)
+        if not 0 <= duration <= DURATION_MAX:
+            raise ValueError(f'round {i} : durée hors limites (0-{DURATION_MAX} s)')
+        parsed.append((won_a, side == 'attack', bomb, duration))
+    return parsed
+
+
+def encode(rounds, swap=False):
+    """
+    [(gagné_par_a, a_en_attaque, bombe, durée), ...] → BLOB.
+    swap=True : l’équipe « a » de la liste est Games.team_b (ids inversés, voir games.ordered).
+    """
+    codes = array('H', (
+        (WINNER_B if won_a == swap else 0)
+        | (A_ATTACK if attack != swap else 0)
+        | (bomb << BOMB_SHIFT)
+        | (min(duration, DURATION_MAX) << DURATION_SHIFT)
+        for won_a, attack, bomb, duration in rounds))
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    return codes.tobytes()
+
+
+def decode(blob):
+    """BLOB → array('H') des codes (pour déboguer / exporter ; les stats passent par load_team)."""
+    codes = array('H')
+    codes.frombytes(blob)
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    return codes
+
+
+def wins(rounds):
+    """(rounds gagnés par a, rounds gagnés par b) d’une liste parse()."""
+    won_a = sum(1 for r in rounds if r[0])
+    return won_a, len(rounds) - won_a
+
+
+# ----------------------------------------------------------------
+# load_team(cursor, team_id, since=None)
+# ----------------------------------------------------------------
+# Tous les rounds des games de `team_id` en tableaux NumPy, vus de son côté.
+# Une requête (idx_games_h2h pour team_a, idx_games_b pour team_b), les BLOB
+# collés bout à bout puis décodés d’un coup.
+def load_team(cursor, team_id, since=None):
+    """
+    Retourne un dict de tableaux NumPy :
+      par round : game (indice de game), won, attack, bomb, duration
+      par game  : starts (1er round), lengths, map_id
+    """
+    import numpy as np
+
+    where = '' if since is None else ' AND g.played_at >= ?'
+    cursor.execute(f'''
+        SELECT g.map_id, g.team_b = ?, r.data
+        FROM Games g
+        JOIN GameRounds r ON r.game_id = g.id
+        WHERE (g.team_a = ? OR g.team_b = ?){where} AND length(r.data) > 0
+        ORDER BY g.id
+    ''', (team_id, team_id, team_id) + (() if since is None else (since,)))
+    rows = cursor.fetchall()
+
+    map_id = np.array([r[0] for r in rows], dtype=np.int64)
+    is_b = np.array([r[1] for r in rows], dtype=bool)
+    lengths = np.array([len(r[2]) // 2 for r in rows], dtype=np.int64)
+    codes = np.frombuffer(b''.join(r[2] for r in rows), dtype='<u2')
+
+    starts = np.zeros(len(rows), dtype=np.int64)
+    if len(rows):
+        starts[1:] = np.cumsum(lengths)[:-1]
+    game = np.repeat(np.arange(len(rows)), lengths)
+    flip = is_b[game]
+    return {
+        'game': game,
+        'won': ((codes & WINNER_B) != 0) == flip,
+        'attack': ((codes & A_ATTACK) != 0) != flip,
+        'bomb': (codes >> BOMB_SHIFT) & BOMB_MASK,
+        'duration': (codes >> DURATION_SHIFT).astype(np.int64),
+        'starts': starts,
+        'lengths': lengths,
+        'map_id': map_id,
+    }
+
+
+# ----------------------------------------------------------------
+# team_round_stats(cursor, team_id, since=None, deficit=COMEBACK_DEFICIT)
+# ----------------------------------------------------------------
+# Par map (et au total), du point de vue de l’équipe :
+# - pistol rounds : 1er round de la game et 1er round après le changement de côté
+# - meilleure série de rounds gagnés d’affilée (dans une game)
+# - remontées : games où l’équipe a été menée de `deficit` rounds ou plus, et
+#   combien elle en a gagné
+# - bombe : posée en attaque, désamorcée en défense (sur bombe posée)
+# - durée moyenne des rounds (ceux dont la durée est connue)
+# Tout est fait sur les tableaux de load_team : cumsum / bincount / reduceat.
+ROUND_STATS_HEADER = ['Map', 'Games', 'Rounds', 'Rounds_G', 'Pistols', 'Pistols_G', 'Meilleure_série',
+                      'Menée', 'Remontées', 'Attaque', 'Posées', 'Défense_posée', 'Désamorcées', 'Durée_moy_s']
+
+
+def team_round_stats(cursor, team_id, since=None, deficit=COMEBACK_DEFICIT):
+    """
+    Retourne [(map_name, games, rounds, rounds_won, pistols, pistols_won, best_streak,
+    trailed, comebacks, attack_rounds, plants, defense_planted, defuses, avg_duration), ...]
+    une ligne par map jouée (avec rounds détaillés), puis une ligne 'Total'.
+    """
+    import numpy as np
+
+    t = load_team(cursor, team_id, since)
+    n_games = len(t['starts'])
+    if not n_games:
+        return []
+    won, attack, bomb, duration = t['won'], t['attack'], t['bomb'], t['duration']
+    game, starts, lengths = t['game'], t['starts'], t['lengths']
+    ends = starts + lengths - 1
+
+    first = np.zeros(len(won), dtype=bool)
+    first[starts] = True
+
+    # Pistol rounds : début de game + 1er changement de côté (pas ceux de la prolongation)
+    switch = np.zeros(len(won), dtype=bool)
+    switch[1:] = attack[1:] != attack[:-1]
+    switch &= ~first
+    n_switch = np.cumsum(switch)
+    n_switch -= np.repeat(n_switch[starts] - switch[starts], lengths)
+    pistol = first | (switch & (n_switch == 1))
+
+    # Séries : un « run » = rounds consécutifs de même résultat dans une game
+    new_run = first.copy()
+    new_run[1:] |= won[1:] != won[:-1]
+    run_id = np.cumsum(new_run) - 1
+    run_len = np.bincount(run_id)
+    best = np.zeros(n_games, dtype=np.int64)
+    np.maximum.at(best, game[new_run], run_len * won[new_run])
+
+    # Écart de score round après round (cumsum par game)
+    step = np.where(won, 1, -1)
+    diff = np.cumsum(step)
+    diff -= np.repeat(diff[starts] - step[starts], lengths)
+    trailed = np.minimum.reduceat(diff, starts) <= -deficit
+    comeback = trailed & (diff[ends] > 0)
+
+    # Regroupement par map : indice 0..k-1 par game, puis par round
+    map_ids, game_map = np.unique(t['map_id'], return_inverse=True)
+    round_map = game_map[game]
+    k = len(map_ids)
+
+    def per_round(values):
+        return np.bincount(round_map, weights=values, minlength=k)
+
+    def per_game(values):
+        return np.bincount(game_map, weights=values, minlength=k)
+
+    best_map = np.zeros(k, dtype=np.int64)
+    np.maximum.at(best_map, game_map, best)
+    known = duration > 0
+    planted = bomb != 0
+    cols = [
+        per_game(np.ones(n_games)), per_round(np.ones(len(won))), per_round(won),
+        per_round(pistol), per_round(pistol & won), best_map,
+        per_game(trailed), per_game(comeback),
+        per_round(attack), per_round(attack & planted),
+        per_round(~attack & planted), per_round(~attack & (bomb == BOMB_DEFUSED)),
+        per_round(np.where(known, duration, 0)), per_round(known),
+    ]
+    table = np.vstack(cols).T
+    total = table.sum(axis=0)
+    total[5] = best_map.max()
+
+    names = dict(cursor.execute(
+        f"SELECT id, name FROM Maps WHERE id IN ({','.join('?' * k)})", [int(m) for m in map_ids]).fetchall())
+    out = []
+    for label, row in [(names.get(int(m), '?'), table[i]) for i, m in enumerate(map_ids)] + [('Total', total)]:
+        ints = [int(v) for v in row[:12]]
+        avg = float(row[12] / row[13]) if row[13] else 0.0
+        out.append((label, *ints, avg))
+    return out
+
+
+def rate(part, whole):
+    """Pourcentage (0 si rien)."""
+    return (part / whole * 100) if whole else 0
@@ -0,0 +1,141 @@
+# screens.py
+# -----------------------------------------------------------------------------
+# Rôle : navigation sans tout détruire / reconstruire
+#        - ScreenManager garde les derniers écrans visités (accueil, fiche d’équipe,
+#          fiche joueur, analyse) cachés en mémoire, avec une limite LRU
+#        - « Retour » = on ré-affiche l’écran gardé (pack), pas de requête ni d’image
+#        - chaque écran est fait de « parties » qui déclarent de quelles données
+#          elles dépendent ('teams', 'players', 'maps', 'matches', 'owners',
+#          'window' = fenêtre de temps des stats, 'events' = positions des heatmaps)
+#        - après une écriture, main.py appelle bump(domaines) : au retour sur un
+#          écran, seules les parties dont un domaine a changé sont reconstruites
+#          (refresh() : tout de suite, pour l’écran affiché)
+#
+# Exemple :
+#   def build(scr):
+#       scr.part(scr.frame, ('teams', 'matches'), construire_entete, fill='x')
+#   screens.show(('team', tid), build)
+# Une partie ne crée pas d’autres parties (elle est reconstruite en bloc).
+# -----------------------------------------------------------------------------
+
+import tkinter as tk
+from collections import Counter, OrderedDict
+
+# Nombre d’écrans gardés en mémoire (l’écran affiché compris)
+DEFAULT_LIMIT = 6
+
+
+class Screen:
+    """Un écran gardé par le ScreenManager : son Frame et ses parties."""
+
+    def __init__(self, manager, key, frame):
+        self.manager = manager
+        self.key = key
+        self.frame = frame
+        self._parts = []   # [holder, deps, build, générations au moment du build]
+
+    def part(self, parent, deps, build, **pack):
+        """
+        Crée un conteneur dans `parent` (packé avec `pack`), y appelle build(conteneur)
+        et le retient : il sera reconstruit si un des domaines `deps` change.
+        """
+        holder = tk.Frame(parent, bg=parent.cget('bg'))
+        holder.pack(**pack)
+        build(holder)
+        self._parts.append([holder, tuple(deps), build, self.manager.snapshot(deps)])
+        return holder
+
+    def refresh(self):
+        """Reconstruit les parties dont les données ont changé. Retourne combien."""
+        rebuilt = 0
+        for entry in self._parts:
+            holder, deps, build, seen = entry
+            now = self.manager.snapshot(deps)
+            if now != seen:
+                for w in holder.winfo_children():
+                    w.destroy()
+                build(holder)
+                entry[3] = now
+                rebuilt += 1
+        return rebuilt
+
+
+class ScreenManager:
+    """Écrans gardés en mémoire (LRU) + compteurs de génération par domaine de données."""
+
+    def __init__(self, root, limit=DEFAULT_LIMIT, bg=None):
+        self.root = root
+        self.limit = limit
+        self.bg = bg
+        self.current = None
+        self.generations = Counter()
+        self._screens = OrderedDict()   # clé → Screen (le plus récent à la fin)
+
+    # ------------------------------------------------------------
+    # Données
+    # ------------------------------------------------------------
+    def bump(self, *domains):
+        """Signale que les données de ces domaines ont changé (après un commit)."""
+        for d in domains:
+            self.generations[d] += 1
+
+    def snapshot(self, deps):
+        return tuple(self.generations[d] for d in deps)
+
+    # ------------------------------------------------------------
+    # Navigation
+    # ------------------------------------------------------------
+    def show(self, key, build, keep=()):
+        """
+        Affiche l’écran `key` : celui gardé (rafraîchi au besoin) ou un nouveau,
+        construit par build(screen). Les autres widgets posés directement sur root
+        (écran de connexion, etc.) sont détruits, sauf ceux de `keep` (overlay).
+        """
+        managed = {s.frame for s in self._screens.values()}
+        keep = [w for w in keep if w is not None and w.winfo_exists()]  # overlay déjà fermé : ignoré
+        for w in self.root.winfo_children():
+            if w not in managed and w not in keep:
+                w.destroy()
+        if self.current is not None and self.current.key != key:
+            self.current.frame.pack_forget()
+
+        screen = self._screens.pop(key, None)
+        if screen is None:
+            screen = Screen(self, key, tk.Frame(self.root, bg=self.bg))
+            self._screens[key] = screen
+            self.current = screen
+            build(screen)
+        else:
+            self._screens[key] = screen
+            self.current = screen
+            screen.refresh()
+        screen.frame.pack(fill='both', expand=True)
+        for w in keep:
+            w.lift()
+        self._evict()
+        return screen
+
+    def _evict(self):
+        while len(self._screens) > self.limit:
+            key = next(iter(self._screens))
+            self.drop(key)
+
+    def refresh(self):
+        """Rafraîchit l’écran affiché (ses parties périmées). Retourne combien."""
+        if self.current is None:
+            return 0
+        return self.current.refresh()
+
+    def drop(self, key):
+        """Oublie (et détruit) l’écran `key` s’il est gardé."""
+        screen = self._screens.pop(key, None)
+        if screen is None:
+            return
+        if screen is self.current:
+            self.current = None
+        screen.frame.destroy()
+
+    def clear(self):
+        """Oublie tous les écrans (changement de BD, de rôle…)."""
+        for key in list(self._screens):
+            self.drop(key)
@@ -0,0 +1,154 @@
+# search.py
+# -----------------------------------------------------------------------------
+# Rôle : recherche par nom (équipes, joueurs, maps) pendant la frappe
+#        - SearchIndex : table FTS5, une ligne par équipe / joueur / map, tenue à
+#          jour par triggers sur Teams, Players et Maps (rien à faire dans main.py)
+#        - rowid = id * 4 + type → suppression / renommage = une ligne par rowid,
+#          sans parcourir l’index
+#        - recherche par préfixe de mots (« faz si » trouve « faze  simp »),
+#          accents ignorés ; index de préfixes 1-3 lettres → rapide dès la 1re lettre
+#
+# Si le SQLite de Python n’a pas FTS5 (rare), la migration saute l’index et
+# search() retombe sur un LIKE '%…%' (sous-chaîne, plus lent sur une grosse
+# ligue). `python -m cli rebuild-search` recrée l’index plus tard.
+# -----------------------------------------------------------------------------
+
+import re
+import sqlite3
+
+KINDS = {'team': 1, 'player': 2, 'map': 3}
+_TABLES = {'team': 'Teams', 'player': 'Players', 'map': 'Maps'}
+
+# Résultats montrés sous une boîte de recherche
+DEFAULT_LIMIT = 12
+
+# Candidats lus dans l’index (par résultat montré) avant le tri en Python
+CANDIDATES = 8
+
+CREATE_SQL = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS SearchIndex USING fts5(
+    name, kind, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3');
+'''
+
+
+def _triggers():
+    """Un trigger insert / rename / delete par table source."""
+    sql = []
+    for kind, table in _TABLES.items():
+        code = KINDS[kind]
+        sql.append(f'''
+        CREATE TRIGGER IF NOT EXISTS search_{kind}_ins AFTER INSERT ON {table} BEGIN
+            INSERT INTO SearchIndex(rowid, name, kind) VALUES (new.id * 4 + {code}, new.name, '{kind}');
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_{kind}_upd AFTER UPDATE OF name ON {table} BEGIN
+            UPDATE SearchIndex SET name = new.name WHERE rowid = old.id * 4 + {code};
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_{kind}_del AFTER DELETE ON {table} BEGIN
+            DELETE FROM SearchIndex WHERE rowid = old.id * 4 + {code};
+        END;''')
+    return ''.join(sql)
+
+
+# ----------------------------------------------------------------
+# create(cursor) / rebuild(conn)
+# ----------------------------------------------------------------
+def create(cursor):
+    """Crée l’index et ses triggers puis le remplit. Retourne False si FTS5 manque (rien de créé)."""
+    try:
+        cursor.execute(CREATE_SQL)
+    except sqlite3.OperationalError:
+        return False
+    for stmt in _triggers().split('END;'):
+        if stmt.strip():
+            cursor.execute(stmt + 'END;')
+    cursor.execute('DELETE FROM SearchIndex')
+    for kind, table in _TABLES.items():
+        cursor.execute(f"INSERT INTO SearchIndex(rowid, name, kind) SELECT id * 4 + ?, name, ? FROM {table}",
+                       (KINDS[kind], kind))
+    return True
+
+
+def rebuild(conn):
+    """create() dans sa propre transaction (BD migrée sans FTS5, index à refaire)."""
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        conn.commit()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        ok = create(cursor)
+        if ok:
+            cursor.execute("INSERT INTO SearchIndex(SearchIndex) VALUES ('optimize')")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return ok
+
+
+def available(cursor):
+    return cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'SearchIndex'").fetchone() is not None
+
+
+# ----------------------------------------------------------------
+# search(cursor, text, kinds, limit)
+# ----------------------------------------------------------------
+# Chaque mot tapé devient un préfixe ("faz"*), tous obligatoires, sur la
+# colonne name ; le type filtre sur la colonne kind. Pas de ORDER BY rank :
+# avec « sha » sur 50 000 joueurs, bm25 note des milliers de lignes (≈ 10 ms).
+# On lit au plus limit × CANDIDATES lignes (l’index s’arrête là) et on trie
+# en Python : nom qui commence par la frappe, équipes d’abord, noms courts.
+def match_expr(text, kinds=None):
+    """Requête FTS5 pour `text` (None si rien de cherchable)."""
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return None
+    expr = 'name : (' + ' '.join(f'"{w}"*' for w in words) + ')'
+    if kinds:
+        expr += ' AND kind : (' + ' OR '.join(kinds) + ')'
+    return expr
+
+
+def search(cursor, text, kinds=tuple(KINDS), limit=DEFAULT_LIMIT):
+    """
+    [(type, id, nom, équipe), ...] pour `text` ; équipe = nom de l’équipe d’un
+    joueur (None pour une équipe / une map).
+    """
+    expr = match_expr(text, kinds)
+    if expr is None:
+        return []
+    if not available(cursor):
+        return _search_like(cursor, text.strip(), kinds, limit)
+    rows = cursor.execute('SELECT rowid, name FROM SearchIndex WHERE SearchIndex MATCH ? LIMIT ?',
+                          (expr, limit * CANDIDATES)).fetchall()
+    typed = text.strip().lower()
+    rows.sort(key=lambda r: (not r[1].lower().startswith(typed), r[0] % 4 != KINDS['team'], len(r[1]), r[1].lower()))
+    del rows[limit:]
+    names = {v: k for k, v in KINDS.items()}
+    found = [(names[rowid % 4], rowid // 4, name) for rowid, name in rows]
+    return _with_teams(cursor, found)
+
+
+def _search_like(cursor, text, kinds, limit):
+    parts = [f"SELECT '{kind}', id, name FROM {_TABLES[kind]} WHERE name LIKE ?" for kind in kinds]
+    pattern = '%' + text.replace('%', '').replace('_', '') + '%'
+    rows = cursor.execute(' UNION ALL '.join(parts) + ' ORDER BY 3 COLLATE NOCASE LIMIT ?',
+                          (pattern,) * len(parts) + (limit,)).fetchall()
+    return _with_teams(cursor, rows)
+
+
+def _with_teams(cursor, found):
+    players = [item_id for kind, item_id, _name in found if kind == 'player']
+    teams = {}
+    if players:
+        teams = dict(cursor.execute(f'''
+            SELECT p.id, t.name FROM Players p JOIN Teams t ON t.id = p.team_id
+            WHERE p.id IN ({','.join('?' * len(players))})''', players).fetchall())
+    return [(kind, item_id, name, teams.get(item_id) if kind == 'player' else None)
+            for kind, item_id, name in found]
+
+
+def lookup(cursor, kind, name):
+    """Id de l’équipe / la map nommée exactement `name` (sans tenir compte de la casse), ou None."""
+    row = cursor.execute(f'SELECT id FROM {_TABLES[kind]} WHERE name = ? COLLATE NOCASE ORDER BY id LIMIT 1',
+                         (name.strip(),)).fetchone()
+    return row[0] if row else None
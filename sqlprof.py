@@ -0,0 +1,347 @@
+# sqlprof.py
+# -----------------------------------------------------------------------------
+# Rôle : profiler les requêtes SQL (outil de dev, éteint par défaut)
+#        - ProfilingConnection / ProfilingCursor : remplacent sqlite3.Connection
+#          et sqlite3.Cursor dans db.open_db / open_readonly → tout le SQL de
+#          main.py, stats.py, exports… passe par là sans rien changer ailleurs
+#        - par requête : endroit de l’appel (fichier:ligne, et l’appelant),
+#          empreinte du SQL (littéraux et listes IN (?, ?, …) réduits), durée
+#          (execute + lecture des lignes), nombre de lignes
+#        - au-delà de slow_ms : une ligne JSON dans un journal tournant, avec
+#          EXPLAIN QUERY PLAN (une fois par empreinte)
+#        - résumé à la sortie (atexit) : requêtes par temps total, et les
+#          « rafales » (même requête, même endroit, appels rapprochés) = N+1 probables
+#
+# Éteint : sqlite3.Connection d’origine, et db.py n’importe même pas ce module
+# (ni logging). Allumer dans statteam.ini :
+#   [sqlprof]
+#   enabled = yes
+#   slow_ms = 20          ; seuil du journal des requêtes lentes
+#   explain = yes         ; EXPLAIN QUERY PLAN des requêtes lentes
+#   log = sqlprof.log     ; à côté de l’app si le chemin est relatif
+#   max_kb = 1024         ; taille d’un fichier du journal, puis rotation
+#   backups = 3
+# ou le temps d’un lancement : STATTEAM_SQLPROF=1 (CLI : --profile-sql).
+# -----------------------------------------------------------------------------
+
+import atexit
+import configparser
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULTS = {'enabled': False, 'slow_ms': 20.0, 'explain': True, 'log': 'sqlprof.log', 'max_kb': 1024, 'backups': 3}
+
+# Rafale : appels d’une même requête au même endroit à moins de BURST_GAP_S
+# l’un de l’autre ; à partir de N_PLUS_ONE appels, c’est une boucle qui requête.
+BURST_GAP_S = 0.05
+N_PLUS_ONE = 5
+
+_HERE = os.path.normcase(os.path.abspath(__file__))
+_profiler = None
+_lock = threading.Lock()
+
+
+def load_settings(config_file):
+    """Réglages de [sqlprof] (valeurs invalides ignorées) ; STATTEAM_SQLPROF=1 force enabled."""
+    parser = configparser.ConfigParser()
+    parser.read(config_file, encoding='utf-8')
+    settings = dict(DEFAULTS)
+    getters = {bool: parser.getboolean, float: parser.getfloat, int: parser.getint, str: parser.get}
+    for key, default in DEFAULTS.items():
+        try:
+            settings[key] = getters[type(default)]('sqlprof', key, fallback=default)
+        except ValueError:
+            pass
+    if os.environ.get('STATTEAM_SQLPROF', '').strip() not in ('', '0'):
+        settings['enabled'] = True
+    if not os.path.isabs(settings['log']):
+        settings['log'] = os.path.join(os.path.dirname(os.path.abspath(config_file)), settings['log'])
+    return settings
+
+
+# ----------------------------------------------------------------
+# fingerprint(sql) / call_site()
+# ----------------------------------------------------------------
+_SPACES = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+def fingerprint(sql):
+    """SQL sur une ligne, littéraux → ?, IN (?, ?, …) → (?…) : une empreinte par « forme » de requête."""
+    sql = _LITERALS.sub('?', _SPACES.sub(' ', sql).strip())
+    return _IN_LIST.sub('(?…)', sql)
+
+
+def call_site(depth=2):
+    """« stats.py:95 player_map_totals ← main.py:1372 build_header » : les `depth` premiers appelants hors d’ici."""
+    frame = sys._getframe(1)
+    parts = []
+    while frame is not None and len(parts) < depth:
+        code = frame.f_code
+        if os.path.normcase(code.co_filename) != _HERE:
+            parts.append(f'{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}')
+        frame = frame.f_back
+    return ' ← '.join(parts)
+
+
+# ----------------------------------------------------------------
+# Profiler
+# ----------------------------------------------------------------
+class Profiler:
+    """Totaux par empreinte + journal des requêtes lentes. Utilisable depuis plusieurs threads."""
+
+    def __init__(self, slow_ms=DEFAULTS['slow_ms'], explain=True, log_path=None,
+                 max_kb=DEFAULTS['max_kb'], backups=DEFAULTS['backups']):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._stats = {}     # empreinte → [appels, total ms, max ms, lignes, Counter(endroits)]
+        self._bursts = {}    # (empreinte, endroit) → [dernier appel, rafale en cours, plus longue rafale]
+        self._plans = {}     # empreinte → lignes du plan (EXPLAIN QUERY PLAN)
+        self._dirty = False
+        self.log = logging.getLogger(f'statteam.sqlprof.{id(self)}')
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        if log_path:
+            from logging.handlers import RotatingFileHandler   # seulement avec un journal
+            handler = RotatingFileHandler(log_path, maxBytes=max_kb * 1024, backupCount=backups,
+                                          encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.log.addHandler(handler)
+        else:
+            self.log.addHandler(logging.NullHandler())   # sinon logging écrit les lentes sur stderr
+
+    def record(self, conn, sql, params, ms, rows, site):
+        fp = fingerprint(sql)
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._stats.get(fp)
+            if entry is None:
+                entry = self._stats[fp] = [0, 0.0, 0.0, 0, Counter()]
+            entry[0] += 1
+            entry[1] += ms
+            entry[2] = max(entry[2], ms)
+            entry[3] += rows
+            entry[4][site] += 1
+            burst = self._bursts.setdefault((fp, site), [0.0, 0, 0])
+            burst[1] = burst[1] + 1 if now - burst[0] < BURST_GAP_S else 1
+            burst[0] = now
+            burst[2] = max(burst[2], burst[1])
+            self._dirty = True
+            need_plan = ms >= self.slow_ms and self.explain and fp not in self._plans
+        if ms < self.slow_ms:
+            return
+        if need_plan:
+            self._plans[fp] = explain(conn, sql, params)
+        self.log.warning(json.dumps({
+            'ts': time.strftime('%Y-%m-%d %H:%M:%S'), 'ms': round(ms, 2), 'rows': rows, 'site': site,
+            'sql': fp, 'plan': self._plans.get(fp),
+        }, ensure_ascii=False))
+
+    def top(self, n=25):
+        """[(empreinte, appels, total ms, max ms, lignes, endroits), ...] par temps total décroissant."""
+        with self._lock:
+            items = [(fp, e[0], e[1], e[2], e[3], e[4].most_common()) for fp, e in self._stats.items()]
+        items.sort(key=lambda r: -r[2])
+        return items[:n]
+
+    def n_plus_one(self, min_calls=N_PLUS_ONE):
+        """[(endroit, empreinte, plus longue rafale), ...] : requêtes lancées en boucle."""
+        with self._lock:
+            found = [(site, fp, b[2]) for (fp, site), b in self._bursts.items() if b[2] >= min_calls]
+        return sorted(found, key=lambda r: -r[2])
+
+    def summary(self, n=25):
+        """Résumé texte (tableau des requêtes + N+1 probables)."""
+        lines = [f"{'total ms':>9} {'appels':>7} {'moy ms':>8} {'max ms':>8} {'lignes':>8}  requête"]
+        for fp, calls, total, worst, rows, sites in self.top(n):
+            lines.append(f'{total:>9.1f} {calls:>7} {total / calls:>8.2f} {worst:>8.2f} {rows:>8}  {fp[:110]}')
+            for site, count in sites[:2]:
+                lines.append(f"{'':>44}↳ {site} ({count})")
+        loops = self.n_plus_one()
+        if loops:
+            lines.append(f'N+1 probables (≥ {N_PLUS_ONE} appels à moins de {BURST_GAP_S * 1000:.0f} ms) :')
+            for site, fp, burst in loops:
+                lines.append(f'  {burst:>5}×  {site}  {fp[:90]}')
+        return '\n'.join(lines)
+
+    def dump(self, stream=None):
+        """Résumé dans le journal (et sur `stream` si donné). Rien si rien de neuf depuis le dernier."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        text = self.summary()
+        self.log.info(f"== résumé {time.strftime('%Y-%m-%d %H:%M:%S')} ==\n{text}")
+        if stream is not None:
+            print(text, file=stream)
+
+
+def explain(conn, sql, params=()):
+    """Lignes d’EXPLAIN QUERY PLAN (indentées) pour un SELECT / WITH, sinon None."""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    try:
+        rows = sqlite3.Cursor(conn).execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    except sqlite3.Error:
+        return None
+    depth = {0: -1}
+    plan = []
+    for node, parent, _unused, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        plan.append('  ' * depth[node] + detail)
+    return plan
+
+
+# ----------------------------------------------------------------
+# ProfilingCursor / ProfilingConnection
+# ----------------------------------------------------------------
+# sqlite3 lit les lignes au fur et à mesure : la durée d’un SELECT = execute
+# + tous les fetch / l’itération. La requête est comptée quand ses lignes
+# sont épuisées, ou au prochain execute / close / ramassage du même curseur.
+class ProfilingCursor(sqlite3.Cursor):
+    _pending = None    # [sql, params, ms, lignes, endroit]
+
+    def execute(self, sql, params=()):
+        self._finish()
+        site = call_site()
+        t0 = time.perf_counter()
+        try:
+            super().execute(sql, params)
+        finally:
+            self._pending = [sql, params, (time.perf_counter() - t0) * 1000, 0, site]
+        if self.description is None:   # pas un SELECT : rien à lire
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq):
+        self._finish()
+        site = call_site()
+        t0 = time.perf_counter()
+        try:
+            super().executemany(sql, seq)
+        finally:
+            _profiler.record(self.connection, sql, (), (time.perf_counter() - t0) * 1000, max(self.rowcount, 0), site)
+        return self
+
+    def executescript(self, script):
+        self._finish()
+        site = call_site()
+        t0 = time.perf_counter()
+        try:
+            super().executescript(script)
+        finally:
+            _profiler.record(self.connection, script, (), (time.perf_counter() - t0) * 1000, 0, site)
+        return self
+
+    def _timed_fetch(self, fetch, *args):
+        t0 = time.perf_counter()
+        result = fetch(*args)
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - t0) * 1000
+        return result
+
+    def fetchone(self):
+        row = self._timed_fetch(super().fetchone)
+        self._count(1 if row is not None else 0, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed_fetch(super().fetchmany, size)
+        self._count(len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(super().fetchall)
+        self._count(len(rows), True)
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed_fetch(super().__next__)
+        except StopIteration:
+            self._count(0, True)
+            raise
+        self._count(1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() : curseur jeté sans avoir tout lu
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _count(self, rows, done):
+        if self._pending is not None:
+            self._pending[3] += rows
+            if done:
+                self._finish()
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, ms, rows, site = pending
+            _profiler.record(self.connection, sql, params, ms, rows, site)
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connexion dont les curseurs (et conn.execute) sont des ProfilingCursor."""
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    # conn.execute de sqlite3 ne passe pas par cursor() : on le refait ici
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+# ----------------------------------------------------------------
+# enable(settings) / connection_factory(config_file) / profiler()
+# ----------------------------------------------------------------
+def enable(settings=None):
+    """
+    Allume le profilage pour les connexions ouvertes ensuite (résumé au journal
+    à la sortie). settings : dict de load_settings (défaut : DEFAULTS, sans journal).
+    """
+    global _profiler
+    settings = settings or dict(DEFAULTS, log=None)
+    with _lock:
+        if _profiler is None:
+            _profiler = Profiler(settings['slow_ms'], settings['explain'], settings['log'],
+                                 settings['max_kb'], settings['backups'])
+            atexit.register(_profiler.dump)
+    return _profiler
+
+
+def connection_factory(config_file):
+    """ProfilingConnection si le profilage est allumé (statteam.ini / STATTEAM_SQLPROF), sinon sqlite3.Connection."""
+    if _profiler is None:
+        settings = load_settings(config_file)
+        if not settings['enabled']:
+            return sqlite3.Connection
+        enable(settings)
+    return ProfilingConnection
+
+
+def profiler():
+    """Le Profiler actif, ou None."""
+    return _profiler
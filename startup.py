@@ -0,0 +1,82 @@
+# startup.py
+# -----------------------------------------------------------------------------
+# Rôle : chronométrer le démarrage de l’app (jusqu’au 1er affichage de show_login)
+#        - mark(nom) : fin d’une phase (imports, BD, fenêtre Tk, styles, …)
+#        - finish(root, log_path, app) : attend le 1er affichage, puis ajoute une
+#          ligne JSON au journal (une ligne par lancement)
+# Importé EN PREMIER par main.py : le chrono part à l’import de ce module.
+# Aucune dépendance (stdlib seulement) pour ne rien fausser.
+#
+# Variables d’environnement (surtout pour bench.py) :
+#   STATTEAM_STARTUP_LOG  : chemin du journal (sinon celui passé à finish)
+#   STATTEAM_STARTUP_EXIT : « 1 » = fermer l’app dès le 1er affichage
+#   STATTEAM_STARTUP_HOOK : « module:fonction » appelée avec le module de l’app
+#                           après le 1er affichage (ex. bench:screens_tour)
+# -----------------------------------------------------------------------------
+
+import importlib
+import json
+import os
+import sys
+import time
+
+_T0 = time.perf_counter()
+_last = _T0
+_phases = []
+
+# On garde les N derniers lancements dans le journal (il ne grossit pas à l’infini)
+MAX_LOG_LINES = 200
+
+
+def mark(name):
+    """Termine la phase `name` (durée depuis la marque précédente)."""
+    global _last
+    now = time.perf_counter()
+    _phases.append((name, (now - _last) * 1000))
+    _last = now
+
+
+def elapsed_ms():
+    """Temps écoulé depuis le début du démarrage, en ms."""
+    return (time.perf_counter() - _T0) * 1000
+
+
+def _write(log_path):
+    entry = {
+        'ts': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'frozen': bool(getattr(sys, 'frozen', False)),
+        'total_ms': round(elapsed_ms(), 1),
+        'phases': {name: round(ms, 1) for name, ms in _phases},
+    }
+    lines = []
+    if os.path.exists(log_path):
+        with open(log_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    lines = lines[-(MAX_LOG_LINES - 1):] + [json.dumps(entry, ensure_ascii=False)]
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def finish(root, log_path, app=None):
+    """
+    À appeler juste avant root.mainloop() : quand Tk a vraiment dessiné
+    le 1er écran, on marque « premier affichage » et on écrit le journal.
+    `app` (le module main) est passé au crochet STATTEAM_STARTUP_HOOK.
+    """
+    log_path = os.environ.get('STATTEAM_STARTUP_LOG') or log_path
+
+    def _first_frame():
+        root.update_idletasks()
+        mark('premier affichage')
+        try:
+            _write(log_path)
+        except OSError:
+            # Dossier en lecture seule, etc. : pas grave, l’app démarre pareil.
+            pass
+        if os.environ.get('STATTEAM_STARTUP_EXIT') == '1':
+            root.destroy()
+        elif os.environ.get('STATTEAM_STARTUP_HOOK'):
+            module, _, func = os.environ['STATTEAM_STARTUP_HOOK'].partition(':')
+            getattr(importlib.import_module(module), func)(app)
+
+    root.after_idle(_first_frame)
@@ -0,0 +1,309 @@
+# stats.py
+# -----------------------------------------------------------------------------
+# Rôle : les requêtes de statistiques (lecture seulement)
+#        - petits calculs communs (kd_ratio, win_rate)
+#        - fiches joueurs (player_map_totals)
+#        - roster d’équipe / tous les joueurs avec leurs totaux (roster_stats)
+#        - K/D par joueur pour l’écran d’analyse (players_kd)
+#        - leaderboard (cote ELO ou victoires), win-rate des équipes (global et par map)
+#        - face-à-face entre deux équipes, games par map (table Games)
+#        - fenêtres de temps (« 30 jours », « ce split ») : paramètre `since`
+# Chaque fonction reçoit un curseur SQLite : pas de global, pas de Tkinter.
+# main.py (et tout autre script) passe son propre curseur.
+# -----------------------------------------------------------------------------
+
+import configparser
+import datetime
+
+import db
+
+
+# ----------------------------------------------------------------
+# kd_ratio / win_rate
+# ----------------------------------------------------------------
+# Mêmes règles que partout dans l’app :
+# - K/D sans death → on affiche les kills (0 si rien).
+# - Win-rate en %, 0 si aucun round joué.
+def kd_ratio(kills, deaths):
+    """K/D ; sans death, on retombe sur le nombre de kills."""
+    return (kills / deaths) if deaths else (kills if kills else 0)
+
+
+def win_rate(won, lost):
+    """Pourcentage de rounds gagnés (0 si aucun round)."""
+    total = won + lost
+    return (won / total * 100) if total else 0
+
+
+# ----------------------------------------------------------------
+# Fenêtres de temps
+# ----------------------------------------------------------------
+# `since` (partout dans ce module) : None = tout l’historique, sinon le lundi
+# d’une semaine ('AAAA-MM-JJ', voir week_of). Les totaux sont rangés par
+# semaine (PlayerWeekTotals / TeamWeekTotals, db.py) : une fenêtre commence
+# donc toujours un lundi, « 30 jours » = depuis le lundi de la semaine d’il y
+# a 30 jours. Les matchs sans date ne comptent que dans « Tout ».
+#
+# Split (saison) optionnel dans statteam.ini :
+#   [stats]
+#   split_start = 2025-09-01
+WINDOWS = (('Tout', None), ('7 jours', 7), ('30 jours', 30), ('90 jours', 90))
+
+
+def week_of(day):
+    """Lundi de la semaine de `day` (date ou 'AAAA-MM-JJ…') en 'AAAA-MM-JJ'."""
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day[:10])
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()
+
+
+def since_days(days, today=None):
+    """`since` pour « les `days` derniers jours » (None → tout)."""
+    if days is None:
+        return None
+    today = today or datetime.date.today()
+    return week_of(today - datetime.timedelta(days=days))
+
+
+def load_windows(config_file=None, today=None):
+    """[(libellé, since), ...] : WINDOWS, plus « Split » si [stats] split_start est valide."""
+    windows = [(label, since_days(days, today)) for label, days in WINDOWS]
+    parser = configparser.ConfigParser()
+    parser.read(config_file or db.CONFIG_FILE, encoding='utf-8')
+    split = parser.get('stats', 'split_start', fallback='').strip()
+    if split:
+        try:
+            windows.append(('Split', week_of(split)))
+        except ValueError:
+            pass
+    return windows
+
+
+# ----------------------------------------------------------------
+# player_map_totals(cursor, pid, since=None)
+# ----------------------------------------------------------------
+# Une ligne par map (même celles jamais jouées, à 0), lue dans
+# PlayerMapTotals (tenue à jour par triggers, voir db.py) ; avec une
+# fenêtre, somme des semaines du joueur (une plage de PlayerWeekTotals).
+def player_map_totals(cursor, pid, since=None):
+    """
+    Retourne [(map_id, map_name, map_image, games, kills, deaths, bombs,
+    rounds_won, rounds_lost), ...] pour le joueur `pid`, une ligne par map.
+    """
+    if since is None:
+        source, params = 'PlayerMapTotals t ON t.player_id = ? AND t.map_id = mp.id', (pid,)
+    else:
+        source, params = '''(SELECT map_id, SUM(games) AS games, SUM(kills) AS kills, SUM(deaths) AS deaths,
+                                    SUM(bombs) AS bombs, SUM(rounds_won) AS rounds_won,
+                                    SUM(rounds_lost) AS rounds_lost
+                             FROM PlayerWeekTotals WHERE player_id = ? AND week >= ?
+                             GROUP BY map_id) t ON t.map_id = mp.id''', (pid, since)
+    cursor.execute(f'''
+        SELECT mp.id, mp.name, mp.image,
+               COALESCE(t.games, 0), COALESCE(t.kills, 0), COALESCE(t.deaths, 0),
+               COALESCE(t.bombs, 0), COALESCE(t.rounds_won, 0), COALESCE(t.rounds_lost, 0)
+        FROM Maps mp
+        LEFT JOIN {source}
+        ORDER BY mp.id
+    ''', params)
+    return cursor.fetchall()
+
+
+# ----------------------------------------------------------------
+# roster_sql(team_id=None, since=None) / roster_stats(cursor, ...)
+# ----------------------------------------------------------------
+# Le roster avec ses totaux en UNE requête groupée (au lieu d’une requête
+# d’agrégat par joueur). On somme PlayerMapTotals (ou PlayerWeekTotals avec
+# une fenêtre) : quelques lignes par joueur, jamais un scan de PlayerStats.
+# Une seule définition (roster_sql) pour la fiche d’équipe, le graphique K/D
+# de l’analyse et l’export « Meilleurs joueurs » (exports.py la trie en SQL ;
+# team_id=None → tous les joueurs de la ligue).
+def roster_sql(team_id=None, since=None):
+    """
+    (sql, params) de l’agrégat du roster, sans ORDER BY. Colonnes : id, name, logo,
+    games, kills, deaths, bombs, rounds_won, rounds_lost.
+    """
+    if since is None:
+        source, params = 'PlayerMapTotals t ON t.player_id = p.id', ()
+    else:
+        source, params = 'PlayerWeekTotals t ON t.player_id = p.id AND t.week >= ?', (since,)
+    where = ''
+    if team_id is not None:
+        where, params = 'WHERE p.team_id = ?', params + (team_id,)
+    return f'''
+        SELECT p.id AS id, p.name AS name, p.logo AS logo,
+               COALESCE(SUM(t.games), 0) AS games, COALESCE(SUM(t.kills), 0) AS kills,
+               COALESCE(SUM(t.deaths), 0) AS deaths, COALESCE(SUM(t.bombs), 0) AS bombs,
+               COALESCE(SUM(t.rounds_won), 0) AS rounds_won, COALESCE(SUM(t.rounds_lost), 0) AS rounds_lost
+        FROM Players p
+        LEFT JOIN {source}
+        {where}
+        GROUP BY p.id
+    ''', params
+
+
+def roster_stats(cursor, team_id=None, since=None):
+    """
+    Retourne [(player_id, name, logo, games, kills, deaths, bombs,
+    rounds_won, rounds_lost), ...] pour l’équipe `team_id`
+    (ou pour tous les joueurs si team_id est None), triés par id.
+    """
+    sql, params = roster_sql(team_id, since)
+    cursor.execute(sql + ' ORDER BY p.id', params)
+    return cursor.fetchall()
+
+
+# ----------------------------------------------------------------
+# players_kd(cursor, team_id, since=None)
+# ----------------------------------------------------------------
+# Données du graphique « Ratios K/D des joueurs » (analyse d’équipe).
+# L’ancienne requête faisait Players × Matches de l’équipe avant de grouper
+# (quadratique). Ici : roster_stats, donc linéaire en taille du roster.
+# Note : les lignes PlayerStats d’un joueur sont toujours enregistrées sur un
+# match de SON équipe (voir add_match_dual_overlay), donc pas besoin de
+# refiltrer par Matches.team_id.
+def players_kd(cursor, team_id, since=None):
+    """Retourne [(player_name, kd), ...] pour le roster de `team_id`, triés par id."""
+    return [(name, kd_ratio(k, d))
+            for _pid, name, _logo, _games, k, d, _b, _rw, _rl in roster_stats(cursor, team_id, since)]
+
+
+# ----------------------------------------------------------------
+# leaderboard(cursor, order='wins', since=None)
+# ----------------------------------------------------------------
+# Classement de l’accueil :
+# - 'wins'   : (défaut) nombre de matchs gagnés (rounds_won > rounds_lost), somme
+#   des semaines de TeamWeekTotals (toutes, ou depuis `since`)
+# - 'rating' : cote ELO (ratings.py), au choix, lue dans Teams via idx_teams_rating,
+#   aucun scan de Matches. C’est la cote ACTUELLE : `since` ne s’applique pas.
+LEADERBOARD_ORDERS = ('wins', 'rating')
+
+
+def leaderboard(cursor, order='wins', since=None):
+    """Retourne [(team_id, name, logo, valeur), ...] : victoires (défaut) ou cote ELO, du meilleur au pire."""
+    if order == 'rating':
+        cursor.execute('SELECT id, name, logo, rating FROM Teams ORDER BY rating DESC, id')
+        return cursor.fetchall()
+    if order != 'wins':
+        raise ValueError(f'Ordre de classement inconnu : {order}')
+    cursor.execute('''
+        SELECT t.id, t.name, t.logo, COALESCE(SUM(w.wins), 0) AS wins
+        FROM Teams t
+        LEFT JOIN TeamWeekTotals w ON w.team_id = t.id AND w.week >= ?
+        GROUP BY t.id
+        ORDER BY wins DESC, t.name COLLATE NOCASE ASC
+    ''', (since or '',))
+    return cursor.fetchall()
+
+
+# ----------------------------------------------------------------
+# team_winrates / team_map_totals / team_winrate_by_map
+# ----------------------------------------------------------------
+# Win-rate en rounds : global par équipe (CLI) et par map pour une équipe
+# (fiche d’équipe, graphique de l’analyse). Somme des semaines de
+# TeamWeekTotals ; sans `since`, toutes les semaines (même celle des matchs sans date).
+def team_winrates(cursor, since=None):
+    """Retourne [(team_id, name, rounds_won, rounds_lost), ...] trié par nom."""
+    cursor.execute('''
+        SELECT t.id, t.name, COALESCE(SUM(w.rounds_won), 0), COALESCE(SUM(w.rounds_lost), 0)
+        FROM Teams t
+        LEFT JOIN TeamWeekTotals w ON w.team_id = t.id AND w.week >= ?
+        GROUP BY t.id
+        ORDER BY t.name COLLATE NOCASE
+    ''', (since or '',))
+    return cursor.fetchall()
+
+
+def team_map_totals(cursor, team_id, since=None):
+    """Retourne [(map_id, map_name, map_image, games, rounds_won, rounds_lost), ...] pour `team_id`, une ligne par map."""
+    cursor.execute('''
+        SELECT mp.id, mp.name, mp.image,
+               COALESCE(w.games, 0), COALESCE(w.rounds_won, 0), COALESCE(w.rounds_lost, 0)
+        FROM Maps mp
+        LEFT JOIN (SELECT map_id, SUM(games) AS games, SUM(rounds_won) AS rounds_won,
+                          SUM(rounds_lost) AS rounds_lost
+                   FROM TeamWeekTotals WHERE team_id = ? AND week >= ?
+                   GROUP BY map_id) w ON w.map_id = mp.id
+        ORDER BY mp.id
+    ''', (team_id, since or ''))
+    return cursor.fetchall()
+
+
+def team_winrate_by_map(cursor, team_id, opponent_id=None, since=None):
+    """
+    Retourne [(map_name, rounds_won, rounds_lost), ...] pour `team_id`, une ligne par map.
+    opponent_id : seulement les games contre cette équipe (table Games, idx_games_h2h).
+    """
+    if opponent_id is None:
+        return [(name, rw, rl) for _mid, name, _img, _games, rw, rl in team_map_totals(cursor, team_id, since)]
+    lo, hi, mine, theirs = _h2h_key(team_id, opponent_id)
+    cursor.execute(f'''
+        SELECT m.name, COALESCE(SUM(g.{mine}), 0), COALESCE(SUM(g.{theirs}), 0)
+        FROM Maps m
+        LEFT JOIN Games g ON g.team_a = ? AND g.team_b = ? AND g.map_id = m.id{_played_since(since)}
+        GROUP BY m.id
+    ''', (lo, hi) + _since_params(since))
+    return cursor.fetchall()
+
+
+# ----------------------------------------------------------------
+# head_to_head(cursor, team_id, opponent_id, since=None)
+# ----------------------------------------------------------------
+# Face-à-face « A contre B », par map. Games garde team_a < team_b : on
+# cherche toujours (plus petit id, plus grand id) → une seule plage de
+# idx_games_h2h, qui couvre aussi map_id et les rounds (pas de lecture de table
+# sauf pour le nom de la map ; avec une fenêtre, + played_at de la game).
+def _played_since(since, alias='g'):
+    """Condition SQL sur la date de la game (vide sans fenêtre)."""
+    return '' if since is None else f' AND {alias}.played_at >= ?'
+
+
+def _since_params(since):
+    return () if since is None else (since,)
+
+
+def _h2h_key(team_id, opponent_id):
+    """(team_a, team_b, colonne des rounds de team_id, colonne de l’adversaire)."""
+    if team_id < opponent_id:
+        return team_id, opponent_id, 'rounds_a', 'rounds_b'
+    return opponent_id, team_id, 'rounds_b', 'rounds_a'
+
+
+def head_to_head(cursor, team_id, opponent_id, since=None):
+    """
+    Retourne [(map_name, games, wins, losses, draws, rounds_won, rounds_lost), ...]
+    du point de vue de `team_id` contre `opponent_id`, maps jouées seulement.
+    """
+    lo, hi, mine, theirs = _h2h_key(team_id, opponent_id)
+    cursor.execute(f'''
+        SELECT m.name, COUNT(*),
+               SUM(g.{mine} > g.{theirs}), SUM(g.{mine} < g.{theirs}), SUM(g.{mine} = g.{theirs}),
+               SUM(g.{mine}), SUM(g.{theirs})
+        FROM Games g
+        JOIN Maps m ON m.id = g.map_id
+        WHERE g.team_a = ? AND g.team_b = ?{_played_since(since)}
+        GROUP BY g.map_id
+        ORDER BY m.name COLLATE NOCASE
+    ''', (lo, hi) + _since_params(since))
+    return cursor.fetchall()
+
+
+# ----------------------------------------------------------------
+# map_games(cursor)
+# ----------------------------------------------------------------
+# Games et rounds par map, chaque match compté UNE fois (Matches a une ligne
+# par équipe). Les côtés sans game (adversaire supprimé) comptent pour leurs rounds.
+MAP_GAMES_SQL = '''
+    SELECT mp.name, COALESCE(g.n, 0) AS games, COALESCE(g.r, 0) + COALESCE(u.r, 0) AS rounds
+    FROM Maps mp
+    LEFT JOIN (SELECT map_id, COUNT(*) AS n, SUM(rounds_a + rounds_b) AS r
+               FROM Games GROUP BY map_id) g ON g.map_id = mp.id
+    LEFT JOIN (SELECT map_id, SUM(rounds_won + rounds_lost) AS r
+               FROM Matches WHERE game_id IS NULL GROUP BY map_id) u ON u.map_id = mp.id
+'''
+
+
+def map_games(cursor):
+    """Retourne [(map_name, games, rounds), ...] trié par rounds joués (décroissant)."""
+    cursor.execute(MAP_GAMES_SQL + ' ORDER BY rounds DESC, mp.id')
+    return cursor.fetchall()
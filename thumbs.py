@@ -0,0 +1,152 @@
+# thumbs.py
+# -----------------------------------------------------------------------------
+# Rôle : vignettes pré-calculées sur disque (une par taille d’affichage)
+#        - à l’ajout d’une image (copy_to_images) : build_async() les génère
+#          dans un pool de threads, l’UI n’attend pas
+#        - load_img lit la variante la plus proche (best_variant) au lieu de
+#          réduire l’original de plusieurs Mo à chaque affichage
+#        - l’original reste dans images/, seulement pour régénérer
+#        - migrate() : une passe pour les BD existantes (ne fait que le manquant)
+#
+# Rangement : images/.thumbs/<taille>/<nom de l’image>.png
+# (PNG pour garder la transparence des logos)
+# -----------------------------------------------------------------------------
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db import IMAGES_DIR
+
+THUMBS_DIR = os.path.join(IMAGES_DIR, '.thumbs')
+
+# Tailles (boîte carrée, en px) demandées par les écrans de main.py
+THUMB_SIZES = (32, 40, 64, 80, 100, 120, 150, 160, 190, 220, 240)
+
+# Icônes de l’interface (en plus des images référencées par la BD)
+UI_IMAGES = ('logoapp.png', 'back.png', 'anonymous.png', 'logout.png',
+             'ajoutermap.png', 'ajouterequipe.png', 'ajoutermatch.png',
+             'deletemap.png', 'database.png')
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    """Pool de threads partagé (créé au premier besoin). PIL relâche le GIL pendant le resize."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='thumbs')
+        return _pool
+
+
+def thumb_path(name, size):
+    """Chemin de la vignette `size` de l’image `name` (nom de fichier dans images/)."""
+    return os.path.join(THUMBS_DIR, str(size), name + '.png')
+
+
+def _fresh(src, dest):
+    """Vrai si `dest` existe et n’est pas plus vieille que `src`."""
+    try:
+        return os.stat(dest).st_mtime_ns >= os.stat(src).st_mtime_ns
+    except OSError:
+        return False
+
+
+# ----------------------------------------------------------------
+# best_variant(path, size)
+# ----------------------------------------------------------------
+# La plus petite vignette qui couvre `size` ; sinon l’original.
+# Seulement pour les images rangées dans images/ (les autres : tel quel).
+def best_variant(path, size):
+    """Chemin du fichier à décoder pour afficher `path` dans une boîte `size`."""
+    if os.path.dirname(os.path.abspath(path)) != os.path.abspath(IMAGES_DIR):
+        return path
+    want = max(size)
+    for s in THUMB_SIZES:
+        if s >= want:
+            dest = thumb_path(os.path.basename(path), s)
+            if _fresh(path, dest):
+                return dest
+            break
+    return path
+
+
+# ----------------------------------------------------------------
+# build(name, force=False)
+# ----------------------------------------------------------------
+# Décode l’original UNE fois puis écrit chaque taille manquante.
+# Écriture dans un .tmp puis os.replace : jamais de vignette à moitié
+# écrite lue par l’UI.
+def build(name, force=False):
+    """Génère les vignettes de images/`name`. Retourne le nombre écrites (0 si illisible)."""
+    src = os.path.join(IMAGES_DIR, name)
+    todo = [s for s in THUMB_SIZES if force or not _fresh(src, thumb_path(name, s))]
+    if not todo or not os.path.isfile(src):
+        return 0
+    try:
+        from PIL import Image  # import paresseux (coûteux au démarrage)
+        try:
+            resample = Image.Resampling.LANCZOS
+        except AttributeError:
+            resample = Image.LANCZOS
+        with Image.open(src) as im:
+            # JPEG : décodage directement à une échelle réduite (beaucoup plus rapide)
+            im.draft('RGB', (max(todo) * 2, max(todo) * 2))
+            base = im.copy()
+        if base.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            base = base.convert('RGBA')
+    except Exception:
+        return 0
+
+    written = 0
+    for s in sorted(todo, reverse=True):
+        img = base.copy()
+        img.thumbnail((s, s), resample)
+        dest = thumb_path(name, s)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f'{dest}.{threading.get_ident()}.tmp'
+        try:
+            img.save(tmp, 'PNG')
+            os.replace(tmp, dest)
+            written += 1
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    return written
+
+
+def build_async(name, force=False):
+    """Met la génération des vignettes de `name` dans le pool ; retourne le Future."""
+    return _executor().submit(build, name, force)
+
+
+# ----------------------------------------------------------------
+# migrate(cursor, wait=False)
+# ----------------------------------------------------------------
+# Pour une BD existante : toutes les images référencées (Teams.logo,
+# Players.logo, Maps.image) + les icônes de l’UI. Ce qui est déjà à jour
+# est sauté, donc après le premier passage ça ne fait que quelques stat().
+def referenced_images(cursor):
+    """Noms de fichiers d’images utilisés par la BD et par l’interface."""
+    names = set(UI_IMAGES)
+    for sql in ('SELECT logo FROM Teams', 'SELECT logo FROM Players', 'SELECT image FROM Maps'):
+        names.update(r[0] for r in cursor.execute(sql) if r[0])
+    return sorted(names)
+
+
+def migrate(cursor, wait=False):
+    """
+    Génère (en arrière-plan) les vignettes manquantes des images référencées.
+    wait=True : attend la fin et retourne le nombre de vignettes écrites ;
+    sinon retourne tout de suite la liste des Futures.
+    """
+    futures = [build_async(name) for name in referenced_images(cursor)]
+    if not wait:
+        return futures
+    return sum(f.result() for f in futures)
@@ -0,0 +1,125 @@
+# vlist.py
+# -----------------------------------------------------------------------------
+# Rôle : liste « virtuelle » pour les panneaux qui défilent (équipes, joueurs,
+#        maps, leaderboard)
+#        - même recette que le reste de l’app : Canvas + Scrollbar (+ bind_mousewheel
+#          côté main.py), mais on ne crée des widgets QUE pour les lignes visibles
+#          (+ quelques lignes de marge)
+#        - en défilant, les lignes qui sortent de l’écran sont recyclées pour
+#          celles qui entrent : le nombre de widgets reste le même, 20 ou 20 000 lignes
+#        - hauteur de ligne fixe ; columns > 1 pour une grille (vignettes d’équipes)
+#
+# Utilisation :
+#   vl = VirtualList(parent, row_height=92, create_row=creer, fill_row=remplir, bg=BG)
+#   vl.frame.pack(fill='both', expand=True); bind_mousewheel(vl.canvas)
+#   vl.set_items(lignes)
+# create_row(master) construit UNE ligne vide (Frame + enfants) et la retourne ;
+# fill_row(widget, item, index) y met les données (doit tout remettre à jour :
+# le widget a peut-être déjà servi pour une autre ligne).
+# -----------------------------------------------------------------------------
+
+import tkinter as tk
+
+
+class VirtualList:
+    """Liste défilante qui ne construit que les lignes visibles (voir en-tête)."""
+
+    def __init__(self, parent, row_height, create_row, fill_row, columns=1, buffer=2, bg=None):
+        self.row_height = row_height
+        self.columns = max(1, columns)
+        self.buffer = buffer
+        self.items = []
+        self.created = 0            # widgets de ligne construits (pour voir que ça plafonne)
+        self._create_row = create_row
+        self._fill_row = fill_row
+        self._active = {}           # index → (widget, id de la fenêtre du canvas)
+        self._free = []             # lignes construites mais cachées, prêtes à resservir
+        self._cell_w = 1
+
+        self.frame = tk.Frame(parent, bg=bg)
+        self.canvas = tk.Canvas(self.frame, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self.frame, orient='vertical', command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.canvas.bind('<Configure>', self._on_configure)
+
+    # ------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------
+    def set_items(self, items, keep_scroll=False):
+        """Remplace les données ; seules les lignes visibles sont (re)remplies."""
+        self.items = list(items)
+        for index in list(self._active):
+            self._release(index)
+        self._update_scrollregion()
+        if not keep_scroll:
+            self.canvas.yview_moveto(0)
+        self._refresh()
+
+    def refresh_items(self):
+        """Re-remplit les lignes visibles (mêmes items, données à rafraîchir)."""
+        for index, (widget, _win) in self._active.items():
+            self._fill_row(widget, self.items[index], index)
+
+    # ------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------
+    def _rows(self):
+        return -(-len(self.items) // self.columns)  # division arrondie vers le haut
+
+    def _update_scrollregion(self):
+        height = max(self._rows() * self.row_height, 1)
+        self.canvas.configure(scrollregion=(0, 0, self._cell_w * self.columns, height))
+
+    def _position(self, index):
+        row, col = divmod(index, self.columns)
+        return col * self._cell_w, row * self.row_height
+
+    def _new_slot(self):
+        widget = self._create_row(self.canvas)
+        win = self.canvas.create_window(0, 0, window=widget, anchor='nw', state='hidden',
+                                        width=self._cell_w, height=self.row_height)
+        self.created += 1
+        return widget, win
+
+    def _release(self, index):
+        slot = self._active.pop(index)
+        self.canvas.itemconfigure(slot[1], state='hidden')
+        self._free.append(slot)
+
+    def _refresh(self):
+        """Affiche les lignes visibles (+ marge), recycle les autres."""
+        n = len(self.items)
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // self.row_height) - self.buffer)
+        last = min(self._rows() - 1, int(bottom // self.row_height) + self.buffer)
+        wanted = range(first * self.columns, min(n, (last + 1) * self.columns))
+
+        for index in [i for i in self._active if i not in wanted]:
+            self._release(index)
+        for index in wanted:
+            if index in self._active:
+                continue
+            slot = self._free.pop() if self._free else self._new_slot()
+            self._fill_row(slot[0], self.items[index], index)
+            self.canvas.coords(slot[1], *self._position(index))
+            self.canvas.itemconfigure(slot[1], state='normal')
+            self._active[index] = slot
+
+    def _on_yview(self, first, last):
+        # Appelé par le canvas à chaque défilement / redimensionnement
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _on_configure(self, event):
+        cell_w = max(1, event.width // self.columns)
+        if cell_w != self._cell_w:
+            self._cell_w = cell_w
+            for widget, win in list(self._active.values()) + self._free:
+                self.canvas.itemconfigure(win, width=cell_w)
+            for index, (_widget, win) in self._active.items():
+                self.canvas.coords(win, *self._position(index))
+            self._update_scrollregion()
+        self._refresh()